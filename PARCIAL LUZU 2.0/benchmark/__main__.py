@@ -0,0 +1,94 @@
+# benchmark/__main__.py
+"""
+SandTech - Benchmark del modelo de clientes
+Mide las operaciones de ClienteModel sobre bases sintéticas de distintos
+tamaños y guarda los resultados en JSON. Con --baseline compara contra una
+corrida anterior y termina con error si alguna operación empeoró.
+
+Uso: python -m benchmark [--tamanos 1000,100000,1000000] [--salida resultados.json]
+                         [--baseline baseline.json] [--tolerancia 0.3]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.comparacion import comparar_con_baseline
+from benchmark.datos import copia_de_trabajo, eliminar_base, preparar_base
+from benchmark.escenarios import medir_tamano
+
+def imprimir_resultados(resultados):
+    for tamano, medida in resultados['tamanos'].items():
+        rss = medida['pico_rss_kb']
+        print(f"\n{int(tamano):,} filas (pico de memoria: {f'{rss / 1024:.0f} MB' if rss else 'n/d'})")
+        print(f"  {'operación':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'por seg':>12}")
+        for operacion, datos in medida['operaciones'].items():
+            print(f"  {operacion:<30}{datos['p50_ms']:>10.3f}{datos['p95_ms']:>10.3f}"
+                  f"{datos['p99_ms']:>10.3f}{datos['por_segundo']:>12.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del modelo de clientes SandTech")
+    parser.add_argument("--tamanos", default="1000,100000,1000000",
+                        help="Cantidades de clientes separadas por coma")
+    parser.add_argument("--llamadas", type=int, default=1000, help="Lecturas medidas por operación")
+    parser.add_argument("--carpeta", default=os.path.join(".benchmark", "bases"),
+                        help="Dónde se guardan (y reutilizan) las bases sintéticas")
+    parser.add_argument("--salida", default=os.path.join(".benchmark", "resultados.json"),
+                        help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", help="Resultados de referencia contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.3,
+                        help="Empeoramiento admitido antes de marcar regresión (0.3 = 30%%)")
+    args = parser.parse_args(argv)
+    
+    tamanos = [int(t) for t in args.tamanos.split(",") if t.strip()]
+    resultados = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'tamanos': {},
+    }
+    
+    for filas in tamanos:
+        print(f"Preparando base de {filas:,} clientes...")
+        ruta = copia_de_trabajo(preparar_base(args.carpeta, filas))
+        print(f"Midiendo {filas:,} clientes...")
+        # Un proceso por tamaño: el pico de memoria no arrastra los tamaños anteriores
+        try:
+            with ProcessPoolExecutor(max_workers=1) as proceso:
+                resultados['tamanos'][str(filas)] = proceso.submit(medir_tamano, ruta, filas,
+                                                                   args.llamadas).result()
+        finally:
+            eliminar_base(ruta)
+    
+    imprimir_resultados(resultados)
+    os.makedirs(os.path.dirname(args.salida) or ".", exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as archivo:
+            baseline = json.load(archivo)
+        regresiones = comparar_con_baseline(resultados, baseline, args.tolerancia)
+        if regresiones:
+            print("\n" + "!" * 60)
+            print(f"REGRESIONES DE RENDIMIENTO respecto de {args.baseline}:")
+            for regresion in regresiones:
+                print(f"  - {regresion}")
+            print("!" * 60)
+            return 1
+        print(f"Sin regresiones respecto de {args.baseline} (tolerancia {args.tolerancia:.0%})")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+# benchmark/__init__.py
+"""
+Paquete Benchmark - Medición de rendimiento
+Genera bases de clientes sintéticas y mide las operaciones del modelo
+
+Uso: python -m benchmark --tamanos 1000,100000,1000000 --salida resultados.json
+"""
+
+from .escenarios import medir_tamano
+from .comparacion import comparar_con_baseline
+
+__all__ = ['medir_tamano', 'comparar_con_baseline']
@@ -0,0 +1,36 @@
+# benchmark/comparacion.py
+
+# Diferencias menores a esto (en ms) se consideran ruido aunque superen la tolerancia
+PISO_RUIDO_MS = 0.05
+
+# Percentil que se compara: la mediana es la que menos varía entre corridas;
+# p95 y p99 quedan en el informe pero dependen mucho de la carga de la máquina
+METRICA = 'p50_ms'
+
+def comparar_con_baseline(resultados, baseline, tolerancia=0.3):
+    """Compara resultados contra una corrida de referencia.
+    
+    Devuelve una lista de textos, uno por cada operación cuya mediana empeoró
+    más que la tolerancia (0.3 = 30 %) o cuyo pico de memoria creció más que
+    eso. Los tamaños u operaciones que no están en la referencia se ignoran.
+    """
+    regresiones = []
+    for tamano, actual in resultados['tamanos'].items():
+        referencia = baseline.get('tamanos', {}).get(tamano)
+        if referencia is None:
+            continue
+        
+        for operacion, medida in actual['operaciones'].items():
+            base = referencia['operaciones'].get(operacion)
+            if base is None:
+                continue
+            actual_ms, base_ms = medida[METRICA], base[METRICA]
+            if actual_ms > base_ms * (1 + tolerancia) and actual_ms - base_ms > PISO_RUIDO_MS:
+                regresiones.append(f"{tamano} filas - {operacion}: {METRICA[:3]} {actual_ms:.3f} ms "
+                                   f"(referencia {base_ms:.3f} ms, +{actual_ms / base_ms - 1:.0%})")
+        
+        if actual.get('pico_rss_kb') and referencia.get('pico_rss_kb'):
+            if actual['pico_rss_kb'] > referencia['pico_rss_kb'] * (1 + tolerancia):
+                regresiones.append(f"{tamano} filas - memoria: pico {actual['pico_rss_kb']} KB "
+                                   f"(referencia {referencia['pico_rss_kb']} KB)")
+    return regresiones
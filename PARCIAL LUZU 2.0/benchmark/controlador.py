@@ -0,0 +1,139 @@
+# benchmark/controlador.py
+"""
+SandTech - Benchmark de punta a punta del controlador
+Repite miles de operaciones de usuario (nuevo, guardar, buscar, seleccionar,
+modificar, eliminar, recargar, ordenar y filtrar la lista, desplazarse) sobre el controlador
+real con una vista simulada sin ventana, y mide cuánto tarda cada manejador,
+incluida la actualización de la lista.
+
+Uso: python -m benchmark.controlador [--filas 10000] [--operaciones 2000] [--salida controlador.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.datos import NOMBRES, APELLIDOS, copia_de_trabajo, eliminar_base, preparar_base
+from benchmark.mediciones import resumir
+from controller.cliente_controller import ClienteController
+from model.cliente_model import ClienteModel
+from view.vista_simulada import VistaSimulada
+
+TEXTOS_BUSQUEDA = ("gonz", "Pérez", "maria", "San Martín", "lopez ana", "diego")
+
+class Escenario:
+    """Recorrido de un operador: cada paso llama a un manejador del controlador"""
+    
+    def __init__(self, controller, vista, semilla=1):
+        self.controller = controller
+        self.vista = vista
+        self.azar = random.Random(semilla)
+        self.tiempos = defaultdict(list)
+    
+    def medir(self, nombre, manejador):
+        inicio = time.perf_counter()
+        manejador()
+        self.tiempos[nombre].append(time.perf_counter() - inicio)
+    
+    def datos_cliente(self, numero):
+        nombre = self.azar.choice(NOMBRES)
+        return {
+            'nombre': nombre,
+            'apellido': self.azar.choice(APELLIDOS),
+            'email': f"operador.{numero}@ejemplo.com",
+            'telefono': f"11{self.azar.randrange(10 ** 8):08d}",
+            'direccion': f"Avenida Prueba {self.azar.randrange(1, 5000)}",
+        }
+    
+    def paso(self, numero):
+        """Alta, búsquedas, selección, modificación y baja de un cliente"""
+        c, vista = self.controller, self.vista
+        
+        self.medir('nuevo_cliente', c.nuevo_cliente)
+        vista.completar_formulario(self.datos_cliente(numero))
+        self.medir('guardar_cliente', c.guardar_cliente)
+        codigo = self.controller.model.get_next_codigo() - 1
+        
+        vista.var_buscar_codigo.set(str(codigo))
+        self.medir('buscar_cliente', c.buscar_cliente)
+        
+        vista.var_buscar_texto.set(self.azar.choice(TEXTOS_BUSQUEDA))
+        self.medir('buscar_por_texto', c.buscar_por_texto)
+        self.medir('mostrar_todos_los_clientes', c.mostrar_todos_los_clientes)
+        
+        # Desplazarse por la lista y hacer clic en una fila visible
+        lista = vista.lista
+        self.medir('desplazar_lista', lambda: lista.ir_a_posicion(self.azar.randrange(max(1, lista.total))))
+        visibles = vista.tree_clientes.get_children()
+        if visibles:
+            fila = int(self.azar.choice(visibles))
+            self.medir('on_cliente_seleccionado', lambda: vista.hacer_clic_en_fila(fila))
+        
+        vista.var_buscar_codigo.set(str(codigo))
+        c.buscar_cliente()
+        vista.completar_formulario({'direccion': f"Calle Modificada {numero}"})
+        self.medir('actualizar_cliente', c.actualizar_cliente)
+        self.medir('eliminar_cliente', c.eliminar_cliente)
+        
+        if numero % 10 == 0:
+            # Ordenar por otra columna (el orden queda para los pasos siguientes)
+            campo = self.azar.choice(vista.COLUMNAS_LISTA)[0]
+            self.medir('ordenar_lista', lambda: c.ordenar_lista(campo))
+            vista.vars_filtro['apellido'].set(self.azar.choice(APELLIDOS)[:3])
+            self.medir('filtrar_lista', c.filtrar_lista)
+            vista.vars_filtro['apellido'].set("")
+            c.filtrar_lista()
+        
+        if numero % 50 == 0:
+            self.medir('actualizar_lista_clientes', c.actualizar_lista_clientes)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del controlador con vista simulada")
+    parser.add_argument("--filas", type=int, default=10000, help="Clientes en la base de prueba")
+    parser.add_argument("--operaciones", type=int, default=2000, help="Recorridos completos a repetir")
+    parser.add_argument("--carpeta", default=os.path.join(".benchmark", "bases"),
+                        help="Dónde se guardan (y reutilizan) las bases sintéticas")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args(argv)
+    
+    ruta = copia_de_trabajo(preparar_base(args.carpeta, args.filas))
+    vista = VistaSimulada()
+    controller = ClienteController(vista, ClienteModel(ruta))
+    escenario = Escenario(controller, vista)
+    try:
+        inicio = time.perf_counter()
+        for numero in range(args.operaciones):
+            escenario.paso(numero)
+        duracion = time.perf_counter() - inicio
+    finally:
+        controller.cerrar()
+        eliminar_base(ruta)
+    
+    resultados = {nombre: resumir(tiempos) for nombre, tiempos in escenario.tiempos.items()}
+    print("=" * 72)
+    print(f"{args.operaciones} recorridos sobre {args.filas:,} clientes en {duracion:.1f} s")
+    print(f"  {'manejador':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'por seg':>12}")
+    for nombre, datos in resultados.items():
+        print(f"  {nombre:<30}{datos['p50_ms']:>10.3f}{datos['p95_ms']:>10.3f}"
+              f"{datos['p99_ms']:>10.3f}{datos['por_segundo']:>12.0f}")
+    print("Mensajes mostrados: " + ", ".join(f"{tipo}={cantidad}"
+                                            for tipo, cantidad in sorted(vista.mensajes_por_tipo.items())))
+    print("=" * 72)
+    
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({'filas': args.filas, 'operaciones': args.operaciones,
+                       'manejadores': resultados}, archivo, indent=2, ensure_ascii=False)
+    
+    # Un error mostrado al usuario indica que el recorrido no fue el esperado
+    return 1 if vista.mensajes_por_tipo["error"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# benchmark/datos.py
+import os
+import random
+import shutil
+import unicodedata
+
+from model.cliente_model import ClienteModel
+
+NOMBRES = ("Ana", "Juan", "María", "Pedro", "Lucía", "Martín", "Sofía", "Diego",
+           "Valentina", "Mateo", "Camila", "Santiago", "Julieta", "Tomás", "Paula", "Nicolás")
+APELLIDOS = ("González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez",
+             "Pérez", "García", "Sánchez", "Romero", "Sosa", "Torres", "Álvarez", "Ruiz", "Benítez")
+CALLES = ("San Martín", "Belgrano", "Rivadavia", "Sarmiento", "Mitre", "Moreno", "Alsina", "Córdoba")
+
+def sin_acentos(texto):
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+def generar_clientes(cantidad, semilla=42):
+    """Genera cantidad clientes sintéticos; la misma semilla da los mismos datos"""
+    azar = random.Random(semilla)
+    for i in range(cantidad):
+        nombre = azar.choice(NOMBRES)
+        apellido = azar.choice(APELLIDOS)
+        yield {
+            'nombre': nombre,
+            'apellido': apellido,
+            'email': f"{sin_acentos(nombre).lower()}.{i}@ejemplo.com",
+            'telefono': f"11{azar.randrange(10 ** 8):08d}",
+            'direccion': f"{azar.choice(CALLES)} {azar.randrange(1, 5000)}",
+        }
+
+def preparar_base(carpeta, filas, semilla=42):
+    """Devuelve la ruta de una base con filas clientes, creándola si no existe.
+    
+    Las bases se reutilizan entre corridas: generar un millón de filas lleva
+    más que medirlas.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"clientes_{filas}.db")
+    
+    model = ClienteModel(ruta, tamano_cache=0)
+    try:
+        existentes = model.contar_clientes()
+        if existentes != filas:
+            if existentes:
+                model.cerrar()
+                eliminar_base(ruta)
+                model = ClienteModel(ruta, tamano_cache=0)
+            model.crear_clientes_bulk(generar_clientes(filas, semilla), tamano_lote=5000)
+    finally:
+        model.cerrar()
+    return ruta
+
+SUFIJOS_SQLITE = ("", "-wal", "-shm")
+
+def copia_de_trabajo(ruta):
+    """Copia la base generada para medir sobre la copia.
+    
+    Las mediciones escriben (altas, modificaciones, bajas) y eso fragmenta el
+    índice de texto; midiendo siempre sobre una copia de la base original
+    todas las corridas parten del mismo estado.
+    """
+    copia = ruta.replace(".db", "_medicion.db")
+    for sufijo in SUFIJOS_SQLITE:
+        if os.path.exists(copia + sufijo):
+            os.remove(copia + sufijo)
+        if os.path.exists(ruta + sufijo):
+            shutil.copyfile(ruta + sufijo, copia + sufijo)
+    return copia
+
+def eliminar_base(ruta):
+    for sufijo in SUFIJOS_SQLITE:
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
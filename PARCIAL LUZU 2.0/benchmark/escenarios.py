@@ -0,0 +1,79 @@
+# benchmark/escenarios.py
+import random
+import time
+
+from benchmark.datos import generar_clientes
+from benchmark.mediciones import medir, pico_rss_kb, resumir
+from model.cliente_model import ClienteModel
+
+def medir_tamano(ruta_db, filas, llamadas=1000, semilla=7):
+    """Mide las operaciones del modelo sobre una base de filas clientes.
+    
+    Conviene correrla en un proceso nuevo por tamaño, así el pico de memoria
+    corresponde solo a ese tamaño, y sobre una copia de la base, porque las
+    mediciones de escritura la modifican.
+    """
+    azar = random.Random(semilla)
+    model = ClienteModel(ruta_db, tamano_cache=0)
+    operaciones = {}
+    try:
+        primero = model.listar_clientes(limit=1)[0]['codigo']
+        codigos = [primero + azar.randrange(filas) for _ in range(llamadas)]
+        escrituras = max(1, llamadas // 5)
+        nuevos = list(generar_clientes(escrituras, semilla))
+        
+        creados = []
+        def crear(datos):
+            creados.append(model.crear_cliente(datos['nombre'], datos['apellido'], datos['email'],
+                                               datos['telefono'], datos['direccion'])[1])
+        
+        operaciones['crear_cliente'] = medir(crear, ((datos,) for datos in nuevos))
+        operaciones['obtener_cliente'] = medir(model.obtener_cliente, ((c,) for c in codigos))
+        
+        # Mismas lecturas con la caché del modelo, después de precargarla
+        model.cache.tamano = llamadas
+        for codigo in codigos[:100]:
+            model.obtener_cliente(codigo)
+        operaciones['obtener_cliente_cache'] = medir(model.obtener_cliente,
+                                                     ((codigos[i % 100],) for i in range(llamadas)))
+        model.cache.tamano = 0
+        model.cache.limpiar()
+        
+        operaciones['actualizar_cliente'] = medir(
+            model.actualizar_cliente,
+            ((codigo, "Medición", "Actualizado", f"medicion{codigo}@ejemplo.com", "1100000000",
+              f"Calle Medición {codigo}") for codigo in codigos[:escrituras]))
+        
+        operaciones['buscar_clientes'] = medir(
+            model.buscar_clientes,
+            ((azar.choice(("gonz", "Pérez", "maria", "San Martín", "lopez ana")), 50)
+             for _ in range(max(1, llamadas // 10))))
+        operaciones['listar_clientes_en_posicion'] = medir(
+            model.listar_clientes_en_posicion,
+            ((azar.randrange(filas), 50) for _ in range(max(1, llamadas // 10))))
+        operaciones['contar_clientes'] = medir(model.contar_clientes, (() for _ in range(20)))
+        
+        # La lista completa es la operación más cara: pocas repeticiones
+        repeticiones = 3 if filas <= 100000 else 1
+        operaciones['obtener_todos_clientes'] = medir(model.obtener_todos_clientes,
+                                                      (() for _ in range(repeticiones)),
+                                                      unidades=filas * repeticiones)
+        
+        operaciones['eliminar_cliente'] = medir(model.eliminar_cliente, ((c,) for c in creados))
+        
+        # Importación masiva en varias tandas, para tener una mediana estable
+        cantidad_bulk = max(1, min(filas, 20000) // 5)
+        tiempos = []
+        for tanda in range(5):
+            inicio = time.perf_counter()
+            model.crear_clientes_bulk(generar_clientes(cantidad_bulk, semilla + tanda))
+            tiempos.append(time.perf_counter() - inicio)
+        operaciones['crear_clientes_bulk'] = resumir(tiempos, cantidad_bulk * len(tiempos))
+    finally:
+        model.cerrar()
+    
+    return {
+        'filas': filas,
+        'pico_rss_kb': pico_rss_kb(),
+        'operaciones': operaciones,
+    }
@@ -0,0 +1,49 @@
+# benchmark/mediciones.py
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no hay getrusage
+    resource = None
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) por el método del rango más cercano"""
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, max(0, round(len(valores_ordenados) * p / 100) - 1))
+    return valores_ordenados[indice]
+
+def resumir(tiempos, unidades=None):
+    """Resume una lista de duraciones (en segundos) en ms y operaciones por segundo.
+    
+    unidades es la cantidad de elementos procesados en total, para las
+    operaciones que manejan varias filas por llamada (por defecto, una por llamada).
+    """
+    ordenados = sorted(tiempos)
+    total = sum(ordenados)
+    return {
+        'llamadas': len(ordenados),
+        'p50_ms': percentil(ordenados, 50) * 1000,
+        'p95_ms': percentil(ordenados, 95) * 1000,
+        'p99_ms': percentil(ordenados, 99) * 1000,
+        'media_ms': total / len(ordenados) * 1000 if ordenados else 0.0,
+        'por_segundo': (unidades or len(ordenados)) / total if total else 0.0,
+    }
+
+def medir(funcion, argumentos, unidades=None):
+    """Llama a funcion(*args) por cada tupla de argumentos y resume los tiempos"""
+    tiempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return resumir(tiempos, unidades)
+
+def pico_rss_kb():
+    """Memoria residente máxima del proceso en KB, o None si no se puede medir"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa bytes, Linux kilobytes
+    return pico // 1024 if sys.platform == "darwin" else pico
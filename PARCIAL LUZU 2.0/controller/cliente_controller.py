@@ -1,56 +1,50 @@
 # controller/cliente_controller.py
-import re
+import logging
 from model.cliente_model import ClienteModel
+from model.consulta_lista import ConsultaLista
+from model.metricas import metricas
+from model.modelo_asincrono import ModeloAsincrono
+from model.validaciones import validar_campo, validar_datos_cliente
+
+log = logging.getLogger("sandtech.controller")
 
 class ClienteController:
-    def __init__(self, view):
+    # Cantidad máxima de resultados que muestra la búsqueda por texto
+    LIMITE_BUSQUEDA = 200
+    
+    def __init__(self, view, model=None, al_cargar=None):
+        """al_cargar(total), si se indica, se llama cuando la primera página de
+        la lista ya está en pantalla (la carga es asíncrona)"""
         self.view = view
-        self.model = ClienteModel()
+        self.model = model or ClienteModel()
         self.view.set_controller(self)
         self.modo_edicion = False  # False = nuevo, True = editando
+        self.mostrando_busqueda = False  # True = la lista muestra resultados de búsqueda
+        self.consulta_lista = ConsultaLista()  # Orden y filtros de la lista completa
+        
+        # Las consultas corren en hilos de trabajo; los resultados vuelven al
+        # hilo de Tk, así la ventana nunca se congela esperando a SQLite
+        self.db = ModeloAsincrono(self.model, getattr(self.view, 'root', None),
+                                  al_fallar=self.on_error_base_datos,
+                                  al_cambiar_ocupado=self.view.set_ocupado)
+        
+        # Cada alta, modificación o baja del modelo se aplica a la lista fila por fila
+        self.db.suscribir(self.on_cambio_modelo)
         
         # Cargar lista inicial
-        self.actualizar_lista_clientes()
+        self.mostrar_todos_los_clientes(al_cargar)
         
     def validar_datos(self, datos):
         """Valida los datos del formulario"""
-        errores = []
-        
-        if not datos['nombre']:
-            errores.append("El nombre es obligatorio")
-        elif len(datos['nombre']) < 2:
-            errores.append("El nombre debe tener al menos 2 caracteres")
-            
-        if not datos['apellido']:
-            errores.append("El apellido es obligatorio")
-        elif len(datos['apellido']) < 2:
-            errores.append("El apellido debe tener al menos 2 caracteres")
-            
-        if not datos['email']:
-            errores.append("El email es obligatorio")
-        else:
-            # Validar formato de email
-            patron_email = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(patron_email, datos['email']):
-                errores.append("El formato del email no es válido")
-                
-        if not datos['telefono']:
-            errores.append("El teléfono es obligatorio")
-        elif len(datos['telefono']) < 8:
-            errores.append("El teléfono debe tener al menos 8 dígitos")
-            
-        if not datos['direccion']:
-            errores.append("La dirección es obligatoria")
-        elif len(datos['direccion']) < 5:
-            errores.append("La dirección debe tener al menos 5 caracteres")
-            
-        return errores
+        return validar_datos_cliente(datos)
     
     def nuevo_cliente(self):
         """Prepara el formulario para un nuevo cliente"""
         self.limpiar_formulario()
         self.modo_edicion = False
-        self.view.var_codigo.set(f"Nuevo cliente - Código: {self.model.next_codigo}")
+        # Código tentativo: el definitivo se asigna al guardar
+        self.db.leer(self.model.get_next_codigo, clave="proximo-codigo",
+                     al_terminar=lambda codigo: self.view.var_codigo.set(f"Nuevo cliente - Código: {codigo}"))
         self.view.mostrar_mensaje("info", "Nuevo Cliente", 
                                  "Formulario preparado para nuevo cliente.\nComplete los datos y presione 'Guardar'.")
         
@@ -73,22 +67,39 @@ class ClienteController:
             self.view.mostrar_mensaje("error", "Error de Validación", mensaje_error)
             return
         
-        # Guardar en base de datos
-        exito, codigo = self.model.crear_cliente(
-            datos['nombre'], 
-            datos['apellido'], 
-            datos['email'], 
-            datos['telefono'], 
-            datos['direccion']
-        )
-        
-        if exito:
-            self.view.mostrar_mensaje("info", "Cliente Guardado", 
-                                     f"Cliente guardado exitosamente.\nCódigo asignado: {codigo}")
-            self.limpiar_formulario()
-            self.actualizar_lista_clientes()
-        else:
-            self.view.mostrar_mensaje("error", "Error", "No se pudo guardar el cliente")
+        def al_guardar(resultado):
+            exito, codigo = resultado
+            if exito:
+                self.view.mostrar_mensaje("info", "Cliente Guardado", 
+                                         f"Cliente guardado exitosamente.\nCódigo asignado: {codigo}")
+                self.limpiar_formulario()
+            else:
+                self.view.mostrar_mensaje("error", "Error", "No se pudo guardar el cliente")
+        
+        def al_verificar(duplicados):
+            if duplicados and not self.confirmar_duplicados(duplicados, "¿Desea guardarlo de todas formas?"):
+                return
+            
+            # Guardar en base de datos
+            self.db.escribir(
+                self.model.crear_cliente,
+                datos['nombre'], 
+                datos['apellido'], 
+                datos['email'], 
+                datos['telefono'], 
+                datos['direccion'],
+                al_terminar=al_guardar
+            )
+        
+        self.db.leer(self.model.buscar_duplicados, datos['email'], datos['telefono'],
+                     al_terminar=al_verificar, clave="duplicados")
+    
+    def confirmar_duplicados(self, duplicados, pregunta):
+        """Muestra los clientes con el mismo email o teléfono y pide confirmación"""
+        lineas = "\n".join(f"• {c['codigo']} - {c['nombre']} {c['apellido']} ({c['email']}, {c['telefono']})"
+                           for c in duplicados)
+        return self.view.mostrar_mensaje("question", "Posible Cliente Duplicado",
+                                         f"Ya hay clientes con el mismo email o teléfono:\n\n{lineas}\n\n{pregunta}")
     
     def actualizar_cliente(self):
         """Actualiza los datos de un cliente existente"""
@@ -110,29 +121,44 @@ class ClienteController:
             self.view.mostrar_mensaje("error", "Error de Validación", mensaje_error)
             return
         
-        # Confirmar actualización
-        confirmar = self.view.mostrar_mensaje("question", "Confirmar Actualización", 
-                                             f"¿Está seguro que desea actualizar el cliente {datos['codigo']}?")
-        
-        if confirmar:
-            exito = self.model.actualizar_cliente(
-                int(datos['codigo']),
-                datos['nombre'], 
-                datos['apellido'], 
-                datos['email'], 
-                datos['telefono'], 
-                datos['direccion']
-            )
-            
-            if exito:
-                self.view.mostrar_mensaje("info", "Cliente Actualizado", 
-                                         f"Cliente {datos['codigo']} actualizado exitosamente.")
-                self.actualizar_lista_clientes()
+        def al_verificar(duplicados):
+            # Confirmar actualización (si hay duplicados, el aviso ya la pide)
+            if duplicados:
+                confirmar = self.confirmar_duplicados(
+                    duplicados, f"¿Desea actualizar el cliente {datos['codigo']} de todas formas?")
             else:
-                self.view.mostrar_mensaje("error", "Error", "No se pudo actualizar el cliente")
+                confirmar = self.view.mostrar_mensaje("question", "Confirmar Actualización", 
+                                                     f"¿Está seguro que desea actualizar el cliente {datos['codigo']}?")
+            
+            if confirmar:
+                def al_actualizar(exito):
+                    if exito:
+                        self.view.mostrar_mensaje("info", "Cliente Actualizado", 
+                                                 f"Cliente {datos['codigo']} actualizado exitosamente.")
+                    else:
+                        self.view.mostrar_mensaje("error", "Error", "No se pudo actualizar el cliente")
+                
+                self.db.escribir(
+                    self.model.actualizar_cliente,
+                    int(datos['codigo']),
+                    datos['nombre'], 
+                    datos['apellido'], 
+                    datos['email'], 
+                    datos['telefono'], 
+                    datos['direccion'],
+                    al_terminar=al_actualizar
+                )
+        
+        self.db.leer(self.model.buscar_duplicados, datos['email'], datos['telefono'], int(datos['codigo']),
+                     al_terminar=al_verificar, clave="duplicados")
     
     def eliminar_cliente(self):
-        """Elimina un cliente"""
+        """Elimina un cliente (o todos los seleccionados en la lista)"""
+        codigos = self.view.obtener_clientes_seleccionados()
+        if len(codigos) > 1:
+            self.eliminar_clientes_seleccionados(codigos)
+            return
+        
         # Verificar si hay cliente seleccionado
         codigo_seleccionado = self.view.obtener_cliente_seleccionado()
         if not codigo_seleccionado:
@@ -149,31 +175,86 @@ class ClienteController:
                                          "Seleccione un cliente de la lista o búsquelo primero")
                 return
         
-        # Obtener datos del cliente para mostrar en confirmación
-        cliente = self.model.obtener_cliente(codigo_seleccionado)
-        if not cliente:
-            self.view.mostrar_mensaje("error", "Error", "Cliente no encontrado")
-            return
-        
-        # Confirmar eliminación
-        mensaje_confirmacion = (f"¿Está seguro que desea eliminar el cliente?\n\n"
-                               f"Código: {cliente['codigo']}\n"
-                               f"Nombre: {cliente['nombre']} {cliente['apellido']}\n"
-                               f"Email: {cliente['email']}\n\n"
-                               f"Esta acción no se puede deshacer.")
-        
-        confirmar = self.view.mostrar_mensaje("question", "Confirmar Eliminación", mensaje_confirmacion)
-        
-        if confirmar:
-            exito = self.model.eliminar_cliente(codigo_seleccionado)
-            
+        def al_eliminar(exito):
             if exito:
                 self.view.mostrar_mensaje("info", "Cliente Eliminado", 
                                          f"Cliente {codigo_seleccionado} eliminado exitosamente.")
                 self.limpiar_formulario()
-                self.actualizar_lista_clientes()
             else:
                 self.view.mostrar_mensaje("error", "Error", "No se pudo eliminar el cliente")
+        
+        def al_obtener(cliente):
+            if not cliente:
+                self.view.mostrar_mensaje("error", "Error", "Cliente no encontrado")
+                return
+            
+            # Confirmar eliminación
+            mensaje_confirmacion = (f"¿Está seguro que desea eliminar el cliente?\n\n"
+                                   f"Código: {cliente['codigo']}\n"
+                                   f"Nombre: {cliente['nombre']} {cliente['apellido']}\n"
+                                   f"Email: {cliente['email']}\n\n"
+                                   f"Esta acción no se puede deshacer.")
+            
+            confirmar = self.view.mostrar_mensaje("question", "Confirmar Eliminación", mensaje_confirmacion)
+            
+            if confirmar:
+                self.db.escribir(self.model.eliminar_cliente, codigo_seleccionado,
+                                 al_terminar=al_eliminar)
+        
+        # Obtener datos del cliente para mostrar en confirmación
+        self.db.leer(self.model.obtener_cliente, codigo_seleccionado, al_terminar=al_obtener)
+    
+    def eliminar_clientes_seleccionados(self, codigos):
+        """Elimina varios clientes con una sola confirmación y una sola transacción"""
+        confirmar = self.view.mostrar_mensaje("question", "Confirmar Eliminación",
+                                             f"¿Está seguro que desea eliminar los {len(codigos)} "
+                                             f"clientes seleccionados?\n\nEsta acción no se puede deshacer.")
+        if not confirmar:
+            return
+        
+        def al_eliminar(cantidad):
+            if cantidad is None:
+                self.view.mostrar_mensaje("error", "Error", "No se pudieron eliminar los clientes")
+            else:
+                self.view.mostrar_mensaje("info", "Clientes Eliminados",
+                                         f"{cantidad} clientes eliminados exitosamente.")
+                self.limpiar_formulario()
+        
+        self.db.escribir(self.model.eliminar_clientes, codigos, al_terminar=al_eliminar)
+    
+    def modificar_clientes_seleccionados(self):
+        """Pone el mismo valor en un campo de todos los clientes seleccionados"""
+        codigos = self.view.obtener_clientes_seleccionados()
+        if not codigos:
+            self.view.mostrar_mensaje("warning", "Sin Selección",
+                                     "Seleccione uno o más clientes de la lista (Ctrl o Shift + clic).")
+            return
+        
+        respuesta = self.view.pedir_campo_masivo(len(codigos))
+        if respuesta is None:
+            return
+        campo, valor = respuesta
+        
+        errores = validar_campo(campo, valor)
+        if errores:
+            mensaje_error = "Errores encontrados:\n\n" + "\n".join(f"• {error}" for error in errores)
+            self.view.mostrar_mensaje("error", "Error de Validación", mensaje_error)
+            return
+        
+        confirmar = self.view.mostrar_mensaje("question", "Confirmar Actualización",
+                                             f"¿Está seguro que desea poner {campo} = \"{valor}\" "
+                                             f"en los {len(codigos)} clientes seleccionados?")
+        if not confirmar:
+            return
+        
+        def al_actualizar(cantidad):
+            if cantidad is None:
+                self.view.mostrar_mensaje("error", "Error", "No se pudieron actualizar los clientes")
+            else:
+                self.view.mostrar_mensaje("info", "Clientes Actualizados",
+                                         f"{cantidad} clientes actualizados exitosamente.")
+        
+        self.db.escribir(self.model.actualizar_campo_masivo, codigos, campo, valor, al_terminar=al_actualizar)
     
     def buscar_cliente(self):
         """Busca un cliente por código"""
@@ -190,31 +271,91 @@ class ClienteController:
             self.view.mostrar_mensaje("error", "Error", "El código debe ser un número")
             return
         
+        def al_obtener(cliente):
+            if cliente:
+                # Cargar datos en formulario
+                self.view.cargar_cliente_en_formulario(cliente)
+                self.modo_edicion = True
+                
+                # Seleccionar en la lista si existe
+                self.seleccionar_cliente_en_lista(codigo)
+                
+                self.view.mostrar_mensaje("info", "Cliente Encontrado", 
+                                         f"Cliente {codigo} encontrado y cargado en el formulario.")
+            else:
+                self.view.mostrar_mensaje("warning", "Cliente No Encontrado", 
+                                         f"No se encontró ningún cliente con el código {codigo}")
+        
         # Buscar cliente
-        cliente = self.model.obtener_cliente(codigo)
+        self.db.leer(self.model.obtener_cliente, codigo, al_terminar=al_obtener, clave="cliente")
+    
+    def buscar_por_texto(self):
+        """Muestra en la lista los clientes que coinciden con el texto buscado"""
+        texto = self.view.obtener_texto_busqueda()
         
-        if cliente:
-            # Cargar datos en formulario
-            self.view.cargar_cliente_en_formulario(cliente)
-            self.modo_edicion = True
-            
-            # Seleccionar en la lista si existe
-            self.seleccionar_cliente_en_lista(codigo)
-            
-            self.view.mostrar_mensaje("info", "Cliente Encontrado", 
-                                     f"Cliente {codigo} encontrado y cargado en el formulario.")
-        else:
-            self.view.mostrar_mensaje("warning", "Cliente No Encontrado", 
-                                     f"No se encontró ningún cliente con el código {codigo}")
+        if not texto:
+            if self.mostrando_busqueda:
+                self.mostrar_todos_los_clientes()
+            return
+        
+        def al_encontrar(clientes):
+            self.mostrando_busqueda = True
+            self.view.cargar_lista_clientes(clientes)
+            self.view.set_titulo_lista(f"Resultados de búsqueda ({len(clientes)})")
+        
+        # Una búsqueda nueva cancela la anterior si todavía no terminó
+        self.db.leer(self.model.buscar_clientes, texto, self.LIMITE_BUSQUEDA,
+                     al_terminar=al_encontrar, clave="busqueda")
+    
+    def mostrar_todos_los_clientes(self, al_terminar=None):
+        """Vuelve a mostrar la lista completa de clientes; al_terminar recibe el total"""
+        self.mostrando_busqueda = False
+        self.db.cancelar("busqueda")
+        # La lista pide al modelo solo las filas que muestra
+        self.view.configurar_fuente_lista(self.contar_clientes_lista, self.obtener_filas_lista)
+        self.view.set_titulo_lista("Lista de Clientes (filtrada)" if self.consulta_lista.filtros
+                                   else "Lista de Clientes")
+        self.actualizar_lista_clientes(al_terminar)
+    
+    def ordenar_lista(self, columna):
+        """Ordena la lista por una columna (clic en el encabezado; otro clic invierte el sentido)"""
+        self.aplicar_consulta_lista(self.consulta_lista.con_orden(columna))
+    
+    def filtrar_lista(self):
+        """Aplica a la lista los filtros por columna escritos en la vista"""
+        try:
+            consulta = self.consulta_lista.con_filtros(self.view.obtener_filtros_lista())
+        except ValueError as e:
+            self.view.mostrar_mensaje("error", "Filtro Inválido", str(e))
+            return
+        # Teclas que no cambian el texto (flechas, Tab) no vuelven a consultar
+        if consulta.filtros != self.consulta_lista.filtros or self.mostrando_busqueda:
+            self.aplicar_consulta_lista(consulta)
+    
+    def aplicar_consulta_lista(self, consulta):
+        """Muestra la lista completa con otro orden o filtros (los resuelve SQLite)"""
+        self.consulta_lista = consulta
+        self.view.configurar_orden_lista(consulta.orden, consulta.descendente, consulta.clave,
+                                         consulta.orden_modificable())
+        self.mostrar_todos_los_clientes()
+    
+    def contar_clientes_lista(self, al_recibir):
+        """Fuente de la lista: total de clientes"""
+        self.db.leer(self.model.contar_clientes, self.consulta_lista,
+                     al_terminar=al_recibir, clave="lista-total")
+    
+    def obtener_filas_lista(self, posicion, cantidad, ancla, al_recibir):
+        """Fuente de la lista: filas a partir de una posición"""
+        self.db.leer(self.model.listar_clientes_en_posicion, posicion, cantidad, ancla, self.consulta_lista,
+                     al_terminar=al_recibir, clave="lista-filas")
     
     def seleccionar_cliente_en_lista(self, codigo):
         """Selecciona un cliente específico en la lista"""
-        for item in self.view.tree_clientes.get_children():
-            valores = self.view.tree_clientes.item(item)['values']
-            if valores and int(valores[0]) == codigo:
-                self.view.tree_clientes.selection_set(item)
-                self.view.tree_clientes.see(item)
-                break
+        # Si ya está en pantalla se selecciona directo por su iid; si no, se
+        # desplaza la lista hasta él a partir de su posición estimada
+        if not self.view.seleccionar_cliente(codigo):
+            self.db.leer(self.model.estimar_posicion_de_cliente, codigo, self.consulta_lista,
+                         al_terminar=lambda posicion: self.view.seleccionar_cliente(codigo, posicion))
     
     def limpiar_formulario(self):
         """Limpia el formulario y resetea el modo"""
@@ -222,35 +363,105 @@ class ClienteController:
         self.modo_edicion = False
         
         # Limpiar selección de la lista
-        self.view.tree_clientes.selection_remove(self.view.tree_clientes.selection())
+        self.view.limpiar_seleccion()
     
-    def actualizar_lista_clientes(self):
-        """Actualiza la lista de clientes desde la base de datos"""
-        clientes = self.model.obtener_todos_clientes()
-        self.view.cargar_lista_clientes(clientes)
+    def actualizar_lista_clientes(self, al_terminar=None):
+        """Actualiza la lista de clientes (solo se leen las filas visibles).
+        
+        al_terminar, si se indica, recibe el total cuando las filas visibles ya
+        están en pantalla.
+        """
+        if self.mostrando_busqueda:
+            self.buscar_por_texto()
+            return
         
-        if not clientes:
-            print("LOG: No hay clientes registrados en el sistema")
+        def al_recargar(total):
+            if not total:
+                log.info("No hay clientes registrados en el sistema")
+            else:
+                log.debug("Lista actualizada con %d clientes", total)
+            if al_terminar:
+                al_terminar(total)
+        
+        self.view.recargar_lista(al_recargar)
+    
+    def cancelar_consultas(self):
+        """Cancela las consultas en curso (tecla Escape)"""
+        self.db.cancelar_lecturas()
+        self.view.cancelar_carga_lista()
+        log.info("Consultas en curso canceladas")
+    
+    def mostrar_estadisticas(self):
+        """Abre la ventana de estadísticas de rendimiento (F12)"""
+        if not metricas.activas:
+            self.view.mostrar_mensaje("info", "Estadísticas",
+                                      "La medición de tiempos está desactivada.\n\n"
+                                      "Ejecute: python main.py --metricas\n"
+                                      "(o defina la variable SANDTECH_METRICAS=1)")
+            return
+        self.view.abrir_ventana_estadisticas(metricas.resumen, metricas.reiniciar)
+    
+    def on_error_base_datos(self, error):
+        """Informa un error inesperado ocurrido en el hilo de la base de datos"""
+        log.error("Error en operación de base de datos: %s", error, exc_info=error)
+        self.view.mostrar_mensaje("error", "Error", f"Error inesperado en la base de datos:\n{error}")
+    
+    def on_cambio_modelo(self, tipo, codigo, valores):
+        """Recibe los cambios del modelo y los aplica a la lista de a uno"""
+        if self.mostrando_busqueda:
+            # Los resultados están ordenados por relevancia: se repite la búsqueda
+            self.buscar_por_texto()
+        elif tipo in ("update_masivo", "delete_masivo"):
+            self.aplicar_cambio_masivo(tipo, codigo, valores)
+        elif not self.consulta_lista.filtros:
+            self.view.aplicar_cambio_cliente(tipo, codigo, valores)
+        elif tipo == "update":
+            # Con filtros, una modificación puede hacer entrar o salir la fila
+            # del resultado: se vuelven a leer el total y las filas visibles
+            self.actualizar_lista_clientes()
+        elif self.consulta_lista.coincide(valores):
+            self.view.aplicar_cambio_cliente(tipo, codigo, valores)
+    
+    def aplicar_cambio_masivo(self, tipo, codigos, valores):
+        """Aplica a la lista, de una sola vez, una operación sobre varios clientes"""
+        if tipo == "update_masivo":
+            if self.consulta_lista.orden in valores or self.consulta_lista.filtros.keys() & valores.keys():
+                # Las filas pueden cambiar de lugar o salir del resultado
+                self.actualizar_lista_clientes()
+            else:
+                self.view.aplicar_cambio_masivo_clientes(tipo, codigos, valores)
         else:
-            print(f"LOG: Lista actualizada con {len(clientes)} clientes")
+            if self.consulta_lista.filtros:
+                valores = [cliente for cliente in valores if self.consulta_lista.coincide(cliente)]
+                codigos = [cliente['codigo'] for cliente in valores]
+            self.view.aplicar_cambio_masivo_clientes(tipo, codigos, valores)
     
     def on_cliente_seleccionado(self):
         """Maneja la selección de un cliente en la lista"""
         codigo_seleccionado = self.view.obtener_cliente_seleccionado()
         
         if codigo_seleccionado:
-            # Obtener datos completos del cliente
-            cliente = self.model.obtener_cliente(codigo_seleccionado)
+            def al_obtener(cliente):
+                if cliente:
+                    # Cargar en formulario
+                    self.view.cargar_cliente_en_formulario(cliente)
+                    self.modo_edicion = True
+                    
+                    # Actualizar campo de búsqueda
+                    self.view.var_buscar_codigo.set(str(codigo_seleccionado))
+                else:
+                    self.view.mostrar_mensaje("error", "Error", "No se pudieron cargar los datos del cliente")
             
-            if cliente:
-                # Cargar en formulario
-                self.view.cargar_cliente_en_formulario(cliente)
-                self.modo_edicion = True
-                
-                # Actualizar campo de búsqueda
-                self.view.var_buscar_codigo.set(str(codigo_seleccionado))
-            else:
-                self.view.mostrar_mensaje("error", "Error", "No se pudieron cargar los datos del cliente")
+            # Obtener datos completos del cliente (si se cambia de fila antes de
+            # que llegue, se descarta la consulta anterior)
+            self.db.leer(self.model.obtener_cliente, codigo_seleccionado,
+                         al_terminar=al_obtener, clave="cliente")
+    
+    def cerrar(self):
+        """Libera los recursos del modelo al cerrar la aplicación"""
+        # Primero se esperan las escrituras pendientes, después se cierran las conexiones
+        self.db.cerrar()
+        self.model.cerrar()
     
     def validar_codigo_numerico(self, codigo_str):
         """Valida que el código sea un número válido"""
@@ -0,0 +1,79 @@
+# deduplicar_clientes.py
+"""
+SandTech - Búsqueda de clientes casi duplicados
+Recorre toda la base y busca clientes que probablemente sean el mismo
+(errores de tipeo en nombre o apellido, teléfonos escritos distinto, otra
+dirección). Solo se comparan clientes que comparten apellido fonético, final
+del teléfono o parte local del email, repartiendo el trabajo en varios
+procesos. Muestra los grupos encontrados del más probable al menos probable;
+no modifica la base.
+
+Uso: python deduplicar_clientes.py [--umbral 0.8] [--procesos 4] [--mostrar 20] [--salida grupos.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente_model import ClienteModel
+from model.deduplicacion import buscar_grupos_duplicados
+from model.registro import configurar_registro
+
+def mostrar_progreso(etapa, hechos, total):
+    """Progreso en una sola línea de la consola"""
+    if etapa == "lectura":
+        mensaje = f"Leyendo clientes: {hechos:,}"
+    else:
+        mensaje = f"Comparando: {hechos}/{total} tareas ({hechos * 100 // total}%)"
+    print(f"\r{mensaje:<60}", end="", file=sys.stderr, flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Búsqueda de clientes casi duplicados SandTech")
+    parser.add_argument("--db", default="sandtech_clientes.db", help="Base de datos a revisar")
+    parser.add_argument("--umbral", type=float, default=0.8, help="Similitud mínima de un par (0 a 1)")
+    parser.add_argument("--procesos", type=int, help="Procesos de comparación (por defecto, uno por CPU)")
+    parser.add_argument("--mostrar", type=int, default=20, help="Grupos a mostrar en consola")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar todos los grupos")
+    args = parser.parse_args(argv)
+    
+    configurar_registro()
+    model = ClienteModel(args.db, tamano_cache=0)
+    try:
+        inicio = time.perf_counter()
+        total = model.contar_clientes()
+        grupos = buscar_grupos_duplicados(model.exportar_clientes(), args.umbral, args.procesos,
+                                          mostrar_progreso)
+        duracion = time.perf_counter() - inicio
+        print(file=sys.stderr)
+        
+        print("=" * 60)
+        print(f"Clientes revisados: {total}")
+        print(f"Grupos de posibles duplicados: {len(grupos)} "
+              f"({sum(len(grupo['codigos']) for grupo in grupos)} clientes)")
+        print(f"Tiempo: {duracion:.2f} s ({total / duracion if duracion else 0:.0f} filas/s)")
+        
+        for numero, grupo in enumerate(grupos[:args.mostrar], start=1):
+            print(f"\n{numero}. Similitud {grupo['puntaje']:.2f}")
+            for codigo in grupo['codigos']:
+                cliente = model.obtener_cliente(codigo)
+                if cliente:
+                    print(f"   {codigo:>8}  {cliente.nombre} {cliente.apellido} | {cliente.email} | "
+                          f"{cliente.telefono} | {cliente.direccion}")
+        print("=" * 60)
+    finally:
+        model.cerrar()
+    
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(grupos, archivo, indent=2, ensure_ascii=False)
+        print(f"Grupos guardados en {args.salida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
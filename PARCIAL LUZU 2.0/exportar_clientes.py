@@ -0,0 +1,63 @@
+# exportar_clientes.py
+"""
+SandTech - Exportación de la base de clientes
+Recorre la tabla con un único cursor, de a lotes, y escribe los clientes en
+CSV, JSONL o una instantánea binaria compacta (que importar_clientes.py
+vuelve a cargar con sus códigos originales). La memoria usada no depende de
+la cantidad de clientes.
+
+Uso: python exportar_clientes.py clientes.csv [--formato csv|jsonl|bin] [--lote 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente_model import ClienteModel
+from model.exportacion import ESCRITORES
+from model.registro import configurar_registro
+
+def detectar_formato(ruta):
+    """Deduce el formato del archivo a partir de su extensión"""
+    extension = os.path.splitext(ruta)[1].lower().lstrip('.')
+    if extension == 'json':
+        return 'jsonl'
+    return extension if extension in ESCRITORES else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportación de clientes SandTech")
+    parser.add_argument("archivo", help="Archivo destino")
+    parser.add_argument("--formato", choices=sorted(ESCRITORES), help="Formato del archivo (por defecto según la extensión)")
+    parser.add_argument("--db", default="sandtech_clientes.db", help="Base de datos origen")
+    parser.add_argument("--lote", type=int, default=5000, help="Filas leídas por vez")
+    args = parser.parse_args(argv)
+    
+    formato = args.formato or detectar_formato(args.archivo)
+    if formato is None:
+        print("No se pudo determinar el formato del archivo. Use --formato csv|jsonl|bin")
+        return 1
+    
+    configurar_registro()
+    model = ClienteModel(args.db)
+    try:
+        inicio = time.perf_counter()
+        total = ESCRITORES[formato](model.exportar_clientes(args.lote), args.archivo)
+        duracion = time.perf_counter() - inicio
+    finally:
+        model.cerrar()
+    
+    tamano = os.path.getsize(args.archivo)
+    print("=" * 60)
+    print(f"Clientes exportados: {total}")
+    print(f"Archivo: {args.archivo} ({formato}, {tamano / 1e6:.1f} MB)")
+    print(f"Tiempo: {duracion:.2f} s ({total / duracion if duracion else 0:.0f} filas/s)")
+    print("=" * 60)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# importar_clientes.py
+"""
+SandTech - Importación masiva de clientes
+Lee un archivo CSV o JSONL de forma incremental (nunca lo carga completo
+en memoria) e inserta los clientes válidos en lotes. Las instantáneas
+binarias de exportar_clientes.py se cargan sin revalidar y conservando los
+códigos originales.
+
+Para revisar un archivo grande antes de importarlo (sin tocar la base):
+python validar_clientes.py clientes.csv --reporte errores.csv
+
+Uso: python importar_clientes.py clientes.csv [--formato csv|jsonl|bin] [--lote 1000] [--reporte errores.csv]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente_model import ClienteModel
+from model.exportacion import leer_binario
+from model.registro import configurar_registro
+from model.validacion_masiva import escribir_reporte
+
+def leer_csv(ruta):
+    """Genera un dict por cada fila del CSV (la primera fila es el encabezado)"""
+    with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+        yield from csv.DictReader(archivo)
+
+def leer_jsonl(ruta):
+    """Genera un dict por cada línea no vacía del archivo JSONL"""
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError:
+                # Se devuelve tal cual; el modelo la rechaza por formato inválido
+                yield linea
+
+LECTORES = {
+    'csv': leer_csv,
+    'jsonl': leer_jsonl,
+    'bin': leer_binario,
+}
+
+def detectar_formato(ruta):
+    """Deduce el formato del archivo a partir de su extensión"""
+    extension = os.path.splitext(ruta)[1].lower().lstrip('.')
+    if extension == 'json':
+        return 'jsonl'
+    return extension if extension in LECTORES else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importación masiva de clientes SandTech")
+    parser.add_argument("archivo", help="Archivo CSV, JSONL o instantánea binaria con los clientes a importar")
+    parser.add_argument("--formato", choices=sorted(LECTORES), help="Formato del archivo (por defecto según la extensión)")
+    parser.add_argument("--db", default="sandtech_clientes.db", help="Base de datos destino")
+    parser.add_argument("--lote", type=int, default=1000, help="Filas por transacción")
+    parser.add_argument("--reporte", help="Archivo CSV donde guardar los errores de cada fila rechazada")
+    args = parser.parse_args(argv)
+    
+    formato = args.formato or detectar_formato(args.archivo)
+    if formato is None:
+        print("No se pudo determinar el formato del archivo. Use --formato csv|jsonl|bin")
+        return 1
+    
+    configurar_registro()
+    model = ClienteModel(args.db)
+    try:
+        inicio = time.perf_counter()
+        if formato == 'bin':
+            insertados, rechazados = model.cargar_clientes(leer_binario(args.archivo)), []
+        else:
+            insertados, rechazados = model.crear_clientes_bulk(LECTORES[formato](args.archivo),
+                                                               tamano_lote=args.lote)
+        duracion = time.perf_counter() - inicio
+    except ValueError as e:
+        # Instantánea binaria inválida o cortada: la carga se revirtió completa
+        print(f"No se pudo importar: {e}")
+        return 1
+    except sqlite3.Error as e:
+        # Base bloqueada u otro error de SQLite durante la carga (un código
+        # repetido no es error: se reemplaza). La carga se revirtió completa
+        print(f"No se pudo importar: {e}")
+        return 1
+    finally:
+        model.cerrar()
+    
+    total = insertados + len(rechazados)
+    print("=" * 60)
+    print(f"Filas procesadas: {total}")
+    print(f"Clientes importados: {insertados}")
+    print(f"Filas rechazadas: {len(rechazados)}")
+    print(f"Tiempo: {duracion:.2f} s ({total / duracion if duracion else 0:.0f} filas/s)")
+    
+    if rechazados and args.reporte:
+        escribir_reporte(args.reporte, rechazados)
+        print(f"Reporte de filas rechazadas guardado en {args.reporte}")
+    elif rechazados:
+        print("\nFilas rechazadas:")
+        for numero, errores in rechazados:
+            print(f"  Fila {numero}: {'; '.join(errores)}")
+    print("=" * 60)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
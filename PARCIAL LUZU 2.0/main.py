@@ -8,35 +8,105 @@ Autor: Sistema de Gestión SandTech
 Fecha: 2024
 """
 
+import time
+
+# Referencia de los tiempos de arranque (primer dibujo e interfaz lista)
+INICIO_ARRANQUE = time.perf_counter()
+
+import logging
 import tkinter as tk
 import sys
 import os
+import threading
 
 # Agregar el directorio raíz al path para imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Antes del primer dibujo solo se importa la vista; el modelo y el controlador
+# (SQLite, validaciones, métricas) se importan en segundo plano con la ventana
+# ya en pantalla (ver SandTechApp.abrir_base)
 try:
+    from model.registro import configurar_registro, detener_registro
     from view.cliente_view import ClienteView
-    from controller.cliente_controller import ClienteController
 except ImportError as e:
+    print(f"Error al importar módulos: {e}")
+    print("Asegúrese de que los archivos estén en las carpetas correctas:")
+    print("- view/cliente_view.py")
+    print("- model/registro.py")
+    sys.exit(1)
+
+log = logging.getLogger("sandtech.app")
+
+# Archivo donde se guardan las métricas al cerrar (con --metricas)
+ARCHIVO_METRICAS = "sandtech_metricas.json"
+
+def informar_error_importacion(e):
+    """Explica qué falta cuando no se pudo importar el modelo o el controlador"""
     print(f"Error al importar módulos: {e}")
     print("Asegúrese de que los archivos estén en las carpetas correctas:")
     print("- view/cliente_view.py")
     print("- controller/cliente_controller.py") 
     print("- model/cliente_model.py")
-    sys.exit(1)
+    # Solo ante un error: en un arranque normal no se revisa la estructura
+    verificar_estructura_proyecto()
+
+def activar_metricas():
+    """Instrumenta las consultas, los manejadores y el dibujo de la lista.
+    
+    Separa el tiempo de SQLite (modelo), el dibujo del Treeview (lista) y el total de cada acción del usuario
+    (controlador). Sin activarla el código corre sin ninguna medición.
+    """
+    from model.cliente_model import ClienteModel
+    from model.metricas import metricas
+    from model.modelo_asincrono import ModeloAsincrono
+    from view.lista_virtual import ListaVirtual
+    from controller.cliente_controller import ClienteController
+    
+    metricas.instrumentar(ClienteModel, (
+        'crear_cliente', 'crear_clientes_bulk', 'obtener_cliente', 'obtener_todos_clientes',
+        'buscar_clientes', 'listar_clientes', 'listar_clientes_en_posicion',
+        'estimar_posicion_de_cliente', 'contar_clientes', 'actualizar_cliente',
+        'eliminar_cliente', 'eliminar_clientes', 'actualizar_campo_masivo', 'get_next_codigo',
+        'cambios_desde', 'compactar_cambios', 'aplicar_cambios_replicados'), "modelo")
+    metricas.instrumentar(ClienteController, (
+        'nuevo_cliente', 'guardar_cliente', 'actualizar_cliente', 'eliminar_cliente',
+        'buscar_cliente', 'buscar_por_texto', 'mostrar_todos_los_clientes',
+        'actualizar_lista_clientes', 'on_cliente_seleccionado', 'on_cambio_modelo',
+        'limpiar_formulario', 'ordenar_lista', 'filtrar_lista', 'eliminar_clientes_seleccionados',
+        'modificar_clientes_seleccionados'), "controlador")
+    metricas.instrumentar(ListaVirtual, ('render', '_sincronizar_items', 'aplicar_cambio',
+                                         'aplicar_cambio_masivo'), "lista")
+    metricas.instrumentar(ModeloAsincrono, ('_procesar_resultados',), "asincrono")
 
 class SandTechApp:
-    """Clase principal de la aplicación SandTech"""
+    """Clase principal de la aplicación SandTech.
+    
+    El arranque tiene dos etapas: primero se crea y dibuja la ventana, después
+    un hilo importa el modelo y el controlador y abre la base mientras la
+    ventana ya está en pantalla. La primera página de la lista se carga de
+    forma asíncrona como cualquier otra consulta.
+    """
     
-    def __init__(self):
+    # Cada cuántos ms se revisa si el hilo de arranque terminó
+    INTERVALO_ARRANQUE = 15
+    
+    def __init__(self, medir_metricas=False):
         """Inicializa la aplicación"""
         self.root = None
         self.view = None
         self.controller = None
+        self.medir_metricas = medir_metricas
+        # Segundos desde INICIO_ARRANQUE: primer_dibujo, base_abierta, interactiva
+        self.tiempos_arranque = {}
+        # (modelo, error) que deja el hilo de arranque al terminar
+        self._apertura = None
+        # Si la ventana se cierra antes de que termine el arranque, el modelo
+        # lo cierra quien llegue último: el hilo de arranque o cerrar_aplicacion
+        self._cerrando = False
+        self._lock_apertura = threading.Lock()
         
     def inicializar_aplicacion(self):
-        """Inicializa todos los componentes de la aplicación"""
+        """Crea y dibuja la ventana; la base se abre después, sin bloquearla"""
         try:
             # Crear ventana principal
             self.root = tk.Tk()
@@ -44,11 +114,17 @@ class SandTechApp:
             # Configurar la ventana principal
             self.configurar_ventana_principal()
             
-            # Crear vista
+            # Crear vista (sin controlador, los botones todavía no hacen nada)
             self.view = ClienteView(self.root)
+            self.view.set_titulo_lista("Lista de Clientes (cargando...)")
+            
+            # Primer dibujo: la ventana aparece antes de tocar la base de datos
+            self.root.update()
+            self.marcar_arranque("primer_dibujo")
             
-            # Crear controlador (se conecta automáticamente con la vista)
-            self.controller = ClienteController(self.view)
+            self.view.set_ocupado(True)
+            threading.Thread(target=self.abrir_base, name="sandtech-arranque", daemon=True).start()
+            self.root.after(self.INTERVALO_ARRANQUE, self.esperar_base)
             
             print("="*60)
             print("    SANDTECH - SISTEMA DE GESTIÓN DE CLIENTES")
@@ -57,6 +133,7 @@ class SandTechApp:
             print("Arquitectura: Modelo-Vista-Controlador (MVC)")
             print("Base de datos: SQLite")
             print("Interfaz gráfica: Tkinter")
+            print(f"Ventana dibujada en {self.tiempos_arranque['primer_dibujo'] * 1000:.0f} ms")
             print("="*60)
             
             return True
@@ -65,6 +142,69 @@ class SandTechApp:
             print(f"Error al inicializar la aplicación: {e}")
             return False
     
+    def abrir_base(self):
+        """Corre en el hilo de arranque: importa el modelo y el controlador y abre la base"""
+        try:
+            from model.cliente_model import ClienteModel
+            import controller.cliente_controller  # Queda importado para esperar_base
+            
+            if self.medir_metricas:
+                activar_metricas()
+            apertura = (ClienteModel(), None)
+        except Exception as e:
+            apertura = (None, e)
+        
+        with self._lock_apertura:
+            if not self._cerrando:
+                self._apertura = apertura
+                return
+        # La ventana ya se cerró: nadie va a usar el modelo
+        if apertura[0] is not None:
+            apertura[0].cerrar()
+    
+    def esperar_base(self):
+        """Corre en el hilo de Tk: cuando la base está abierta crea el controlador"""
+        if self._apertura is None:
+            self.root.after(self.INTERVALO_ARRANQUE, self.esperar_base)
+            return
+        
+        model, error = self._apertura
+        self.view.set_ocupado(False)
+        if error is not None:
+            if isinstance(error, ImportError):
+                informar_error_importacion(error)
+            else:
+                print(f"Error al abrir la base de datos: {error}")
+            self.view.mostrar_mensaje("error", "Error de Inicio",
+                                      f"No se pudo iniciar la aplicación:\n{error}")
+            self.cerrar_aplicacion()
+            return
+        
+        self.marcar_arranque("base_abierta")
+        from controller.cliente_controller import ClienteController
+        
+        # Crear controlador (se conecta automáticamente con la vista y pide la primera página)
+        self.controller = ClienteController(self.view, model, al_cargar=self.on_primera_pagina)
+    
+    def on_primera_pagina(self, total):
+        """La primera página de la lista está en pantalla: la aplicación ya se puede usar"""
+        self.marcar_arranque("interactiva")
+        tiempos_ms = {etapa: round(segundos * 1000, 1) for etapa, segundos in self.tiempos_arranque.items()}
+        print(f"Arranque: ventana en {tiempos_ms['primer_dibujo']:.0f} ms, "
+              f"lista en {tiempos_ms['interactiva']:.0f} ms ({total} clientes)")
+        log.info("Arranque: primer dibujo %.0f ms, interactiva %.0f ms",
+                 tiempos_ms['primer_dibujo'], tiempos_ms['interactiva'],
+                 extra={'datos': {'arranque_ms': tiempos_ms, 'clientes': total}})
+        
+        from model.metricas import metricas
+        if metricas.activas:
+            for etapa, ms in tiempos_ms.items():
+                metricas.registrar(f"arranque.{etapa}", ms)
+    
+    def marcar_arranque(self, etapa):
+        """Guarda cuánto tardó el arranque en llegar a la etapa"""
+        self.tiempos_arranque[etapa] = time.perf_counter() - INICIO_ARRANQUE
+    
     def configurar_ventana_principal(self):
         """Configura las propiedades de la ventana principal"""
         # Centrar la ventana en la pantalla
@@ -105,8 +245,21 @@ class SandTechApp:
             print("\n" + "="*60)
             print("Cerrando aplicación SandTech...")
             
-            # Aquí podrías agregar lógica adicional de limpieza si fuera necesaria
-            # Por ejemplo, cerrar conexiones de base de datos, guardar configuraciones, etc.
+            # Cerrar las conexiones persistentes a la base de datos. Si el
+            # controlador todavía no se creó, el modelo es de self._apertura
+            # (o lo cierra el hilo de arranque cuando termine)
+            with self._lock_apertura:
+                self._cerrando = True
+                apertura = self._apertura
+            if self.controller:
+                self.controller.cerrar()
+            elif apertura is not None and apertura[0] is not None:
+                apertura[0].cerrar()
+            
+            from model.metricas import metricas
+            if metricas.activas:
+                metricas.guardar_json(ARCHIVO_METRICAS)
+                print(f"Métricas de rendimiento guardadas en {ARCHIVO_METRICAS}")
             
             print("Aplicación cerrada correctamente")
             print("="*60)
@@ -172,6 +325,18 @@ def mostrar_ayuda():
     print("="*60)
     print("\nEstructura del proyecto (Arquitectura MVC):")
     print("├── main.py                     # Archivo principal")
+    print("├── importar_clientes.py        # Importación masiva CSV/JSONL")
+    print("├── exportar_clientes.py        # Exportación a CSV/JSONL/binario")
+    print("├── deduplicar_clientes.py      # Búsqueda de clientes casi duplicados")
+    print("├── validar_clientes.py         # Validación de archivos grandes antes de importarlos")
+    print("├── sincronizar_clientes.py     # Sincronización entre las bases de dos sedes")
+    print("├── prueba_concurrencia.py      # Prueba de varias instancias escribiendo a la vez")
+    print("├── prueba_replicacion.py       # Prueba de sincronización y colisiones entre sedes")
+    print("├── servidor_clientes.py        # Servicio HTTP/JSON para otros sistemas")
+    print("├── prueba_carga.py             # Prueba de carga del servicio HTTP")
+    print("├── prueba_servidor.py          # Prueba de las respuestas de error del servicio HTTP")
+    print("├── benchmark/                  # Medición de rendimiento: python -m benchmark")
+    print("│   └── controlador.py          # Punta a punta con vista simulada: python -m benchmark.controlador")
     print("├── model/")
     print("│   ├── __init__.py")
     print("│   └── cliente_model.py        # Lógica de datos")
@@ -185,10 +350,25 @@ def mostrar_ayuda():
     print("\nFuncionalidades disponibles:")
     print("• Crear nuevos clientes (código automático desde 100)")
     print("• Buscar clientes por código")
+    print("• Buscar clientes por nombre, apellido, email o dirección")
     print("• Modificar datos de clientes existentes")
     print("• Eliminar clientes")
+    print("• Seleccionar varios clientes (Ctrl o Shift + clic) para eliminarlos o modificar un campo de todos a la vez")
     print("• Listar todos los clientes")
-    print("• Log de transacciones en consola")
+    print("• Ordenar la lista con clic en los encabezados y filtrar por columna")
+    print("• Importar clientes en lote: python importar_clientes.py archivo.csv")
+    print("• Exportar todos los clientes: python exportar_clientes.py clientes.csv|.jsonl|.bin")
+    print("• Buscar clientes casi duplicados en toda la base: python deduplicar_clientes.py")
+    print("• Validar un archivo antes de importarlo: python validar_clientes.py archivo.csv --reporte errores.csv")
+    print("• Servicio HTTP/JSON: python servidor_clientes.py --puerto 8080")
+    print("  Otros sistemas se sincronizan con GET /cambios?desde=<versión> (solo lo que cambió)")
+    print("• Sincronizar sucursales: python sincronizar_clientes.py --sede 1 centro.db (una vez por base)")
+    print("  y después python sincronizar_clientes.py centro.db norte.db (solo viaja lo que cambió)")
+    print("• Log de transacciones en consola y en sandtech.log (una línea JSON por registro)")
+    print("  Nivel de detalle: SANDTECH_LOG_NIVEL=DEBUG|INFO|WARNING (por defecto INFO)")
+    print("• Estadísticas de rendimiento (F12): python main.py --metricas")
+    print("• La ventana aparece antes de abrir la base; al iniciar se informa el tiempo hasta")
+    print("  el primer dibujo y hasta que la lista está en pantalla (también en sandtech.log)")
     print("\nPara ejecutar: python main.py")
     print("="*60)
 
@@ -198,14 +378,15 @@ if __name__ == "__main__":
         mostrar_ayuda()
         sys.exit(0)
     
-    # Verificar estructura del proyecto
-    if not verificar_estructura_proyecto():
-        print("\nPor favor, corrija la estructura del proyecto antes de ejecutar.")
-        sys.exit(1)
+    # El log se escribe desde un hilo en segundo plano
+    configurar_registro()
+    
+    # Las métricas se activan en el hilo de arranque, junto con los imports del modelo
+    medir_metricas = bool("--metricas" in sys.argv[1:] or os.environ.get("SANDTECH_METRICAS"))
     
     try:
         # Crear y ejecutar aplicación
-        app = SandTechApp()
+        app = SandTechApp(medir_metricas)
         app.ejecutar()
         
     except KeyboardInterrupt:
@@ -215,4 +396,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\nError crítico en la aplicación: {e}")
         print("Revise los archivos del proyecto y la configuración")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    
+    finally:
+        detener_registro()
\ No newline at end of file
@@ -0,0 +1,81 @@
+# model/cache_clientes.py
+import threading
+import time
+from collections import OrderedDict
+
+class CacheClientes:
+    """Caché LRU de clientes por código, con vencimiento por tiempo.
+    
+    Se comparte entre los hilos lectores, así que todas las operaciones toman
+    un lock. Los clientes son tuplas inmutables (Cliente), así que se guardan
+    y devuelven sin copiarlos.
+    """
+    
+    def __init__(self, tamano=256, ttl=30.0):
+        self.tamano = tamano
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()  # codigo -> (vence, cliente)
+        self._generacion = 0
+        self._lock = threading.Lock()
+    
+    def generacion(self):
+        """Marca a tomar antes de consultar la base, para pasarla luego a guardar()"""
+        with self._lock:
+            return self._generacion
+    
+    def obtener(self, codigo):
+        """Devuelve el cliente si está en caché y no venció, o None"""
+        with self._lock:
+            entrada = self._entradas.get(codigo)
+            if entrada is not None:
+                vence, cliente = entrada
+                if vence > time.monotonic():
+                    self._entradas.move_to_end(codigo)
+                    self.aciertos += 1
+                    return cliente
+                del self._entradas[codigo]
+            self.fallos += 1
+            return None
+    
+    def guardar(self, codigo, cliente, generacion):
+        """Guarda un cliente leído de la base.
+        
+        Si hubo una invalidación desde que se tomó la generación, el dato puede
+        ser anterior a esa escritura y no se guarda.
+        """
+        if self.tamano <= 0:
+            return
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._entradas[codigo] = (time.monotonic() + self.ttl, cliente)
+            self._entradas.move_to_end(codigo)
+            while len(self._entradas) > self.tamano:
+                self._entradas.popitem(last=False)
+    
+    def invalidar(self, codigo):
+        """Descarta el cliente indicado (llamar después de modificarlo en la base)"""
+        with self._lock:
+            self._generacion += 1
+            self._entradas.pop(codigo, None)
+    
+    def limpiar(self):
+        """Descarta todo el contenido y reinicia los contadores"""
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+    
+    def estadisticas(self):
+        """Devuelve aciertos, fallos, tasa de aciertos y cantidad de entradas"""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'entradas': len(self._entradas),
+            }
@@ -0,0 +1,47 @@
+# model/cliente.py
+from collections import namedtuple
+
+# Columnas de la tabla clientes, en el orden en que se seleccionan
+COLUMNAS_CLIENTE = ('codigo', 'nombre', 'apellido', 'email', 'telefono', 'direccion', 'fecha_registro')
+
+_INDICES = {nombre: indice for indice, nombre in enumerate(COLUMNAS_CLIENTE)}
+
+class Cliente(namedtuple('_Cliente', COLUMNAS_CLIENTE)):
+    """Un cliente leído de la base, como tupla inmutable.
+    
+    Ocupa bastante menos que un dict por fila y se arma directamente en el
+    row_factory de sqlite3. Admite cliente.nombre y también cliente['nombre'],
+    get, keys e items como un dict, así que dict(cliente) y el código que
+    esperaba dicts siguen funcionando. Al ser inmutable, para cambiar campos
+    se usa cliente._replace(nombre=...). Recorrerlo devuelve los valores,
+    como cualquier tupla.
+    """
+    
+    __slots__ = ()
+    
+    def __getitem__(self, clave):
+        if clave.__class__ is str:
+            try:
+                clave = _INDICES[clave]
+            except KeyError:
+                raise KeyError(clave) from None
+        return tuple.__getitem__(self, clave)
+    
+    def __contains__(self, clave):
+        return clave in _INDICES
+    
+    def keys(self):
+        return self._fields
+    
+    def get(self, clave, por_defecto=None):
+        indice = _INDICES.get(clave)
+        return por_defecto if indice is None else tuple.__getitem__(self, indice)
+    
+    def items(self):
+        return zip(self._fields, self)
+
+_nueva_tupla = tuple.__new__
+
+def fila_a_cliente(cursor, fila):
+    """row_factory de sqlite3: convierte la fila en Cliente sin copias intermedias"""
+    return _nueva_tupla(Cliente, fila)
@@ -1,206 +1,1162 @@
 # model/cliente_model.py
 import sqlite3
 import os
+import re
+import logging
 from datetime import datetime
+from model.cache_clientes import CacheClientes
+from model.cliente import COLUMNAS_CLIENTE, Cliente, fila_a_cliente
+from model.consulta_lista import COLUMNAS_TEXTO, ConsultaLista
+from model.conexion import GestorConexiones
+from model.validaciones import CAMPOS_CLIENTE, normalizar_email, normalizar_telefono, validar_fila
+
+log = logging.getLogger("sandtech.model")
 
 class ClienteModel:
-    def __init__(self, db_name="sandtech_clientes.db"):
+    # Distancia máxima (en filas) para navegar por clave desde un ancla conocida
+    MAX_SALTO_ANCLA = 1000
+    
+    # Índice de texto completo (FTS5) sobre los campos de búsqueda libre.
+    # unicode61 con remove_diacritics ignora acentos ("Pérez" = "perez") y
+    # prefix guarda índices extra para las búsquedas por prefijo cortas.
+    SQL_TRIGGERS_TEXTO = (
+        '''CREATE TRIGGER clientes_fts_ai AFTER INSERT ON clientes BEGIN
+               INSERT INTO clientes_fts(rowid, nombre, apellido, email, direccion)
+               VALUES (new.codigo, new.nombre, new.apellido, new.email, new.direccion);
+           END''',
+        '''CREATE TRIGGER clientes_fts_ad AFTER DELETE ON clientes BEGIN
+               INSERT INTO clientes_fts(clientes_fts, rowid, nombre, apellido, email, direccion)
+               VALUES ('delete', old.codigo, old.nombre, old.apellido, old.email, old.direccion);
+           END''',
+        # Solo las columnas indexadas: tocar otras no reindexa la fila
+        '''CREATE TRIGGER clientes_fts_au AFTER UPDATE OF nombre, apellido, email, direccion ON clientes BEGIN
+               INSERT INTO clientes_fts(clientes_fts, rowid, nombre, apellido, email, direccion)
+               VALUES ('delete', old.codigo, old.nombre, old.apellido, old.email, old.direccion);
+               INSERT INTO clientes_fts(rowid, nombre, apellido, email, direccion)
+               VALUES (new.codigo, new.nombre, new.apellido, new.email, new.direccion);
+           END''',
+    )
+    SQL_INDICE_TEXTO = (
+        '''CREATE VIRTUAL TABLE clientes_fts USING fts5(
+               nombre, apellido, email, direccion,
+               content='clientes', content_rowid='codigo',
+               tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+           )''',
+        *SQL_TRIGGERS_TEXTO,
+        # Indexar los clientes que ya existían antes de crear el índice
+        "INSERT INTO clientes_fts(clientes_fts) VALUES ('rebuild')",
+    )
+    
+    # Registro de cambios para que otros sistemas se sincronicen sin releer la
+    # tabla (ver cambios_desde). Los triggers anotan cada alta, modificación y
+    # baja con una versión creciente: AUTOINCREMENT no reutiliza versiones
+    # aunque compactar_cambios borre las últimas. Las columnas normalizadas
+    # se derivan de las demás, así que no cuentan como cambio. reloj y sede
+    # quedan en NULL en los cambios hechos en esta base; en los que llegan de
+    # otra sede guardan dónde y con qué reloj se hicieron (ver
+    # aplicar_cambios_replicados). Las bajas guardan la fecha de registro del
+    # cliente borrado, para que otra sede no borre un cliente distinto que
+    # tenga el mismo código
+    SQL_REGISTRO_CAMBIOS = (
+        '''CREATE TABLE IF NOT EXISTS cambios_clientes (
+               version INTEGER PRIMARY KEY AUTOINCREMENT,
+               codigo INTEGER NOT NULL,
+               operacion TEXT NOT NULL,
+               fecha TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+               reloj INTEGER,
+               sede INTEGER,
+               fecha_registro TEXT
+           )''',
+        # Último cambio de cada cliente, sin recorrer su historial
+        "CREATE INDEX IF NOT EXISTS idx_cambios_clientes_codigo ON cambios_clientes(codigo, version)",
+        '''CREATE TRIGGER IF NOT EXISTS clientes_cambios_ai AFTER INSERT ON clientes BEGIN
+               INSERT INTO cambios_clientes (codigo, operacion) VALUES (new.codigo, 'insert');
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS clientes_cambios_au
+               AFTER UPDATE OF nombre, apellido, email, telefono, direccion, fecha_registro ON clientes BEGIN
+               INSERT INTO cambios_clientes (codigo, operacion) VALUES (new.codigo, 'update');
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS clientes_cambios_ad AFTER DELETE ON clientes BEGIN
+               INSERT INTO cambios_clientes (codigo, operacion, fecha_registro)
+               VALUES (old.codigo, 'delete', old.fecha_registro);
+           END''',
+        # Hasta qué versión del registro de cada otra sede ya se aplicó acá
+        '''CREATE TABLE IF NOT EXISTS replicacion (
+               sede INTEGER PRIMARY KEY,
+               version INTEGER NOT NULL
+           )''',
+    )
+    
+    # Versiones por transacción al compactar el registro, para no tener tomado
+    # el lock de escritura mucho tiempo
+    TAMANO_LOTE_COMPACTACION = 100000
+    
+    # Por encima de esta cantidad de coincidencias no se ordena por relevancia
+    MAX_RESULTADOS_RANKING = 2000
+    
+    # Columnas explícitas en el orden de Cliente (no depende del orden de la tabla)
+    SQL_COLUMNAS = ", ".join(COLUMNAS_CLIENTE)
+    
+    # Lista completa ordenada por código (cuando no se indica otra consulta)
+    CONSULTA_PREDETERMINADA = ConsultaLista()
+    
+    # Códigos por sentencia en las operaciones masivas (SQLite limita la
+    # cantidad de parámetros de una consulta)
+    TAMANO_LOTE_MASIVO = 500
+    
+    # Versión de la estructura que crea init_db, guardada en PRAGMA user_version.
+    # Si la base ya la tiene, abrirla no toma el lock de escritura ni corre DDL;
+    # subirla cuando init_db agregue tablas, columnas o índices
+    VERSION_ESQUEMA = 4
+    
+    # Cada sede crea sus clientes en su propio rango de códigos (ver
+    # configurar_sede), así los de distintas sedes no chocan al replicarse.
+    # La sede 0 es una base sin configurar y usa el rango de siempre, desde 100
+    CODIGOS_POR_SEDE = 10 ** 8
+    MAX_SEDE = 999
+    
+    # Columna normalizada que acompaña a cada campo en la búsqueda de duplicados
+    COLUMNAS_NORMALIZADAS = {
+        'email': ('email_normalizado', normalizar_email),
+        'telefono': ('telefono_normalizado', normalizar_telefono),
+    }
+    
+    def __init__(self, db_name="sandtech_clientes.db", tamano_cache=256, ttl_cache=30.0):
         self.db_name = db_name
+        self.conexiones = GestorConexiones(db_name)
+        # Clientes leídos con obtener_cliente; tamano_cache=0 la desactiva
+        self.cache = CacheClientes(tamano_cache, ttl_cache)
+        self.suscriptores = []
+        self.fts_disponible = False
         self.init_db()
-        self.next_codigo = self.get_next_codigo()
+    
+    def suscribir(self, callback):
+        """Registra un callback(tipo, codigo, valores) para los cambios de clientes.
+        
+        tipo es "insert", "update" o "delete"; valores tiene los datos nuevos
+        del cliente (en las eliminaciones, los que tenía antes de borrarse).
+        Las operaciones masivas avisan una sola vez con codigo como lista:
+        "update_masivo" con valores {campo: valor nuevo} y "delete_masivo"
+        con valores como la lista de clientes que se borraron.
+        """
+        self.suscriptores.append(callback)
+    
+    def notificar_cambio(self, tipo, codigo, valores=None):
+        """Avisa a los suscriptores que un cliente cambió"""
+        for callback in self.suscriptores:
+            callback(tipo, codigo, valores)
+    
+    def cerrar(self):
+        """Cierra las conexiones persistentes a la base de datos"""
+        self.conexiones.cerrar_todas()
+        stats = self.cache.estadisticas()
+        log.info("Conexiones a la base de datos cerradas - Caché: %d aciertos, %d fallos",
+                 stats['aciertos'], stats['fallos'], extra={'datos': stats})
     
     def init_db(self):
         """Inicializa la base de datos y crea la tabla si no existe"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
+            # Base ya inicializada: una sola lectura, sin transacción de escritura
+            version, fts = self.conexiones.obtener().execute('''
+                SELECT (SELECT user_version FROM pragma_user_version),
+                       EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clientes_fts')
+            ''').fetchone()
+            if version >= self.VERSION_ESQUEMA and fts:
+                self.fts_disponible = True
+                log.debug("Base de datos abierta (estructura versión %d)", version)
+                return
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS clientes (
-                    codigo INTEGER PRIMARY KEY,
-                    nombre TEXT NOT NULL,
-                    apellido TEXT NOT NULL,
-                    email TEXT NOT NULL,
-                    telefono TEXT NOT NULL,
-                    direccion TEXT NOT NULL,
-                    fecha_registro TEXT NOT NULL
-                )
-            ''')
+            # Varias instancias pueden abrir la base a la vez: la estructura se
+            # crea con el lock de escritura tomado
+            with self.conexiones.escritura() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS clientes (
+                        codigo INTEGER PRIMARY KEY,
+                        nombre TEXT NOT NULL,
+                        apellido TEXT NOT NULL,
+                        email TEXT NOT NULL,
+                        telefono TEXT NOT NULL,
+                        direccion TEXT NOT NULL,
+                        fecha_registro TEXT NOT NULL,
+                        email_normalizado TEXT,
+                        telefono_normalizado TEXT
+                    )
+                ''')
+                self._agregar_columnas_normalizadas(conn)
+                
+                # Índice angosto sobre el código: COUNT(*) y los saltos por posición
+                # de la lista virtual lo recorren en vez de las filas completas
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_codigo ON clientes(codigo)")
+                
+                # Un índice NOCASE por columna de texto para ordenar y filtrar la
+                # lista (ver ConsultaLista). El código va implícito al final de
+                # cada índice, así que también resuelve el desempate del orden
+                for columna in COLUMNAS_TEXTO:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_clientes_{columna} "
+                                 f"ON clientes({columna} COLLATE NOCASE)")
+                
+                # Búsqueda de duplicados (ver buscar_duplicados)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_email_normalizado "
+                             "ON clientes(email_normalizado)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_telefono_normalizado "
+                             "ON clientes(telefono_normalizado)")
+                
+                # Último código asignado. Los códigos se reservan acá dentro de una
+                # transacción IMMEDIATE, así dos instancias nunca toman el mismo
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS secuencias (
+                        nombre TEXT PRIMARY KEY,
+                        valor INTEGER NOT NULL
+                    )
+                ''')
+                conn.execute('''
+                    INSERT OR IGNORE INTO secuencias (nombre, valor)
+                    SELECT 'clientes', COALESCE(MAX(codigo), 99) FROM clientes
+                ''')
+                conn.execute("INSERT OR IGNORE INTO secuencias (nombre, valor) VALUES ('sede', 0)")
+                
+                # En una base anterior los clientes existentes no quedan en el
+                # registro: quien empiece a sincronizar copia la tabla primero
+                for sentencia in self.SQL_REGISTRO_CAMBIOS:
+                    conn.execute(sentencia)
+                self._agregar_columnas_replicacion(conn)
+            
+            self.fts_disponible = self.crear_indice_texto()
             
-            conn.commit()
-            self.log_transaction("Base de datos inicializada correctamente")
+            # Sin FTS5 no se marca la versión: el próximo arranque vuelve a
+            # intentar crear el índice por si el SQLite instalado cambió
+            if self.fts_disponible:
+                with self.conexiones.escritura() as conn:
+                    conn.execute(f"PRAGMA user_version = {self.VERSION_ESQUEMA}")
             
+            log.info("Base de datos inicializada correctamente")
+        
         except sqlite3.Error as e:
-            self.log_transaction(f"Error al inicializar base de datos: {e}")
+            log.error("Error al inicializar base de datos: %s", e)
             raise
-        finally:
-            if conn:
-                conn.close()
     
-    def log_transaction(self, mensaje):
-        """Registra las transacciones en consola con timestamp"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] LOG: {mensaje}")
+    def _agregar_columnas_normalizadas(self, conn):
+        """Agrega email_normalizado y telefono_normalizado a una base anterior.
+        
+        Se completan con un único UPDATE que llama a las mismas funciones de
+        normalización que usa el modelo al escribir. Debe llamarse dentro de
+        conexiones.escritura(), antes de crear sus índices.
+        """
+        columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(clientes)")}
+        if 'email_normalizado' in columnas:
+            return
+        
+        conn.execute("ALTER TABLE clientes ADD COLUMN email_normalizado TEXT")
+        conn.execute("ALTER TABLE clientes ADD COLUMN telefono_normalizado TEXT")
+        
+        # El trigger de actualización anterior reindexaba el texto ante
+        # cualquier UPDATE; se reemplaza antes de completar las columnas
+        sql_trigger = "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'clientes_fts_au'"
+        if conn.execute(sql_trigger).fetchone():
+            conn.execute("DROP TRIGGER clientes_fts_au")
+            conn.execute(self.SQL_TRIGGERS_TEXTO[2])
+        
+        conn.create_function("normalizar_email", 1, normalizar_email, deterministic=True)
+        conn.create_function("normalizar_telefono", 1, normalizar_telefono, deterministic=True)
+        cursor = conn.execute('''
+            UPDATE clientes
+            SET email_normalizado = normalizar_email(email),
+                telefono_normalizado = normalizar_telefono(telefono)
+        ''')
+        log.info("Columnas de búsqueda de duplicados agregadas - %d clientes", cursor.rowcount)
+    
+    def _agregar_columnas_replicacion(self, conn):
+        """Agrega reloj, sede y fecha_registro al registro de cambios de una base anterior.
+        
+        Los cambios ya registrados quedan en NULL, como los hechos en esta
+        base; las bajas anteriores no tienen la fecha de registro del cliente
+        borrado. Debe llamarse dentro de conexiones.escritura().
+        """
+        columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(cambios_clientes)")}
+        if 'reloj' not in columnas:
+            conn.execute("ALTER TABLE cambios_clientes ADD COLUMN reloj INTEGER")
+            conn.execute("ALTER TABLE cambios_clientes ADD COLUMN sede INTEGER")
+        if 'fecha_registro' not in columnas:
+            conn.execute("ALTER TABLE cambios_clientes ADD COLUMN fecha_registro TEXT")
+            # El trigger de bajas anterior no guardaba la fecha de registro
+            conn.execute("DROP TRIGGER IF EXISTS clientes_cambios_ad")
+            conn.execute(self.SQL_REGISTRO_CAMBIOS[4])
+    
+    def crear_indice_texto(self):
+        """Crea el índice FTS5 y sus triggers si todavía no existen.
+        
+        Devuelve False si el SQLite instalado no tiene FTS5; en ese caso la
+        búsqueda por texto usa LIKE sobre la tabla.
+        """
+        sql_existe = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clientes_fts'"
+        if self.conexiones.obtener().execute(sql_existe).fetchone():
+            return True
+        
+        try:
+            with self.conexiones.escritura() as conn:
+                # Otra instancia pudo crearlo mientras se esperaba el lock
+                if conn.execute(sql_existe).fetchone():
+                    return True
+                for sentencia in self.SQL_INDICE_TEXTO:
+                    conn.execute(sentencia)
+            log.info("Índice de búsqueda por texto creado")
+            return True
+        except sqlite3.OperationalError as e:
+            log.warning("Búsqueda por texto sin FTS5 (%s), se usará LIKE", e)
+            return False
     
     def get_next_codigo(self):
-        """Obtiene el siguiente código de cliente (comenzando en 100)"""
+        """Obtiene el siguiente código de cliente (comenzando en 100).
+        
+        Es solo informativo: si otra instancia crea un cliente antes, el código
+        real será otro. crear_cliente devuelve el código asignado.
+        """
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
+            conn = self.conexiones.obtener()
             
-            cursor.execute("SELECT MAX(codigo) FROM clientes")
-            result = cursor.fetchone()[0]
+            result = conn.execute("SELECT valor FROM secuencias WHERE nombre = 'clientes'").fetchone()
             
             if result is None:
                 return 100
             else:
-                return result + 1
-                
+                return result[0] + 1
+        
         except sqlite3.Error as e:
-            self.log_transaction(f"Error al obtener siguiente código: {e}")
+            log.error("Error al obtener siguiente código: %s", e)
             return 100
-        finally:
-            if conn:
-                conn.close()
+    
+    def _rango_codigos(self, conn):
+        """Primer y último código del rango de la sede de esta base"""
+        fila = conn.execute("SELECT valor FROM secuencias WHERE nombre = 'sede'").fetchone()
+        sede = fila[0] if fila else 0
+        return sede * self.CODIGOS_POR_SEDE + 100, (sede + 1) * self.CODIGOS_POR_SEDE - 1
+    
+    def _reservar_codigos(self, conn, cantidad):
+        """Reserva cantidad códigos consecutivos y devuelve el primero.
+        
+        Debe llamarse dentro de conexiones.escritura(). Si hay códigos mayores
+        que la secuencia (insertados por fuera del modelo) se continúa desde ahí.
+        Solo cuentan los códigos del rango de la sede: los clientes que llegan
+        de otras sedes no mueven la secuencia.
+        """
+        inicio, fin = self._rango_codigos(conn)
+        conn.execute('''
+            UPDATE secuencias
+            SET valor = MAX(valor, ?, (SELECT COALESCE(MAX(codigo), 0) FROM clientes
+                                       WHERE codigo BETWEEN ? AND ?)) + ?
+            WHERE nombre = 'clientes'
+        ''', (inicio - 1, inicio, fin, cantidad))
+        ultimo = conn.execute("SELECT valor FROM secuencias WHERE nombre = 'clientes'").fetchone()[0]
+        if ultimo > fin:
+            raise sqlite3.IntegrityError("No quedan códigos libres en el rango de la sede")
+        return ultimo - cantidad + 1
     
     def crear_cliente(self, nombre, apellido, email, telefono, direccion):
         """Crea un nuevo cliente en la base de datos"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            codigo = self.next_codigo
             fecha_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            cursor.execute('''
-                INSERT INTO clientes (codigo, nombre, apellido, email, telefono, direccion, fecha_registro)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (codigo, nombre, apellido, email, telefono, direccion, fecha_registro))
+            # El código se reserva y se usa en la misma transacción: se confirma
+            # junto con el INSERT o se revierte si hay error
+            with self.conexiones.escritura() as conn:
+                codigo = self._reservar_codigos(conn, 1)
+                conn.execute('''
+                    INSERT INTO clientes (codigo, nombre, apellido, email, telefono, direccion, fecha_registro,
+                                          email_normalizado, telefono_normalizado)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (codigo, nombre, apellido, email, telefono, direccion, fecha_registro,
+                      normalizar_email(email), normalizar_telefono(telefono)))
+            self.cache.invalidar(codigo)
             
-            conn.commit()
-            self.next_codigo += 1
-            
-            self.log_transaction(f"Cliente creado - Código: {codigo}, Nombre: {nombre} {apellido}")
+            log.info("Cliente creado - Código: %s, Nombre: %s %s", codigo, nombre, apellido,
+                     extra={'datos': {'operacion': 'insert', 'codigo': codigo}})
+            self.notificar_cambio("insert", codigo, {
+                'codigo': codigo, 'nombre': nombre, 'apellido': apellido, 'email': email,
+                'telefono': telefono, 'direccion': direccion, 'fecha_registro': fecha_registro
+            })
             return True, codigo
-            
+        
         except sqlite3.Error as e:
-            self.log_transaction(f"Error al crear cliente: {e}")
+            log.error("Error al crear cliente: %s", e)
             return False, None
-        finally:
-            if conn:
-                conn.close()
+    
+    def crear_clientes_bulk(self, filas, tamano_lote=1000):
+        """Crea clientes en lote a partir de un iterable de dicts.
+        
+        Las filas se consumen de a una, se validan con las mismas reglas que el
+        formulario y se insertan con executemany en transacciones de tamano_lote
+        filas. Los códigos se reservan por bloque para cada lote.
+        Devuelve (insertados, rechazados), donde rechazados es una lista de
+        (numero_de_fila, lista_de_errores) con filas numeradas desde 1.
+        """
+        insertados = 0
+        rechazados = []
+        lote = []
+        
+        for numero, fila in enumerate(filas, start=1):
+            datos, errores = validar_fila(fila)
+            if errores:
+                rechazados.append((numero, errores))
+                continue
+            
+            lote.append((numero, datos))
+            if len(lote) >= tamano_lote:
+                insertados += self._insertar_lote(lote, rechazados)
+                lote = []
+        
+        if lote:
+            insertados += self._insertar_lote(lote, rechazados)
+        
+        log.info("Importación masiva - %d clientes creados, %d rechazados", insertados, len(rechazados),
+                 extra={'datos': {'operacion': 'importacion', 'insertados': insertados,
+                                  'rechazados': len(rechazados)}})
+        return insertados, rechazados
+    
+    def _insertar_lote(self, lote, rechazados):
+        """Inserta un lote de filas ya validadas en una única transacción"""
+        try:
+            fecha_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            with self.conexiones.escritura() as conn:
+                # Reservar un bloque de códigos consecutivos para todo el lote
+                primer_codigo = self._reservar_codigos(conn, len(lote))
+                conn.executemany('''
+                    INSERT INTO clientes (codigo, nombre, apellido, email, telefono, direccion, fecha_registro,
+                                          email_normalizado, telefono_normalizado)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', ((primer_codigo + i, d['nombre'], d['apellido'], d['email'],
+                       d['telefono'], d['direccion'], fecha_registro,
+                       normalizar_email(d['email']), normalizar_telefono(d['telefono']))
+                      for i, (_, d) in enumerate(lote)))
+            
+            log.debug("Lote importado - Códigos %s a %s", primer_codigo, primer_codigo + len(lote) - 1)
+            if self.suscriptores:
+                for i, (_, d) in enumerate(lote):
+                    self.notificar_cambio("insert", primer_codigo + i,
+                                          dict(d, codigo=primer_codigo + i, fecha_registro=fecha_registro))
+            return len(lote)
+            
+        except sqlite3.Error as e:
+            log.error("Error al importar lote: %s", e)
+            for numero, _ in lote:
+                rechazados.append((numero, [f"Error de base de datos: {e}"]))
+            return 0
     
     def obtener_cliente(self, codigo):
-        """Obtiene un cliente por su código"""
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM clientes WHERE codigo = ?", (codigo,))
-            result = cursor.fetchone()
-            
-            if result:
-                self.log_transaction(f"Cliente encontrado - Código: {codigo}")
-                return {
-                    'codigo': result[0],
-                    'nombre': result[1],
-                    'apellido': result[2],
-                    'email': result[3],
-                    'telefono': result[4],
-                    'direccion': result[5],
-                    'fecha_registro': result[6]
-                }
+        """Obtiene un cliente por su código (primero lo busca en la caché)"""
+        cliente = self.cache.obtener(codigo)
+        if cliente is not None:
+            log.debug("Cliente encontrado en caché - Código: %s", codigo)
+            return cliente
+        
+        try:
+            conn = self.conexiones.obtener()
+            
+            generacion = self.cache.generacion()
+            cliente = self._consultar(conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE codigo = ?",
+                                      (codigo,)).fetchone()
+            
+            if cliente:
+                log.debug("Cliente encontrado - Código: %s", codigo)
+                self.cache.guardar(codigo, cliente, generacion)
+                return cliente
             else:
-                self.log_transaction(f"Cliente no encontrado - Código: {codigo}")
+                log.debug("Cliente no encontrado - Código: %s", codigo)
                 return None
-                
+        
         except sqlite3.Error as e:
-            self.log_transaction(f"Error al obtener cliente: {e}")
+            log.error("Error al obtener cliente: %s", e)
             return None
-        finally:
-            if conn:
-                conn.close()
     
     def obtener_todos_clientes(self):
         """Obtiene todos los clientes de la base de datos"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM clientes ORDER BY codigo")
-            results = cursor.fetchall()
-            
-            clientes = []
-            for result in results:
-                clientes.append({
-                    'codigo': result[0],
-                    'nombre': result[1],
-                    'apellido': result[2],
-                    'email': result[3],
-                    'telefono': result[4],
-                    'direccion': result[5],
-                    'fecha_registro': result[6]
-                })
+            conn = self.conexiones.obtener()
             
-            self.log_transaction(f"Obtenidos {len(clientes)} clientes")
+            clientes = self._consultar(conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes ORDER BY codigo").fetchall()
+            
+            log.debug("Obtenidos %d clientes", len(clientes))
             return clientes
+        
+        except sqlite3.Error as e:
+            log.error("Error al obtener todos los clientes: %s", e)
+            return []
+    
+    def buscar_clientes(self, texto, limit=50):
+        """Busca clientes por nombre, apellido, email o dirección.
+        
+        Cada palabra del texto se busca como prefijo (todas deben aparecer),
+        sin distinguir mayúsculas ni acentos. Los resultados vienen ordenados
+        por relevancia (bm25), salvo que el texto sea tan general que coincida
+        con más de MAX_RESULTADOS_RANKING clientes.
+        """
+        palabras = re.findall(r"\w+", texto)
+        if not palabras:
+            return []
+        
+        try:
+            conn = self.conexiones.obtener()
+            
+            if self.fts_disponible:
+                consulta = " ".join(f'"{palabra}"*' for palabra in palabras)
+                candidatos = conn.execute(
+                    "SELECT rowid FROM clientes_fts WHERE clientes_fts MATCH ? LIMIT ?",
+                    (consulta, self.MAX_RESULTADOS_RANKING + 1)).fetchall()
+                
+                if len(candidatos) <= self.MAX_RESULTADOS_RANKING:
+                    columnas = ", ".join(f"c.{columna}" for columna in COLUMNAS_CLIENTE)
+                    results = self._consultar(conn, f'''
+                        SELECT {columnas} FROM clientes_fts
+                        JOIN clientes c ON c.codigo = clientes_fts.rowid
+                        WHERE clientes_fts MATCH ?
+                        ORDER BY rank
+                        LIMIT ?
+                    ''', (consulta, limit)).fetchall()
+                else:
+                    # Ordenar por relevancia obligaría a puntuar todas las
+                    # coincidencias; se devuelven las primeras por código
+                    codigos = [fila[0] for fila in candidatos[:limit]]
+                    marcadores = ", ".join("?" * len(codigos))
+                    results = self._consultar(
+                        conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE codigo IN ({marcadores}) ORDER BY codigo",
+                        codigos).fetchall()
+            else:
+                condicion = " AND ".join(
+                    "(nombre LIKE ? OR apellido LIKE ? OR email LIKE ? OR direccion LIKE ?)"
+                    for _ in palabras)
+                parametros = [f"%{palabra}%" for palabra in palabras for _ in range(4)]
+                results = self._consultar(
+                    conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE {condicion} ORDER BY codigo LIMIT ?",
+                    parametros + [limit]).fetchall()
+            
+            log.debug("Búsqueda '%s' - %d resultados", texto, len(results))
+            return results
+            
+        except sqlite3.Error as e:
+            log.error("Error al buscar clientes: %s", e)
+            return []
+    
+    def buscar_duplicados(self, email, telefono, excluir_codigo=None, limit=5):
+        """Clientes con el mismo email o el mismo teléfono (ya normalizados).
+        
+        Cada comparación es una búsqueda en el índice de su columna, así que
+        el costo es O(log n) sin importar el tamaño de la tabla. excluir_codigo
+        deja afuera al propio cliente cuando se está modificando.
+        """
+        try:
+            conn = self.conexiones.obtener()
+            
+            return self._consultar(conn, f'''
+                SELECT {self.SQL_COLUMNAS} FROM clientes
+                WHERE (email_normalizado = ? OR telefono_normalizado = ?) AND codigo != ?
+                LIMIT ?
+            ''', (normalizar_email(email), normalizar_telefono(telefono),
+                  -1 if excluir_codigo is None else excluir_codigo, limit)).fetchall()
+            
+        except sqlite3.Error as e:
+            log.error("Error al buscar clientes duplicados: %s", e)
+            return []
+    
+    def listar_clientes(self, after_codigo=None, limit=100):
+        """Obtiene una página de clientes ordenada por código.
+        
+        Usa paginación por clave (keyset): devuelve hasta limit clientes con
+        código mayor que after_codigo, recorriendo solo el índice de la clave
+        primaria, así el costo no depende de cuántas páginas se saltearon.
+        """
+        try:
+            conn = self.conexiones.obtener()
+            
+            return self._consultar(
+                conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE codigo > ? ORDER BY codigo LIMIT ?",
+                (after_codigo if after_codigo is not None else -1, limit)).fetchall()
+            
+        except sqlite3.Error as e:
+            log.error("Error al listar clientes: %s", e)
+            return []
+    
+    def listar_clientes_en_posicion(self, posicion, limit, ancla=None, consulta=None):
+        """Obtiene hasta limit clientes a partir de la fila número posicion (0 = primera).
+        
+        consulta (ConsultaLista) indica el orden y los filtros; por defecto es la
+        lista completa por código. ancla es (posicion, codigo) de una fila ya
+        conocida. Si la posición pedida está cerca, se avanza o retrocede por
+        clave desde el ancla; si no, se salta con OFFSET sobre el índice de la
+        columna de orden. En ningún caso se leen las filas salteadas completas.
+        """
+        consulta = consulta or self.CONSULTA_PREDETERMINADA
+        try:
+            conn = self.conexiones.obtener()
+            
+            salto = clave = None
+            if ancla is not None:
+                salto = posicion - ancla[0]
+                clave = self._clave_de_cliente(conn, consulta, ancla[1])
+            
+            if clave is not None and 0 <= salto <= self.MAX_SALTO_ANCLA:
+                results = self._listar_desde(conn, consulta, clave, limit, salto)
+                
+            elif clave is not None and -self.MAX_SALTO_ANCLA <= salto < 0:
+                anteriores = self._listar_desde(conn, consulta, clave, min(-salto, limit),
+                                                max(-salto - limit, 0), hacia_atras=True)
+                anteriores.reverse()
+                results = anteriores
+                if len(results) < limit:
+                    results += self._listar_desde(conn, consulta, clave, limit - len(results))
+                
+            else:
+                condiciones, parametros = consulta.condiciones()
+                where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+                # El salto recorre solo el índice (valor, código) de la columna de orden
+                primera = conn.execute(
+                    f"SELECT {consulta.orden}, codigo FROM clientes {where} "
+                    f"ORDER BY {consulta.order_by()} LIMIT 1 OFFSET ?",
+                    parametros + [max(posicion, 0)]).fetchone()
+                results = self._listar_desde(conn, consulta, tuple(primera), limit) if primera else []
+            
+            return results
             
         except sqlite3.Error as e:
-            self.log_transaction(f"Error al obtener todos los clientes: {e}")
+            log.error("Error al listar clientes por posición: %s", e)
             return []
+    
+    def _clave_de_cliente(self, conn, consulta, codigo):
+        """Clave (valor, codigo) del cliente en el orden de la consulta, o None si no existe"""
+        if consulta.orden == 'codigo':
+            return (codigo, codigo)
+        fila = conn.execute(f"SELECT {consulta.orden} FROM clientes WHERE codigo = ?", (codigo,)).fetchone()
+        return None if fila is None else (fila[0], codigo)
+    
+    def _listar_desde(self, conn, consulta, clave, limit, offset=0, hacia_atras=False):
+        """Clientes desde la clave (inclusive) o, hacia atrás, anteriores a ella"""
+        condiciones, parametros = consulta.condiciones()
+        condicion, parametros_clave = consulta.desde_clave(*clave, inclusive=not hacia_atras,
+                                                           hacia_atras=hacia_atras)
+        return self._consultar(
+            conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE {' AND '.join(condiciones + [condicion])} "
+                  f"ORDER BY {consulta.order_by(hacia_atras)} LIMIT ? OFFSET ?",
+            parametros + parametros_clave + [limit, offset]).fetchall()
+    
+    def estimar_posicion_de_cliente(self, codigo, consulta=None):
+        """Estima la posición (0 = primera) del cliente en la lista.
+        
+        Se cuentan las filas anteriores sobre un índice: en la lista completa
+        por código, el índice angosto del código. No alcanza con restar el
+        primer código porque los rangos de códigos de cada sede (ver
+        CODIGOS_POR_SEDE) dejan huecos enormes. Con otro orden o con filtros
+        se usa el índice de la columna de orden.
+        """
+        try:
+            conn = self.conexiones.obtener()
+            if consulta is None or consulta.es_predeterminada():
+                return conn.execute("SELECT COUNT(*) FROM clientes WHERE codigo < ?", (codigo,)).fetchone()[0]
+            
+            clave = self._clave_de_cliente(conn, consulta, codigo)
+            if clave is None:
+                return 0
+            condiciones, parametros = consulta.condiciones()
+            condicion, parametros_clave = consulta.desde_clave(*clave, inclusive=False, hacia_atras=True)
+            return conn.execute(
+                f"SELECT COUNT(*) FROM clientes WHERE {' AND '.join(condiciones + [condicion])}",
+                parametros + parametros_clave).fetchone()[0]
+        except sqlite3.Error as e:
+            log.error("Error al estimar posición del cliente: %s", e)
+            return 0
+    
+    def contar_clientes(self, consulta=None):
+        """Devuelve la cantidad de clientes (los que cumplen los filtros de la consulta)"""
+        try:
+            conn = self.conexiones.obtener()
+            condiciones, parametros = (consulta or self.CONSULTA_PREDETERMINADA).condiciones()
+            where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+            return conn.execute(f"SELECT COUNT(*) FROM clientes {where}", parametros).fetchone()[0]
+        except sqlite3.Error as e:
+            log.error("Error al contar clientes: %s", e)
+            return 0
+    
+    def iterar_clientes(self, tamano_lote=500):
+        """Generador que recorre todos los clientes en lotes de tamano_lote"""
+        ultimo_codigo = None
+        while True:
+            lote = self.listar_clientes(ultimo_codigo, tamano_lote)
+            if not lote:
+                return
+            yield lote
+            if len(lote) < tamano_lote:
+                return
+            ultimo_codigo = lote[-1].codigo
+    
+    def exportar_clientes(self, tamano_lote=5000):
+        """Generador que recorre todos los clientes en lotes para exportarlos.
+        
+        A diferencia de iterar_clientes usa un único cursor que se va leyendo
+        con fetchmany: la memoria no depende del tamaño de la tabla y todos los
+        lotes salen de la misma instantánea de lectura, aunque otras instancias
+        escriban mientras se exporta.
+        """
+        cursor = self._consultar(self.conexiones.obtener(),
+                                 f"SELECT {self.SQL_COLUMNAS} FROM clientes ORDER BY codigo")
+        total = 0
+        try:
+            while True:
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    break
+                total += len(lote)
+                yield lote
         finally:
-            if conn:
-                conn.close()
+            cursor.close()
+            log.info("Exportación - %d clientes leídos", total,
+                     extra={'datos': {'operacion': 'exportacion', 'clientes': total}})
+    
+    def cargar_clientes(self, lotes):
+        """Carga lotes de Cliente conservando sus códigos (restaura una exportación).
+        
+        Las filas no se revalidan porque vienen de otra base SandTech. Si un
+        código ya existe se reemplazan sus datos. Todo va en una transacción:
+        la carga se aplica completa o no se aplica. Mantener el índice de texto
+        fila por fila con los triggers es lo más caro de la inserción, así que
+        se quitan los triggers, se inserta y se reconstruye el índice de una
+        vez (pensado para restaurar bases completas). Al final la secuencia de
+        códigos queda por encima del mayor código cargado. Devuelve la
+        cantidad de clientes cargados.
+        """
+        cargados = 0
+        try:
+            with self.conexiones.escritura() as conn:
+                if self.fts_disponible:
+                    for trigger in ('clientes_fts_ai', 'clientes_fts_ad', 'clientes_fts_au'):
+                        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                
+                for lote in lotes:
+                    conn.executemany('''
+                        INSERT INTO clientes (codigo, nombre, apellido, email, telefono, direccion, fecha_registro,
+                                              email_normalizado, telefono_normalizado)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(codigo) DO UPDATE SET
+                            nombre = excluded.nombre, apellido = excluded.apellido,
+                            email = excluded.email, telefono = excluded.telefono,
+                            direccion = excluded.direccion, fecha_registro = excluded.fecha_registro,
+                            email_normalizado = excluded.email_normalizado,
+                            telefono_normalizado = excluded.telefono_normalizado
+                    ''', ((*cliente, normalizar_email(cliente[3]), normalizar_telefono(cliente[4]))
+                          for cliente in lote))
+                    cargados += len(lote)
+                    log.debug("Lote cargado - %d clientes", len(lote))
+                
+                if self.fts_disponible:
+                    conn.execute("INSERT INTO clientes_fts(clientes_fts) VALUES ('rebuild')")
+                    for sentencia in self.SQL_TRIGGERS_TEXTO:
+                        conn.execute(sentencia)
+                self._reservar_codigos(conn, 0)
+        except sqlite3.Error as e:
+            log.error("Error al cargar clientes, no se cargó ninguno: %s", e)
+            raise
+        finally:
+            self.cache.limpiar()
+        
+        log.info("Carga de instantánea - %d clientes", cargados,
+                 extra={'datos': {'operacion': 'carga', 'clientes': cargados}})
+        return cargados
+    
+    def _consultar(self, conn, sql, parametros=()):
+        """Ejecuta una consulta de clientes cuyas filas llegan ya como Cliente.
+        
+        El row_factory se pone en el cursor y no en la conexión, que es
+        compartida con las consultas de conteo y de códigos.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = fila_a_cliente
+        return cursor.execute(sql, parametros)
     
     def actualizar_cliente(self, codigo, nombre, apellido, email, telefono, direccion):
-        """Actualiza los datos de un cliente"""
+        """Actualiza los datos de un cliente.
+        
+        Devuelve True si se actualizó, False si el cliente no existe y None si
+        hubo un error de la base.
+        """
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                UPDATE clientes 
-                SET nombre = ?, apellido = ?, email = ?, telefono = ?, direccion = ?
-                WHERE codigo = ?
-            ''', (nombre, apellido, email, telefono, direccion, codigo))
+            with self.conexiones.escritura() as conn:
+                cursor = conn.execute('''
+                    UPDATE clientes
+                    SET nombre = ?, apellido = ?, email = ?, telefono = ?, direccion = ?,
+                        email_normalizado = ?, telefono_normalizado = ?
+                    WHERE codigo = ?
+                ''', (nombre, apellido, email, telefono, direccion,
+                      normalizar_email(email), normalizar_telefono(telefono), codigo))
+            self.cache.invalidar(codigo)
             
             if cursor.rowcount > 0:
-                conn.commit()
-                self.log_transaction(f"Cliente actualizado - Código: {codigo}")
+                log.info("Cliente actualizado - Código: %s", codigo,
+                         extra={'datos': {'operacion': 'update', 'codigo': codigo}})
+                self.notificar_cambio("update", codigo, {
+                    'codigo': codigo, 'nombre': nombre, 'apellido': apellido, 'email': email,
+                    'telefono': telefono, 'direccion': direccion
+                })
                 return True
             else:
-                self.log_transaction(f"No se pudo actualizar cliente - Código: {codigo}")
+                log.warning("No se pudo actualizar cliente - Código: %s", codigo)
                 return False
-                
+        
         except sqlite3.Error as e:
-            self.log_transaction(f"Error al actualizar cliente: {e}")
-            return False
-        finally:
-            if conn:
-                conn.close()
+            log.error("Error al actualizar cliente: %s", e)
+            return None
     
     def eliminar_cliente(self, codigo):
-        """Elimina un cliente de la base de datos"""
+        """Elimina un cliente de la base de datos.
+        
+        Devuelve True si se eliminó, False si el cliente no existe y None si
+        hubo un error de la base.
+        """
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
-            # Primero verificamos si existe
-            cursor.execute("SELECT nombre, apellido FROM clientes WHERE codigo = ?", (codigo,))
-            cliente = cursor.fetchone()
+            with self.conexiones.escritura() as conn:
+                # Primero verificamos si existe
+                cliente = self._consultar(conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE codigo = ?",
+                                          (codigo,)).fetchone()
+                
+                if cliente:
+                    conn.execute("DELETE FROM clientes WHERE codigo = ?", (codigo,))
+            self.cache.invalidar(codigo)
             
             if cliente:
-                cursor.execute("DELETE FROM clientes WHERE codigo = ?", (codigo,))
-                conn.commit()
-                self.log_transaction(f"Cliente eliminado - Código: {codigo}, Nombre: {cliente[0]} {cliente[1]}")
+                log.info("Cliente eliminado - Código: %s, Nombre: %s %s", codigo, cliente.nombre, cliente.apellido,
+                         extra={'datos': {'operacion': 'delete', 'codigo': codigo}})
+                self.notificar_cambio("delete", codigo, cliente)
                 return True
             else:
-                self.log_transaction(f"No se pudo eliminar cliente - Código: {codigo} no existe")
+                log.warning("No se pudo eliminar cliente - Código: %s no existe", codigo)
                 return False
+        
+        except sqlite3.Error as e:
+            log.error("Error al eliminar cliente: %s", e)
+            return None
+    
+    def eliminar_clientes(self, codigos):
+        """Elimina varios clientes en una única transacción.
+        
+        Los códigos se borran de a TAMANO_LOTE_MASIVO por sentencia, pero todo
+        se confirma o se revierte junto. Los que no existen se ignoran.
+        Devuelve la cantidad de clientes eliminados, o None si hubo un error.
+        """
+        codigos = sorted(set(codigos))
+        eliminados = []
+        try:
+            with self.conexiones.escritura() as conn:
+                for inicio in range(0, len(codigos), self.TAMANO_LOTE_MASIVO):
+                    lote = codigos[inicio:inicio + self.TAMANO_LOTE_MASIVO]
+                    marcadores = ", ".join("?" * len(lote))
+                    eliminados += self._consultar(
+                        conn, f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE codigo IN ({marcadores})",
+                        lote).fetchall()
+                    conn.execute(f"DELETE FROM clientes WHERE codigo IN ({marcadores})", lote)
+        except sqlite3.Error as e:
+            log.error("Error al eliminar clientes, no se eliminó ninguno: %s", e)
+            return None
+        finally:
+            for codigo in codigos:
+                self.cache.invalidar(codigo)
+        
+        log.info("Clientes eliminados en lote - %d de %d pedidos", len(eliminados), len(codigos),
+                 extra={'datos': {'operacion': 'delete_masivo', 'clientes': len(eliminados)}})
+        if eliminados:
+            self.notificar_cambio("delete_masivo", [cliente.codigo for cliente in eliminados], eliminados)
+        return len(eliminados)
+    
+    def actualizar_campo_masivo(self, codigos, campo, valor):
+        """Pone el mismo valor en un campo de varios clientes, en una única transacción.
+        
+        campo es uno de CAMPOS_CLIENTE y valor ya debe estar validado. Igual
+        que eliminar_clientes, procesa los códigos de a TAMANO_LOTE_MASIVO.
+        Devuelve la cantidad de clientes actualizados, o None si hubo un error.
+        """
+        if campo not in CAMPOS_CLIENTE:
+            raise ValueError(f"El campo '{campo}' no se puede modificar")
+        
+        asignaciones = [f"{campo} = ?"]
+        valores = [valor]
+        if campo in self.COLUMNAS_NORMALIZADAS:
+            columna, normalizar = self.COLUMNAS_NORMALIZADAS[campo]
+            asignaciones.append(f"{columna} = ?")
+            valores.append(normalizar(valor))
+        
+        codigos = sorted(set(codigos))
+        actualizados = []
+        try:
+            with self.conexiones.escritura() as conn:
+                for inicio in range(0, len(codigos), self.TAMANO_LOTE_MASIVO):
+                    lote = codigos[inicio:inicio + self.TAMANO_LOTE_MASIVO]
+                    marcadores = ", ".join("?" * len(lote))
+                    actualizados += [fila[0] for fila in conn.execute(
+                        f"SELECT codigo FROM clientes WHERE codigo IN ({marcadores})", lote)]
+                    conn.execute(f"UPDATE clientes SET {', '.join(asignaciones)} WHERE codigo IN ({marcadores})",
+                                 valores + lote)
+        except sqlite3.Error as e:
+            log.error("Error al actualizar clientes, no se actualizó ninguno: %s", e)
+            return None
+        finally:
+            for codigo in codigos:
+                self.cache.invalidar(codigo)
+        
+        log.info("Clientes actualizados en lote - %d de %d pedidos, campo %s", len(actualizados), len(codigos), campo,
+                 extra={'datos': {'operacion': 'update_masivo', 'campo': campo, 'clientes': len(actualizados)}})
+        if actualizados:
+            self.notificar_cambio("update_masivo", actualizados, {campo: valor})
+        return len(actualizados)
+    
+    def version_cambios(self):
+        """Versión del último cambio registrado (0 si todavía no hubo ninguno).
+        
+        Un sistema que empieza a sincronizarse la lee antes de copiar todos los
+        clientes y después pide cambios_desde esa versión; lo que cambie
+        mientras copia le llega otra vez, sin perder nada.
+        """
+        fila = self.conexiones.obtener().execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'cambios_clientes'").fetchone()
+        return fila[0] if fila else 0
+    
+    def cambios_desde(self, version, limit=1000):
+        """Devuelve los cambios de clientes posteriores a version, del más viejo al más nuevo.
+        
+        De cada cliente llega solo su último cambio, con los datos actuales, así
+        que el costo depende de cuántos clientes cambiaron y no del tamaño de la
+        tabla. Cada cambio es un dict con version, codigo, operacion ("insert",
+        "update" o "delete"), fecha, cliente (un Cliente; None en las bajas) y
+        el reloj, la sede y la fecha de registro del cliente para replicar (ver
+        aplicar_cambios_replicados).
+        Para seguir se vuelve a llamar con la versión del último cambio recibido;
+        menos de limit cambios indica que no hay más.
+        
+        Lanza ValueError si version es anterior al historial que se conserva
+        (ver compactar_cambios): en ese caso hay que volver a copiar la tabla.
+        """
+        conn = self.conexiones.obtener()
+        filas = conn.execute(f'''
+            SELECT c.version, c.codigo, c.operacion, c.fecha, COALESCE(c.reloj, c.version),
+                   COALESCE(c.sede, (SELECT valor FROM secuencias WHERE nombre = 'sede')),
+                   COALESCE(cl.fecha_registro, c.fecha_registro),
+                   {", ".join("cl." + columna for columna in COLUMNAS_CLIENTE)}
+            FROM cambios_clientes AS c
+            LEFT JOIN clientes AS cl ON cl.codigo = c.codigo
+            WHERE c.version > ?
+              AND c.version = (SELECT MAX(version) FROM cambios_clientes WHERE codigo = c.codigo)
+            ORDER BY c.version
+            LIMIT ?
+        ''', (version, limit)).fetchall()
+        
+        # Se revisa después de leer: si se compactó en el medio, se nota acá
+        fila = conn.execute("SELECT valor FROM secuencias WHERE nombre = 'cambios_compactados'").fetchone()
+        if fila and version < fila[0]:
+            raise ValueError(f"La versión {version} es anterior al historial de cambios conservado "
+                             f"(desde {fila[0]}): hay que volver a leer todos los clientes")
+        
+        return [{'version': fila[0], 'codigo': fila[1], 'operacion': fila[2], 'fecha': fila[3],
+                 'reloj': fila[4], 'sede': fila[5], 'fecha_registro': fila[6],
+                 'cliente': Cliente._make(fila[7:]) if fila[2] != 'delete' and fila[7] is not None else None}
+                for fila in filas]
+    
+    def compactar_cambios(self, hasta_version=None):
+        """Achica el registro de cambios.
+        
+        Siempre borra las entradas superadas por un cambio más nuevo del mismo
+        cliente, que cambios_desde ya no devuelve. Con hasta_version borra
+        además todo lo anterior o igual a esa versión, incluidas las bajas: un
+        sistema que todavía no llegó a esa versión tendrá que volver a copiar
+        la tabla. Trabaja de a TAMANO_LOTE_COMPACTACION versiones por
+        transacción. Devuelve la cantidad de entradas borradas, o None si hubo
+        un error.
+        """
+        borradas = 0
+        try:
+            if hasta_version is not None:
+                hasta_version = min(hasta_version, self.version_cambios())
+                with self.conexiones.escritura() as conn:
+                    conn.execute('''
+                        INSERT INTO secuencias (nombre, valor) VALUES ('cambios_compactados', ?)
+                        ON CONFLICT (nombre) DO UPDATE SET valor = MAX(valor, excluded.valor)
+                    ''', (hasta_version,))
+                    borradas += conn.execute("DELETE FROM cambios_clientes WHERE version <= ?",
+                                             (hasta_version,)).rowcount
+            
+            desde, hasta = self.conexiones.obtener().execute(
+                "SELECT MIN(version), MAX(version) FROM cambios_clientes").fetchone()
+            for inicio in range(desde or 0, (hasta or 0) + 1, self.TAMANO_LOTE_COMPACTACION):
+                with self.conexiones.escritura() as conn:
+                    borradas += conn.execute('''
+                        DELETE FROM cambios_clientes
+                        WHERE version BETWEEN ? AND ?
+                          AND version < (SELECT MAX(version) FROM cambios_clientes AS nuevo
+                                         WHERE nuevo.codigo = cambios_clientes.codigo)
+                    ''', (inicio, inicio + self.TAMANO_LOTE_COMPACTACION - 1)).rowcount
+        except sqlite3.Error as e:
+            log.error("Error al compactar el registro de cambios: %s", e)
+            return None
+        
+        log.info("Registro de cambios compactado - %d entradas borradas", borradas,
+                 extra={'datos': {'operacion': 'compactacion', 'borradas': borradas,
+                                  'hasta_version': hasta_version}})
+        return borradas
+
+    def obtener_sede(self):
+        """Número de sede de esta base (0 si no se configuró)"""
+        fila = self.conexiones.obtener().execute("SELECT valor FROM secuencias WHERE nombre = 'sede'").fetchone()
+        return fila[0] if fila else 0
+    
+    def configurar_sede(self, sede):
+        """Asigna el número de sede de esta base, entre 1 y MAX_SEDE.
+        
+        Cada base que se replica con otras (ver model/replicacion.py) necesita
+        un número distinto, asignado una sola vez y antes de la primera
+        sincronización. Los clientes nuevos toman códigos del rango de la sede,
+        siguiendo desde el mayor que ya haya en él; los existentes conservan
+        los suyos. Lanza ValueError si el número no es válido.
+        """
+        if not isinstance(sede, int) or not 1 <= sede <= self.MAX_SEDE:
+            raise ValueError(f"La sede debe ser un número entre 1 y {self.MAX_SEDE}")
+        
+        with self.conexiones.escritura() as conn:
+            conn.execute("UPDATE secuencias SET valor = ? WHERE nombre = 'sede'", (sede,))
+            inicio, fin = self._rango_codigos(conn)
+            conn.execute('''
+                UPDATE secuencias
+                SET valor = (SELECT COALESCE(MAX(codigo), ?) FROM clientes WHERE codigo BETWEEN ? AND ?)
+                WHERE nombre = 'clientes'
+            ''', (inicio - 1, inicio, fin))
+        log.info("Sede configurada - %d (códigos desde %d)", sede, inicio,
+                 extra={'datos': {'operacion': 'sede', 'sede': sede}})
+    
+    def version_replicada(self, sede):
+        """Última versión del registro de otra sede ya aplicada en esta base.
+        
+        None si nunca se replicó desde esa sede: hay que empezar copiando sus
+        clientes con clientes_para_replicar.
+        """
+        fila = self.conexiones.obtener().execute(
+            "SELECT version FROM replicacion WHERE sede = ?", (sede,)).fetchone()
+        return fila[0] if fila else None
+    
+    def clientes_para_replicar(self, despues_de=0, limit=1000):
+        """Devuelve los clientes con el reloj de su último cambio, ordenados por código.
+        
+        Es la copia completa con la que empieza la replicación hacia otra
+        sede. Cada elemento tiene la forma de los de cambios_desde, con version
+        None y operacion "insert"; los clientes anteriores al registro de
+        cambios llevan reloj 0. Para seguir se pasa el código del último
+        recibido; menos de limit clientes indica que no hay más.
+        """
+        filas = self.conexiones.obtener().execute(f'''
+            SELECT COALESCE(c.reloj, c.version, 0),
+                   COALESCE(c.sede, (SELECT valor FROM secuencias WHERE nombre = 'sede')),
+                   {", ".join("cl." + columna for columna in COLUMNAS_CLIENTE)}
+            FROM clientes AS cl
+            LEFT JOIN cambios_clientes AS c
+                   ON c.version = (SELECT MAX(version) FROM cambios_clientes WHERE codigo = cl.codigo)
+            WHERE cl.codigo > ?
+            ORDER BY cl.codigo
+            LIMIT ?
+        ''', (despues_de, limit)).fetchall()
+        return [{'version': None, 'codigo': fila[2], 'operacion': 'insert', 'fecha': None,
+                 'reloj': fila[0], 'sede': fila[1], 'fecha_registro': fila[8], 'cliente': Cliente._make(fila[2:])}
+                for fila in filas]
+    
+    def aplicar_cambios_replicados(self, cambios, sede_origen, version=None):
+        """Aplica, en una sola transacción, cambios de clientes que llegan de otra sede.
+        
+        cambios tiene la forma de los de cambios_desde. Cada cliente queda con
+        el cambio de reloj mayor, desempatando por número de sede, sin importar
+        el orden en que lleguen: dos sedes que se replican en los dos sentidos
+        terminan iguales. El cambio aplicado se anota en el registro con su
+        reloj y su sede, y el registro de esta base se adelanta hasta el mayor
+        reloj recibido para que lo que se cambie acá después les gane (reloj
+        de Lamport).
+        
+        Si el cliente existe en las dos bases con distinta fecha de registro no
+        es el mismo cliente, sino dos que tomaron el mismo código antes de
+        configurar las sedes: no se toca (tampoco ante una baja del otro) y
+        se devuelve como colisión, sea cual sea el reloj de cada lado. Las
+        bajas registradas antes de guardar la fecha de registro no se pueden
+        comparar y se aplican.
+        
+        Con version se guarda, en la misma transacción, hasta qué versión del
+        registro de sede_origen quedó aplicado (ver version_replicada).
+        Devuelve un dict con aplicados, descartados (los que esta base ya tenía
+        iguales o más nuevos) y colisiones (lista de códigos). Lanza
+        sqlite3.Error si falla: en ese caso no se aplica ninguno.
+        """
+        aplicados = []
+        descartados = 0
+        colisiones = []
+        try:
+            with self.conexiones.escritura() as conn:
+                sede_local = conn.execute("SELECT valor FROM secuencias WHERE nombre = 'sede'").fetchone()[0]
+                reloj_maximo = 0
+                for cambio in cambios:
+                    codigo, cliente = cambio['codigo'], cambio['cliente']
+                    recibido = (cambio['reloj'], cambio['sede'])
+                    reloj_maximo = max(reloj_maximo, cambio['reloj'])
+                    
+                    ultimo = conn.execute('''
+                        SELECT COALESCE(reloj, version), COALESCE(sede, ?) FROM cambios_clientes
+                        WHERE codigo = ? ORDER BY version DESC LIMIT 1
+                    ''', (sede_local, codigo)).fetchone()
+                    actual = conn.execute(f"SELECT {self.SQL_COLUMNAS} FROM clientes WHERE codigo = ?",
+                                          (codigo,)).fetchone()
+                    if actual and cambio['fecha_registro'] not in (None, actual[6]):
+                        colisiones.append(codigo)
+                        continue
+                    if ultimo is None:
+                        # Sin historial: si el cliente existe es anterior al registro
+                        ultimo = (0, sede_local) if actual else (-1, -1)
+                    # Las copias de una misma base tienen los mismos clientes con
+                    # distinto reloj: si los datos son iguales no hay nada que escribir
+                    if recibido <= tuple(ultimo) or (actual and cliente and tuple(actual) == cliente):
+                        descartados += 1
+                        continue
+                    
+                    if cliente is None:
+                        if actual:
+                            conn.execute("DELETE FROM clientes WHERE codigo = ?", (codigo,))
+                        else:
+                            # La baja se anota igual, para que un cambio más viejo
+                            # que llegue de otra sede no reviva al cliente
+                            conn.execute('''
+                                INSERT INTO cambios_clientes (codigo, operacion, fecha_registro)
+                                VALUES (?, 'delete', ?)
+                            ''', (codigo, cambio['fecha_registro']))
+                    else:
+                        conn.execute('''
+                            INSERT INTO clientes (codigo, nombre, apellido, email, telefono, direccion, fecha_registro,
+                                                  email_normalizado, telefono_normalizado)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(codigo) DO UPDATE SET
+                                nombre = excluded.nombre, apellido = excluded.apellido,
+                                email = excluded.email, telefono = excluded.telefono,
+                                direccion = excluded.direccion, fecha_registro = excluded.fecha_registro,
+                                email_normalizado = excluded.email_normalizado,
+                                telefono_normalizado = excluded.telefono_normalizado
+                        ''', (*cliente, normalizar_email(cliente.email), normalizar_telefono(cliente.telefono)))
+                    
+                    # El trigger acaba de anotar el cambio como local: lleva el
+                    # reloj y la sede de donde se hizo
+                    conn.execute('''
+                        UPDATE cambios_clientes SET reloj = ?, sede = ?
+                        WHERE version = (SELECT MAX(version) FROM cambios_clientes)
+                    ''', recibido)
+                    aplicados.append(codigo)
                 
+                conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'cambios_clientes'",
+                             (reloj_maximo,))
+                if version is not None:
+                    conn.execute('''
+                        INSERT INTO replicacion (sede, version) VALUES (?, ?)
+                        ON CONFLICT (sede) DO UPDATE SET version = excluded.version
+                    ''', (sede_origen, version))
         except sqlite3.Error as e:
-            self.log_transaction(f"Error al eliminar cliente: {e}")
-            return False
+            log.error("Error al aplicar cambios de la sede %s, no se aplicó ninguno: %s", sede_origen, e)
+            raise
         finally:
-            if conn:
-                conn.close()
\ No newline at end of file
+            for codigo in aplicados:
+                self.cache.invalidar(codigo)
+        
+        log.debug("Cambios replicados de la sede %s - %d aplicados, %d descartados, %d colisiones",
+                  sede_origen, len(aplicados), descartados, len(colisiones))
+        return {'aplicados': len(aplicados), 'descartados': descartados, 'colisiones': colisiones}
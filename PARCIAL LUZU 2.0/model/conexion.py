@@ -0,0 +1,86 @@
+# model/conexion.py
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+class GestorConexiones:
+    """Mantiene una conexión SQLite persistente por hilo"""
+    
+    # PRAGMAs aplicados a cada conexión al abrirla
+    PRAGMAS = (
+        ("journal_mode", "WAL"),        # Lectores no bloquean al escritor
+        ("synchronous", "NORMAL"),      # Seguro con WAL y mucho más rápido que FULL
+        ("cache_size", -20000),         # ~20 MB de caché de páginas
+        ("mmap_size", 268435456),       # 256 MB de lectura mapeada en memoria
+        ("temp_store", "MEMORY"),       # Tablas e índices temporales en RAM
+        ("busy_timeout", 5000),         # Esperar hasta 5 s si otro proceso está escribiendo
+    )
+    
+    # Reintentos de BEGIN IMMEDIATE cuando se agota busy_timeout, con espera
+    # aleatoria creciente para que los procesos en espera no choquen de nuevo
+    REINTENTOS_ESCRITURA = 5
+    ESPERA_BASE_REINTENTO = 0.05
+    
+    def __init__(self, db_name, cached_statements=128):
+        self.db_name = db_name
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conexiones = []
+    
+    def obtener(self):
+        """Devuelve la conexión del hilo actual, abriéndola si hace falta"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._abrir()
+            self._local.conn = conn
+            with self._lock:
+                self._conexiones.append(conn)
+        return conn
+    
+    def _abrir(self):
+        """Abre una conexión nueva y le aplica los PRAGMAs de rendimiento"""
+        # cached_statements: las sentencias preparadas se reutilizan entre llamadas.
+        # check_same_thread=False solo para poder cerrarlas todas desde el hilo principal;
+        # cada hilo sigue usando exclusivamente su propia conexión.
+        conn = sqlite3.connect(self.db_name,
+                               cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        for nombre, valor in self.PRAGMAS:
+            conn.execute(f"PRAGMA {nombre} = {valor}")
+        return conn
+    
+    @contextmanager
+    def escritura(self):
+        """Transacción de escritura que toma el lock de la base desde el inicio.
+        
+        Con BEGIN IMMEDIATE lo que se lee dentro de la transacción (por ejemplo
+        el próximo código) no puede cambiar hasta el COMMIT, aunque haya otras
+        instancias de la aplicación escribiendo en el mismo archivo.
+        """
+        conn = self.obtener()
+        for intento in range(self.REINTENTOS_ESCRITURA + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or intento == self.REINTENTOS_ESCRITURA:
+                    raise
+                time.sleep(random.uniform(0, self.ESPERA_BASE_REINTENTO * 2 ** intento))
+        
+        # El with de la conexión confirma al salir o revierte si hubo un error
+        with conn:
+            yield conn
+    
+    def cerrar_todas(self):
+        """Cierra todas las conexiones abiertas por cualquier hilo"""
+        with self._lock:
+            conexiones, self._conexiones = self._conexiones, []
+        for conn in conexiones:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -0,0 +1,110 @@
+# model/consulta_lista.py
+from model.cliente import COLUMNAS_CLIENTE
+from model.validaciones import CAMPOS_CLIENTE
+
+# Columnas de texto: se ordenan y filtran sin distinguir mayúsculas (NOCASE),
+# igual que los índices idx_clientes_<columna> que crea init_db
+COLUMNAS_TEXTO = COLUMNAS_CLIENTE[1:]
+
+# NOCASE de SQLite solo pliega las letras ASCII
+_PLEGAR_ASCII = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+class ConsultaLista:
+    """Orden y filtros de la lista de clientes, traducidos a SQL indexado.
+    
+    orden es cualquier columna de la tabla; el código desempata, así cada
+    fila tiene una clave (valor, codigo) única que sirve para paginar por
+    clave en los dos sentidos. filtros es {columna: texto}: las columnas de
+    texto filtran por prefijo sin distinguir mayúsculas (LIKE 'texto%', que
+    SQLite resuelve con el índice NOCASE de la columna) y el código por
+    igualdad. Es inmutable: cambiar el orden o los filtros crea otra.
+    """
+    
+    def __init__(self, orden='codigo', descendente=False, filtros=None):
+        if orden not in COLUMNAS_CLIENTE:
+            raise ValueError(f"No se puede ordenar por '{orden}'")
+        self.orden = orden
+        self.descendente = bool(descendente)
+        self.filtros = {}
+        for columna, texto in (filtros or {}).items():
+            if columna not in COLUMNAS_CLIENTE:
+                raise ValueError(f"No se puede filtrar por '{columna}'")
+            texto = str(texto).strip()
+            if not texto:
+                continue
+            if columna == 'codigo':
+                try:
+                    self.filtros[columna] = int(texto)
+                except ValueError:
+                    raise ValueError("El filtro de código debe ser un número") from None
+            else:
+                self.filtros[columna] = texto
+    
+    def orden_modificable(self):
+        """True si modificar un cliente puede cambiar su lugar en este orden"""
+        return self.orden in CAMPOS_CLIENTE
+    
+    def es_predeterminada(self):
+        """True si es la lista completa por código ascendente"""
+        return self.orden == 'codigo' and not self.descendente and not self.filtros
+    
+    def con_orden(self, columna):
+        """Nueva consulta ordenada por columna; si ya lo estaba, invierte el sentido"""
+        descendente = not self.descendente if columna == self.orden else False
+        return ConsultaLista(columna, descendente, self.filtros)
+    
+    def con_filtros(self, filtros):
+        """Nueva consulta con el mismo orden y otros filtros"""
+        return ConsultaLista(self.orden, self.descendente, filtros)
+    
+    def condiciones(self):
+        """Devuelve ([condición SQL], [parámetros]) de los filtros"""
+        condiciones = []
+        parametros = []
+        for columna, valor in self.filtros.items():
+            if columna == 'codigo':
+                condiciones.append("codigo = ?")
+                parametros.append(valor)
+            else:
+                condiciones.append(f"{columna} LIKE ? ESCAPE '\\'")
+                parametros.append(valor.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        return condiciones, parametros
+    
+    def order_by(self, invertido=False):
+        """Cláusula ORDER BY (sin la palabra clave); invertido recorre hacia atrás"""
+        sentido = "DESC" if self.descendente != invertido else "ASC"
+        if self.orden == 'codigo':
+            return f"codigo {sentido}"
+        return f"{self.orden} COLLATE NOCASE {sentido}, codigo {sentido}"
+    
+    def desde_clave(self, valor, codigo, inclusive=True, hacia_atras=False):
+        """Condición para las filas que vienen después de la clave (valor, codigo).
+        
+        Con hacia_atras, las que vienen antes (para recorrer con order_by(True)).
+        Se escribe como rango sobre la columna más un desempate por código para
+        que SQLite use el índice; una comparación de row values no respeta NOCASE.
+        """
+        ascendente = self.descendente == hacia_atras
+        op_codigo = (">" if ascendente else "<") + ("=" if inclusive else "")
+        if self.orden == 'codigo':
+            return f"codigo {op_codigo} ?", [codigo]
+        op_rango, op_estricto = (">=", ">") if ascendente else ("<=", "<")
+        return (f"{self.orden} {op_rango} ? COLLATE NOCASE AND "
+                f"({self.orden} {op_estricto} ? COLLATE NOCASE OR codigo {op_codigo} ?)",
+                [valor, valor, codigo])
+    
+    def clave(self, fila):
+        """Clave de orden de una fila, comparable como la compara SQLite"""
+        if self.orden == 'codigo':
+            return (fila['codigo'],)
+        return (fila[self.orden].translate(_PLEGAR_ASCII), fila['codigo'])
+    
+    def coincide(self, fila):
+        """True si la fila cumple los filtros (mismo criterio que el SQL)"""
+        for columna, valor in self.filtros.items():
+            if columna == 'codigo':
+                if fila['codigo'] != valor:
+                    return False
+            elif not fila[columna].translate(_PLEGAR_ASCII).startswith(valor.translate(_PLEGAR_ASCII)):
+                return False
+        return True
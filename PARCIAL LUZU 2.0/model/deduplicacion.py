@@ -0,0 +1,335 @@
+# model/deduplicacion.py
+"""
+Búsqueda de clientes casi duplicados sobre toda la tabla.
+
+Comparar todos los pares no escala, así que los clientes se agrupan en
+bloques por claves que comparten los duplicados probables: el apellido
+fonético (Rodríguez = Rodrigues), el final del teléfono y la parte local del
+email. Solo se comparan clientes del mismo bloque; los bloques de más de
+MAX_BLOQUE clientes se ordenan y cada uno se compara con los VENTANA
+siguientes (vecindario ordenado), así la cantidad de comparaciones crece en
+forma lineal con la cantidad de clientes.
+
+Los bloques se reparten en tareas que puntúan los pares en un pool de
+procesos. Los pares que superan el umbral se unen en grupos, que se
+devuelven ordenados del más probable al menos probable.
+"""
+
+import difflib
+import os
+import re
+import sys
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from model.validaciones import normalizar_telefono
+
+# Bloques que se comparan par contra par; los más grandes, por ventana
+MAX_BLOQUE = 50
+VENTANA = 8
+
+# Comparaciones (aproximadas) por tarea enviada al pool
+COMPARACIONES_POR_TAREA = 50000
+
+# Dígitos finales del teléfono que forman su clave de bloque
+DIGITOS_TELEFONO = 8
+
+# Peso de cada campo en el puntaje, en el orden en que se comparan: primero
+# los baratos, así la mayoría de los pares se descarta antes de comparar texto
+PESOS = (
+    ('telefono', 0.20),
+    ('apellido', 0.25),
+    ('nombre', 0.20),
+    ('email', 0.20),
+    ('direccion', 0.15),
+)
+
+# Posición de cada dato en la fila compacta que se envía a los procesos
+CODIGO, NOMBRE, APELLIDO, EMAIL, TELEFONO, DIRECCION, FONETICA = range(7)
+
+# Grupos de letras que suenan igual en castellano, en el orden en que se
+# reemplazan; quedan en mayúsculas para que las reglas siguientes no los toquen
+_PATRON_FONETICO = re.compile(r"ch|ll|qu|gu(?=[ei])|c(?=[ei])|g(?=[ei])")
+_GRUPOS_FONETICOS = {'ch': 'X', 'll': 'Y', 'qu': 'K', 'gu': 'G', 'c': 'S', 'g': 'J'}
+_LETRAS_FONETICAS = str.maketrans({
+    'a': None, 'e': None, 'i': None, 'o': None, 'u': None, 'h': None,
+    'b': 'B', 'v': 'B', 'w': 'B', 'c': 'K', 'k': 'K', 'q': 'K', 'g': 'G', 'j': 'J',
+    's': 'S', 'z': 'S', 'x': 'X', 'y': 'Y', 'd': 'D', 'f': 'F', 'l': 'L', 'm': 'M',
+    'n': 'N', 'p': 'P', 'r': 'R', 't': 'T',
+})
+_PATRON_REPETIDAS = re.compile(r"(.)\1+")
+_PATRON_NO_LETRAS = re.compile(r"[^a-z]")
+_PATRON_SEPARADORES_EMAIL = re.compile(r"[._-]")
+
+def plegar(texto):
+    """Texto en minúsculas, sin acentos ni espacios sobrantes"""
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return " ".join(texto.lower().split())
+
+def clave_fonetica(texto):
+    """Clave fonética castellana de una palabra ("Rodríguez" y "Rodrigues" dan RDRGS).
+    
+    Se conserva la vocal inicial y se quitan las demás; las letras que suenan
+    igual (b/v, s/z/c suave, g suave/j, ll/y...) comparten código y las
+    repeticiones se reducen a una.
+    """
+    # La hache inicial es muda: "Herrera" y "Errera" empiezan igual
+    texto = _PATRON_NO_LETRAS.sub("", plegar(texto)).lstrip("h")
+    if not texto:
+        return ""
+    inicial = "A" if texto[0] in "aeiou" else ""
+    texto = _PATRON_FONETICO.sub(lambda m: _GRUPOS_FONETICOS[m.group()], texto)
+    return inicial + _PATRON_REPETIDAS.sub(r"\1", texto.translate(_LETRAS_FONETICAS))
+
+def email_local(email):
+    """Parte local del email sin etiqueta (+algo) ni separadores"""
+    local = email.strip().lower().partition("@")[0].partition("+")[0]
+    return _PATRON_SEPARADORES_EMAIL.sub("", local)
+
+def fila_compacta(cliente):
+    """Datos de un Cliente normalizados para comparar (posiciones CODIGO, NOMBRE...).
+    
+    Nombres y apellidos se repiten mucho entre clientes: se internan para
+    que todas las filas compartan un único str por valor.
+    """
+    return (cliente.codigo, sys.intern(plegar(cliente.nombre)), sys.intern(plegar(cliente.apellido)),
+            email_local(cliente.email), normalizar_telefono(cliente.telefono) or "",
+            plegar(cliente.direccion), sys.intern(clave_fonetica(cliente.apellido)))
+
+def claves_de_bloque(fila):
+    """Claves de los bloques en los que entra una fila compacta"""
+    claves = []
+    if fila[FONETICA]:
+        claves.append("A:" + fila[FONETICA])
+    if len(fila[TELEFONO]) >= DIGITOS_TELEFONO:
+        claves.append("T:" + fila[TELEFONO][-DIGITOS_TELEFONO:])
+    if len(fila[EMAIL]) >= 3:
+        claves.append("E:" + fila[EMAIL])
+    return claves
+
+def similitud_texto(a, b, minimo=0.0):
+    """Similitud entre 0 y 1 de dos textos ya plegados.
+    
+    Si la similitud no puede llegar a minimo se devuelve 0 sin compararlos:
+    dos textos distintos nunca llegan a 1 y la diferencia de largos ya pone
+    un tope a la similitud.
+    """
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b or minimo >= 1.0:
+        return 0.0
+    if 2.0 * min(len(a), len(b)) / (len(a) + len(b)) < minimo:
+        return 0.0
+    comparador = difflib.SequenceMatcher(None, a, b)
+    if comparador.quick_ratio() < minimo:
+        return 0.0
+    return comparador.ratio()
+
+# Similitud que resta cada dígito distinto entre dos teléfonos
+PENALIDAD_DIGITO = 0.25
+
+def similitud_telefono(a, b, minimo=0.0):
+    """Similitud de dos teléfonos comparando dígito a dígito desde el final.
+    
+    Un dígito mal tipeado todavía cuenta como parecido; con cuatro distintos
+    ya son números diferentes.
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    distintos = abs(len(a) - len(b)) + sum(x != y for x, y in zip(reversed(a), reversed(b)))
+    return max(0.0, 1.0 - PENALIDAD_DIGITO * distintos)
+
+# Similitud mínima de dos apellidos que suenan igual
+SIMILITUD_FONETICA = 0.9
+
+def _similitud_apellido(a, b, minimo):
+    similitud = similitud_texto(a[APELLIDO], b[APELLIDO], min(minimo, SIMILITUD_FONETICA))
+    if similitud < SIMILITUD_FONETICA and a[FONETICA] and a[FONETICA] == b[FONETICA]:
+        return SIMILITUD_FONETICA
+    return similitud
+
+_SIMILITUDES = {
+    'telefono': lambda a, b, minimo: similitud_telefono(a[TELEFONO], b[TELEFONO], minimo),
+    'apellido': _similitud_apellido,
+    'nombre': lambda a, b, minimo: similitud_texto(a[NOMBRE], b[NOMBRE], minimo),
+    'email': lambda a, b, minimo: similitud_texto(a[EMAIL], b[EMAIL], minimo),
+    'direccion': lambda a, b, minimo: similitud_texto(a[DIRECCION], b[DIRECCION], minimo),
+}
+
+def puntaje(a, b, umbral=0.0):
+    """Similitud ponderada entre 0 y 1 de dos filas compactas.
+    
+    Devuelve 0 en cuanto los campos que faltan comparar ya no alcanzan para
+    llegar al umbral. A cada campo se le pasa la similitud mínima que
+    necesita para que el par siga en carrera, así los textos que no llegan
+    se descartan sin compararlos del todo.
+    """
+    total = 0.0
+    restante = 1.0
+    for campo, peso in PESOS:
+        restante -= peso
+        # El margen evita descartar por redondeo un par justo en el umbral
+        minimo = (umbral - total - restante) / peso - 1e-9
+        total += peso * _SIMILITUDES[campo](a, b, minimo)
+        if total + restante < umbral:
+            return 0.0
+    return total
+
+def _clave_vecindario(fila):
+    return (fila[FONETICA], fila[NOMBRE], fila[DIRECCION], fila[CODIGO])
+
+def pares_del_bloque(filas):
+    """Genera los pares de filas de un bloque que hay que comparar.
+    
+    Los bloques de más de MAX_BLOQUE filas llegan ya ordenados (ver
+    armar_tareas) y cada fila se compara solo con las VENTANA siguientes.
+    """
+    if len(filas) <= MAX_BLOQUE:
+        for i, a in enumerate(filas):
+            for b in filas[i + 1:]:
+                yield a, b
+    else:
+        for i, a in enumerate(filas):
+            for b in filas[i + 1:i + 1 + VENTANA]:
+                yield a, b
+
+def comparaciones_del_bloque(cantidad):
+    """Cantidad de pares que pares_del_bloque genera para un bloque de ese tamaño"""
+    if cantidad <= MAX_BLOQUE:
+        return cantidad * (cantidad - 1) // 2
+    return cantidad * VENTANA
+
+def comparar_bloques(bloques, umbral):
+    """Tarea del pool: pares (codigo_menor, codigo_mayor, puntaje) que llegan al umbral"""
+    pares = []
+    for filas in bloques:
+        for a, b in pares_del_bloque(filas):
+            valor = puntaje(a, b, umbral)
+            if valor >= umbral:
+                if a[CODIGO] > b[CODIGO]:
+                    a, b = b, a
+                pares.append((a[CODIGO], b[CODIGO], valor))
+    return pares
+
+def armar_tareas(bloques):
+    """Reparte los bloques en tareas de unas COMPARACIONES_POR_TAREA comparaciones.
+    
+    Los bloques grandes se ordenan y se parten en tramos que se solapan en
+    VENTANA filas, así ningún bloque queda entero en una sola tarea y todos
+    los vecinos de cada fila siguen en el mismo tramo.
+    """
+    largo_tramo = COMPARACIONES_POR_TAREA // VENTANA
+    tarea = []
+    comparaciones = 0
+    for filas in bloques:
+        if len(filas) > MAX_BLOQUE:
+            filas = sorted(filas, key=_clave_vecindario)
+            partes = [filas[inicio:inicio + largo_tramo + VENTANA]
+                      for inicio in range(0, len(filas), largo_tramo)]
+        else:
+            partes = [filas]
+        for parte in partes:
+            tarea.append(parte)
+            comparaciones += comparaciones_del_bloque(len(parte))
+            if comparaciones >= COMPARACIONES_POR_TAREA:
+                yield tarea
+                tarea = []
+                comparaciones = 0
+    if tarea:
+        yield tarea
+
+def agrupar_pares(pares):
+    """Une los pares {(a, b): puntaje} en grupos, del más probable al menos probable.
+    
+    Dos clientes quedan en el mismo grupo si hay una cadena de pares que los
+    une. El puntaje del grupo es el de su mejor par; a igual puntaje van
+    primero los grupos más grandes.
+    """
+    padre = {}
+    
+    def raiz(codigo):
+        while padre.setdefault(codigo, codigo) != codigo:
+            padre[codigo] = padre[padre[codigo]]
+            codigo = padre[codigo]
+        return codigo
+    
+    for a, b in pares:
+        raiz_a, raiz_b = raiz(a), raiz(b)
+        if raiz_a != raiz_b:
+            padre[max(raiz_a, raiz_b)] = min(raiz_a, raiz_b)
+    
+    grupos = {}
+    for (a, b), valor in pares.items():
+        grupo = grupos.setdefault(raiz(a), {'codigos': set(), 'puntaje': 0.0, 'pares': []})
+        grupo['codigos'].update((a, b))
+        grupo['puntaje'] = max(grupo['puntaje'], valor)
+        grupo['pares'].append((a, b, round(valor, 3)))
+    
+    resultado = []
+    for grupo in grupos.values():
+        grupo['codigos'] = sorted(grupo['codigos'])
+        grupo['puntaje'] = round(grupo['puntaje'], 3)
+        grupo['pares'].sort(key=lambda par: (-par[2], par[0], par[1]))
+        resultado.append(grupo)
+    resultado.sort(key=lambda grupo: (-grupo['puntaje'], -len(grupo['codigos']), grupo['codigos'][0]))
+    return resultado
+
+def buscar_grupos_duplicados(lotes, umbral=0.8, procesos=None, progreso=None):
+    """Busca grupos de clientes casi duplicados.
+    
+    lotes es un iterable de lotes de Cliente, por ejemplo
+    ClienteModel.exportar_clientes(). procesos es la cantidad de procesos del
+    pool (por defecto, uno por CPU). progreso, si se indica, se llama como
+    progreso(etapa, hechos, total) con etapa "lectura" (total None, hechos =
+    clientes leídos) o "comparacion" (tareas terminadas de total).
+    Devuelve la lista de agrupar_pares: dicts con 'codigos', 'puntaje' y
+    'pares' (codigo_a, codigo_b, puntaje).
+    """
+    avisar = progreso or (lambda etapa, hechos, total: None)
+    
+    # Casi todas las claves de email y teléfono son de un único cliente: se
+    # guarda la fila sola y la lista se arma recién cuando aparece el segundo
+    bloques = {}
+    leidos = 0
+    for lote in lotes:
+        for cliente in lote:
+            fila = fila_compacta(cliente)
+            for clave in claves_de_bloque(fila):
+                bloque = bloques.get(clave)
+                if bloque is None:
+                    bloques[clave] = fila
+                elif bloque.__class__ is list:
+                    bloque.append(fila)
+                else:
+                    bloques[clave] = [bloque, fila]
+        leidos += len(lote)
+        avisar("lectura", leidos, None)
+    
+    tareas = list(armar_tareas(bloque for bloque in bloques.values() if bloque.__class__ is list))
+    del bloques
+    
+    mejores = {}
+    procesos = procesos or os.cpu_count() or 1
+    pendientes = set()
+    hechas = 0
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        # Pocas tareas en vuelo a la vez: cada una lleva sus filas serializadas
+        por_enviar = iter(tareas)
+        while True:
+            for tarea in por_enviar:
+                pendientes.add(pool.submit(comparar_bloques, tarea, umbral))
+                if len(pendientes) >= 2 * procesos:
+                    break
+            if not pendientes:
+                break
+            terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                for a, b, valor in futuro.result():
+                    if valor > mejores.get((a, b), 0.0):
+                        mejores[(a, b)] = valor
+            hechas += len(terminados)
+            avisar("comparacion", hechas, len(tareas))
+    
+    return agrupar_pares(mejores)
@@ -0,0 +1,144 @@
+# model/exportacion.py
+"""
+Formatos de exportación de la base de clientes.
+
+Los escritores reciben un iterable de lotes de Cliente (por ejemplo
+ClienteModel.exportar_clientes()) y los vuelcan a disco lote por lote con
+un buffer grande, así la memoria usada no depende del tamaño de la tabla.
+Se escribe sobre un archivo temporal que reemplaza al destino solo si la
+exportación terminó bien.
+
+Formato binario (instantánea): la cabecera CABECERA_BINARIA y luego un
+registro por cliente con la estructura REGISTRO_BINARIO (largo en bytes del
+texto, código y largo en caracteres de cada uno de los seis campos de texto)
+seguida del texto de los seis campos concatenado en UTF-8.
+"""
+
+import csv
+import json
+import os
+import struct
+
+from model.cliente import COLUMNAS_CLIENTE, Cliente
+
+CABECERA_BINARIA = b"SANDTECH-CLIENTES\x00\x01"
+REGISTRO_BINARIO = struct.Struct('<Iq6H')
+
+# Buffer de escritura y tamaño de bloque de lectura
+TAMANO_BUFFER = 1 << 20
+
+def _escribir_con_reemplazo(ruta, binario, escribir):
+    """Abre un temporal junto a ruta, llama a escribir(archivo) y lo renombra a ruta"""
+    temporal = ruta + ".tmp"
+    if binario:
+        archivo = open(temporal, 'wb', buffering=TAMANO_BUFFER)
+    else:
+        archivo = open(temporal, 'w', newline='', encoding='utf-8', buffering=TAMANO_BUFFER)
+    try:
+        with archivo:
+            total = escribir(archivo)
+        os.replace(temporal, ruta)
+        return total
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+def escribir_csv(lotes, ruta):
+    """Escribe los clientes en CSV con encabezado; devuelve la cantidad escrita"""
+    def escribir(archivo):
+        escritor = csv.writer(archivo)
+        escritor.writerow(COLUMNAS_CLIENTE)
+        total = 0
+        for lote in lotes:
+            # Un Cliente es una tupla con las columnas en orden
+            escritor.writerows(lote)
+            total += len(lote)
+        return total
+    return _escribir_con_reemplazo(ruta, False, escribir)
+
+def escribir_jsonl(lotes, ruta):
+    """Escribe un objeto JSON por línea; devuelve la cantidad escrita"""
+    codificar = json.JSONEncoder(ensure_ascii=False).encode
+    
+    def escribir(archivo):
+        total = 0
+        for lote in lotes:
+            archivo.write("".join(codificar(dict(zip(COLUMNAS_CLIENTE, cliente))) + "\n"
+                                  for cliente in lote))
+            total += len(lote)
+        return total
+    return _escribir_con_reemplazo(ruta, False, escribir)
+
+def escribir_binario(lotes, ruta):
+    """Escribe una instantánea binaria; devuelve la cantidad escrita"""
+    empaquetar = REGISTRO_BINARIO.pack
+    
+    def escribir(archivo):
+        archivo.write(CABECERA_BINARIA)
+        total = 0
+        for lote in lotes:
+            partes = []
+            for codigo, *textos in lote:
+                texto = "".join(textos).encode('utf-8')
+                try:
+                    partes.append(empaquetar(len(texto), codigo, *map(len, textos)))
+                except struct.error:
+                    raise ValueError(f"El cliente {codigo} tiene un campo demasiado largo "
+                                     f"para el formato binario") from None
+                partes.append(texto)
+            archivo.write(b"".join(partes))
+            total += len(lote)
+        return total
+    return _escribir_con_reemplazo(ruta, True, escribir)
+
+def leer_binario(ruta):
+    """Genera lotes de Cliente a partir de una instantánea binaria.
+    
+    Lee de a bloques de TAMANO_BUFFER bytes y decodifica el texto de cada
+    registro de una sola vez; cada lote son los registros completos de un
+    bloque.
+    """
+    desempaquetar = REGISTRO_BINARIO.unpack_from
+    tamano_registro = REGISTRO_BINARIO.size
+    nueva_tupla = tuple.__new__
+    
+    with open(ruta, 'rb') as archivo:
+        if archivo.read(len(CABECERA_BINARIA)) != CABECERA_BINARIA:
+            raise ValueError(f"{ruta} no es una instantánea binaria de clientes")
+        
+        pendiente = b""
+        while True:
+            bloque = archivo.read(TAMANO_BUFFER)
+            if not bloque:
+                break
+            datos = pendiente + bloque if pendiente else bloque
+            fin = len(datos)
+            posicion = 0
+            lote = []
+            while posicion + tamano_registro <= fin:
+                largo, codigo, l1, l2, l3, l4, l5, l6 = desempaquetar(datos, posicion)
+                inicio = posicion + tamano_registro
+                if inicio + largo > fin:
+                    break
+                texto = datos[inicio:inicio + largo].decode('utf-8')
+                a = l1
+                b = a + l2
+                c = b + l3
+                d = c + l4
+                e = d + l5
+                lote.append(nueva_tupla(Cliente, (codigo, texto[:a], texto[a:b], texto[b:c],
+                                                  texto[c:d], texto[d:e], texto[e:e + l6])))
+                posicion = inicio + largo
+            pendiente = datos[posicion:]
+            if lote:
+                yield lote
+        
+        if pendiente:
+            raise ValueError(f"{ruta} está incompleto: el último registro está cortado")
+
+ESCRITORES = {
+    'csv': escribir_csv,
+    'jsonl': escribir_jsonl,
+    'bin': escribir_binario,
+}
@@ -0,0 +1,125 @@
+# model/metricas.py
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from model.cliente import Cliente
+
+# Límites superiores (en ms) de los intervalos del histograma de latencias
+LIMITES_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+class Medicion:
+    """Cantidad de llamadas, histograma de latencias y filas devueltas de una operación"""
+    
+    def __init__(self):
+        self.llamadas = 0
+        self.total_ms = 0.0
+        self.maximo_ms = 0.0
+        self.filas = 0
+        self.histograma = [0] * len(LIMITES_MS)
+    
+    def registrar(self, ms, filas):
+        self.llamadas += 1
+        self.total_ms += ms
+        if ms > self.maximo_ms:
+            self.maximo_ms = ms
+        if filas:
+            self.filas += filas
+        self.histograma[bisect_left(LIMITES_MS, ms)] += 1
+    
+    def percentil(self, p):
+        """Percentil aproximado: límite superior del intervalo que lo contiene"""
+        objetivo = self.llamadas * p / 100
+        acumulado = 0
+        for limite, cantidad in zip(LIMITES_MS, self.histograma):
+            acumulado += cantidad
+            if acumulado >= objetivo and cantidad:
+                return min(limite, self.maximo_ms)
+        return self.maximo_ms
+    
+    def resumen(self):
+        return {
+            'llamadas': self.llamadas,
+            'media_ms': self.total_ms / self.llamadas if self.llamadas else 0.0,
+            'p50_ms': self.percentil(50),
+            'p95_ms': self.percentil(95),
+            'p99_ms': self.percentil(99),
+            'maximo_ms': self.maximo_ms,
+            'total_ms': self.total_ms,
+            'filas': self.filas,
+            'histograma': {f"<={limite}": cantidad
+                           for limite, cantidad in zip(LIMITES_MS, self.histograma) if cantidad},
+        }
+
+class Metricas:
+    """Registro de tiempos de las operaciones instrumentadas, compartido entre hilos"""
+    
+    def __init__(self):
+        self.activas = False
+        self._mediciones = {}
+        self._lock = threading.Lock()
+        self._instrumentados = []
+    
+    def registrar(self, nombre, ms, filas=None):
+        with self._lock:
+            medicion = self._mediciones.get(nombre)
+            if medicion is None:
+                medicion = self._mediciones[nombre] = Medicion()
+            medicion.registrar(ms, filas)
+    
+    def instrumentar(self, clase, metodos, prefijo):
+        """Envuelve los métodos de la clase para medir cada llamada.
+        
+        Solo se llama al activar las métricas: sin activarlas los métodos
+        quedan intactos y no hay ningún costo agregado.
+        """
+        self.activas = True
+        for nombre in metodos:
+            original = getattr(clase, nombre)
+            setattr(clase, nombre, self._medido(original, f"{prefijo}.{nombre}"))
+            self._instrumentados.append((clase, nombre, original))
+    
+    def desinstrumentar(self):
+        """Restaura los métodos originales"""
+        for clase, nombre, original in reversed(self._instrumentados):
+            setattr(clase, nombre, original)
+        self._instrumentados.clear()
+        self.activas = False
+    
+    def _medido(self, funcion, nombre):
+        registrar = self.registrar
+        reloj = time.perf_counter
+        
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = reloj()
+            resultado = funcion(*args, **kwargs)
+            ms = (reloj() - inicio) * 1000
+            # Filas devueltas: listas de clientes o un cliente
+            if isinstance(resultado, list):
+                filas = len(resultado)
+            elif isinstance(resultado, (dict, Cliente)):
+                filas = 1
+            else:
+                filas = None
+            registrar(nombre, ms, filas)
+            return resultado
+        return envoltura
+    
+    def resumen(self):
+        """Devuelve {operación: resumen}, de la más costosa en total a la menos"""
+        with self._lock:
+            resumenes = {nombre: medicion.resumen() for nombre, medicion in self._mediciones.items()}
+        return dict(sorted(resumenes.items(), key=lambda item: -item[1]['total_ms']))
+    
+    def reiniciar(self):
+        with self._lock:
+            self._mediciones.clear()
+    
+    def guardar_json(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(self.resumen(), archivo, indent=2, ensure_ascii=False)
+
+# Registro único de la aplicación
+metricas = Metricas()
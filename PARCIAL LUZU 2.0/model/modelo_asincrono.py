@@ -0,0 +1,174 @@
+# model/modelo_asincrono.py
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class Solicitud:
+    """Una operación encolada sobre el modelo, que se puede cancelar"""
+    
+    def __init__(self, funcion, args, al_terminar, al_fallar, clave, es_lectura):
+        self.funcion = funcion
+        self.args = args
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.clave = clave
+        self.es_lectura = es_lectura
+        self.cancelada = False
+        self.conexion = None  # Conexión en uso mientras se ejecuta una lectura
+        self._lock = threading.Lock()
+    
+    def cancelar(self):
+        """Descarta el resultado y, si la lectura se está ejecutando, la interrumpe"""
+        with self._lock:
+            self.cancelada = True
+            if self.conexion is not None:
+                self.conexion.interrupt()
+
+class ModeloAsincrono:
+    """Ejecuta los métodos de ClienteModel fuera del hilo de la interfaz.
+    
+    Las escrituras van a un único hilo escritor (SQLite admite un escritor a la
+    vez) y las lecturas a un pequeño grupo de lectores, que con WAL no se
+    bloquean entre sí. Los resultados y los eventos de cambio del modelo vuelven
+    al hilo de Tk con root.after. Sin root todo se ejecuta en el momento, en el
+    mismo hilo (útil para scripts y pruebas).
+    
+    leer, escribir y cancelar deben llamarse desde el hilo de Tk.
+    """
+    
+    # Cada cuántos ms se revisan los resultados mientras hay solicitudes pendientes
+    INTERVALO_SONDEO = 15
+    
+    def __init__(self, model, root=None, lectores=2, al_fallar=None, al_cambiar_ocupado=None):
+        self.model = model
+        self.root = root
+        self.al_fallar = al_fallar
+        self.al_cambiar_ocupado = al_cambiar_ocupado
+        self.pendientes = 0
+        self.por_clave = {}
+        self.lecturas_en_curso = set()
+        self._resultados = queue.SimpleQueue()
+        self._sondeando = False
+        self._escritor = None
+        self._lectores = None
+        
+        if root is not None:
+            self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sandtech-escritor")
+            self._lectores = ThreadPoolExecutor(max_workers=lectores, thread_name_prefix="sandtech-lector")
+    
+    def leer(self, funcion, *args, al_terminar=None, al_fallar=None, clave=None):
+        """Encola una consulta. Si se indica clave, cancela la anterior con la misma clave"""
+        return self._enviar(Solicitud(funcion, args, al_terminar, al_fallar, clave, True))
+    
+    def escribir(self, funcion, *args, al_terminar=None, al_fallar=None):
+        """Encola una modificación; las escrituras se ejecutan en orden y no se cancelan"""
+        return self._enviar(Solicitud(funcion, args, al_terminar, al_fallar, None, False))
+    
+    def suscribir(self, callback):
+        """Registra un callback(tipo, codigo, valores) de cambios que se ejecuta en el hilo de Tk"""
+        self.model.suscribir(
+            lambda tipo, codigo, valores: self._resultados.put(("cambio", callback, (tipo, codigo, valores))))
+    
+    def cancelar(self, clave):
+        """Cancela la solicitud pendiente con la clave dada, si la hay"""
+        solicitud = self.por_clave.pop(clave, None)
+        if solicitud is not None:
+            solicitud.cancelar()
+    
+    def cancelar_lecturas(self):
+        """Cancela todas las consultas pendientes o en ejecución"""
+        for solicitud in list(self.lecturas_en_curso):
+            solicitud.cancelar()
+        self.por_clave.clear()
+    
+    def cerrar(self):
+        """Cancela las consultas pendientes y espera a que terminen las escrituras"""
+        self.cancelar_lecturas()
+        if self._lectores is not None:
+            self._lectores.shutdown(wait=True, cancel_futures=True)
+            self._escritor.shutdown(wait=True)
+    
+    def _enviar(self, solicitud):
+        """Encola la solicitud en el ejecutor que corresponde"""
+        if solicitud.clave is not None:
+            self.cancelar(solicitud.clave)
+            self.por_clave[solicitud.clave] = solicitud
+        if solicitud.es_lectura:
+            self.lecturas_en_curso.add(solicitud)
+        
+        if self.root is None:
+            self._ejecutar(solicitud)
+            self._procesar_resultados()
+            return solicitud
+        
+        self._cambiar_pendientes(1)
+        ejecutor = self._lectores if solicitud.es_lectura else self._escritor
+        ejecutor.submit(self._ejecutar, solicitud)
+        self._programar_sondeo()
+        return solicitud
+    
+    def _ejecutar(self, solicitud):
+        """Corre en el hilo de trabajo: ejecuta la función y encola el resultado"""
+        resultado = error = None
+        if not solicitud.cancelada:
+            if solicitud.es_lectura:
+                with solicitud._lock:
+                    solicitud.conexion = self.model.conexiones.obtener()
+            try:
+                resultado = solicitud.funcion(*solicitud.args)
+            except Exception as e:
+                error = e
+            finally:
+                with solicitud._lock:
+                    solicitud.conexion = None
+        self._resultados.put(("resultado", solicitud, (resultado, error)))
+    
+    def _programar_sondeo(self):
+        if not self._sondeando:
+            self._sondeando = True
+            self.root.after(self.INTERVALO_SONDEO, self._sondear)
+    
+    def _sondear(self):
+        """Corre en el hilo de Tk: entrega los resultados listos"""
+        self._sondeando = False
+        try:
+            self._procesar_resultados()
+        finally:
+            if self.pendientes or not self._resultados.empty():
+                self._programar_sondeo()
+    
+    def _procesar_resultados(self):
+        while True:
+            try:
+                tipo, destino, datos = self._resultados.get_nowait()
+            except queue.Empty:
+                return
+            
+            if tipo == "cambio":
+                destino(*datos)
+                continue
+            
+            solicitud = destino
+            resultado, error = datos
+            self.lecturas_en_curso.discard(solicitud)
+            if solicitud.clave is not None and self.por_clave.get(solicitud.clave) is solicitud:
+                del self.por_clave[solicitud.clave]
+            if self.root is not None:
+                self._cambiar_pendientes(-1)
+            
+            if solicitud.cancelada:
+                continue
+            if error is not None:
+                manejador = solicitud.al_fallar or self.al_fallar
+                if manejador is None:
+                    raise error
+                manejador(error)
+            elif solicitud.al_terminar is not None:
+                solicitud.al_terminar(resultado)
+    
+    def _cambiar_pendientes(self, delta):
+        """Lleva la cuenta de solicitudes en curso y avisa cuando cambia el estado ocupado"""
+        estaba_ocupado = self.pendientes > 0
+        self.pendientes += delta
+        if self.al_cambiar_ocupado and estaba_ocupado != (self.pendientes > 0):
+            self.al_cambiar_ocupado(self.pendientes > 0)
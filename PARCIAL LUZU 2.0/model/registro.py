@@ -0,0 +1,90 @@
+# model/registro.py
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Logger raíz de la aplicación; cada módulo usa un hijo (sandtech.model, sandtech.controller...)
+NOMBRE_LOGGER = "sandtech"
+
+_listener = None
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro, con los campos extra pasados en datos"""
+    
+    def format(self, record):
+        entrada = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'origen': record.name,
+            'hilo': record.threadName,
+            'mensaje': record.getMessage(),
+        }
+        datos = getattr(record, 'datos', None)
+        if datos:
+            entrada.update(datos)
+        if record.exc_info:
+            entrada['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+class ManejadorCola(QueueHandler):
+    """Encola el registro tal cual: el formateo lo hace el hilo escritor.
+    
+    QueueHandler formatea el mensaje en el hilo que llama para poder enviarlo a
+    otro proceso; acá la cola es local, así que no hace falta.
+    """
+    
+    def prepare(self, record):
+        return record
+
+def configurar_registro(archivo="sandtech.log", nivel=None, consola=True,
+                        max_bytes=5 * 1024 * 1024, respaldos=3):
+    """Configura el registro de la aplicación.
+    
+    Los llamadores solo encolan; un hilo en segundo plano escribe en el archivo
+    (JSON por línea, con rotación) y, opcionalmente, en consola. Los mensajes
+    por debajo de nivel se descartan antes de formatearse. Sin nivel se usa la
+    variable de entorno SANDTECH_LOG_NIVEL (por defecto INFO; DEBUG incluye
+    cada lectura). Se puede llamar más de una vez: reemplaza la configuración
+    anterior.
+    """
+    global _listener
+    detener_registro()
+    if nivel is None:
+        nivel = os.environ.get("SANDTECH_LOG_NIVEL", "INFO")
+    
+    manejadores = []
+    if archivo:
+        archivo_log = RotatingFileHandler(archivo, maxBytes=max_bytes, backupCount=respaldos,
+                                          encoding='utf-8', delay=True)
+        archivo_log.setFormatter(FormatoJSON())
+        manejadores.append(archivo_log)
+    if consola:
+        salida = logging.StreamHandler(sys.stdout)
+        salida.setFormatter(logging.Formatter("[%(asctime)s] LOG: %(message)s", "%Y-%m-%d %H:%M:%S"))
+        manejadores.append(salida)
+    
+    cola = queue.SimpleQueue()
+    logger = logging.getLogger(NOMBRE_LOGGER)
+    logger.handlers = [ManejadorCola(cola)]
+    logger.setLevel(nivel.upper() if isinstance(nivel, str) else nivel)
+    logger.propagate = False
+    
+    _listener = QueueListener(cola, *manejadores)
+    _listener.start()
+    return logger
+
+def detener_registro():
+    """Escribe los registros pendientes y detiene el hilo escritor"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for manejador in _listener.handlers:
+            manejador.close()
+        _listener = None
+
+atexit.register(detener_registro)
@@ -0,0 +1,121 @@
+# model/replicacion.py
+"""
+Replicación de clientes entre las bases de dos sedes.
+
+Cada sede trabaja sobre su propia base y cada tanto se sincroniza con otra,
+archivo contra archivo, sin un servidor de por medio. Solo viajan los
+clientes que cambiaron desde la sincronización anterior, leídos del registro
+de cambios de la base de origen (ClienteModel.cambios_desde), y se aplican de
+a lotes: cada lote es una transacción que guarda también hasta qué versión
+se llegó, así que si se corta en el medio la próxima vez sigue desde el
+último lote completo.
+
+Los conflictos (el mismo cliente cambiado en las dos sedes) se resuelven por
+fila con relojes de Lamport: gana el cambio de reloj mayor y, si empatan, el
+de la sede de número mayor. No depende de la hora de cada computadora ni del
+sentido en que se sincronice, así que las dos bases terminan iguales (ver
+ClienteModel.aplicar_cambios_replicados).
+"""
+
+import logging
+import time
+
+log = logging.getLogger("sandtech.replicacion")
+
+# Cambios por transacción en la base de destino
+TAMANO_LOTE = 1000
+
+def _sedes(origen, destino):
+    """Sedes de las dos bases; lanza ValueError si no sirven para replicar"""
+    sede_origen, sede_destino = origen.obtener_sede(), destino.obtener_sede()
+    if not sede_origen or not sede_destino:
+        raise ValueError("Las dos bases necesitan un número de sede (ver ClienteModel.configurar_sede)")
+    if sede_origen == sede_destino:
+        raise ValueError(f"Las dos bases tienen la misma sede ({sede_origen})")
+    return sede_origen, sede_destino
+
+def replicar(origen, destino, tamano_lote=TAMANO_LOTE, progreso=None):
+    """Lleva a destino los cambios de origen que todavía no tiene.
+    
+    origen y destino son ClienteModel de sedes distintas. La primera vez (o
+    si origen ya compactó su registro más allá de lo que destino aplicó) se
+    copian todos los clientes de origen y después los cambios hechos mientras
+    tanto; en esa copia no viajan las bajas anteriores. Los cambios que
+    origen recibió de destino no se devuelven. progreso(leidos) se llama
+    después de cada lote.
+    
+    Devuelve un dict con leidos, aplicados, descartados, colisiones (lista
+    de códigos, ver aplicar_cambios_replicados), copia_completa y segundos.
+    Lanza ValueError si las sedes no sirven y sqlite3.Error si falla un lote
+    (los lotes anteriores quedan aplicados).
+    """
+    sede_origen, sede_destino = _sedes(origen, destino)
+    resumen = {'leidos': 0, 'aplicados': 0, 'descartados': 0, 'colisiones': [], 'copia_completa': False}
+    inicio = time.perf_counter()
+    
+    def aplicar(cambios, version):
+        resultado = destino.aplicar_cambios_replicados(
+            [cambio for cambio in cambios if cambio['sede'] != sede_destino], sede_origen, version)
+        resumen['leidos'] += len(cambios)
+        resumen['aplicados'] += resultado['aplicados']
+        resumen['descartados'] += resultado['descartados']
+        resumen['colisiones'] += resultado['colisiones']
+        if progreso:
+            progreso(resumen['leidos'])
+    
+    def aplicar_cambios_desde(version):
+        while True:
+            cambios = origen.cambios_desde(version, tamano_lote)
+            if not cambios:
+                return
+            version = cambios[-1]['version']
+            aplicar(cambios, version)
+            if len(cambios) < tamano_lote:
+                return
+    
+    version = destino.version_replicada(sede_origen)
+    if version is not None:
+        try:
+            aplicar_cambios_desde(version)
+            version = None
+        except ValueError as e:
+            log.warning("Sede %d: %s. Se copian todos sus clientes", sede_origen, e)
+            resumen['copia_completa'] = True
+    else:
+        resumen['copia_completa'] = True
+    
+    if resumen['copia_completa']:
+        # La versión se toma antes de copiar: lo que cambie mientras tanto
+        # llega después con cambios_desde
+        version = origen.version_cambios()
+        codigo = 0
+        while True:
+            clientes = origen.clientes_para_replicar(codigo, tamano_lote)
+            ultimo_lote = len(clientes) < tamano_lote
+            # Hasta terminar la copia no se guarda la versión: si se corta,
+            # la próxima vez vuelve a empezar
+            aplicar(clientes, version if ultimo_lote else None)
+            if ultimo_lote:
+                break
+            codigo = clientes[-1]['codigo']
+        aplicar_cambios_desde(version)
+    
+    resumen['segundos'] = time.perf_counter() - inicio
+    log.info("Replicación sede %d -> %d - %d leídos, %d aplicados, %d descartados, %d colisiones en %.2f s",
+             sede_origen, sede_destino, resumen['leidos'], resumen['aplicados'], resumen['descartados'],
+             len(resumen['colisiones']), resumen['segundos'],
+             extra={'datos': {'operacion': 'replicacion', 'origen': sede_origen, 'destino': sede_destino,
+                              'leidos': resumen['leidos'], 'aplicados': resumen['aplicados'],
+                              'colisiones': len(resumen['colisiones'])}})
+    return resumen
+
+def sincronizar(base_a, base_b, tamano_lote=TAMANO_LOTE, progreso=None):
+    """Replica en los dos sentidos; devuelve los resúmenes de ida y de vuelta.
+    
+    Una pasada alcanza para que las dos bases queden iguales: en la vuelta
+    viajan los cambios de base_b (incluidos los que ganaron un conflicto) y
+    no los que acaban de llegar de base_a.
+    """
+    ida = replicar(base_a, base_b, tamano_lote, progreso)
+    vuelta = replicar(base_b, base_a, tamano_lote, progreso)
+    return ida, vuelta
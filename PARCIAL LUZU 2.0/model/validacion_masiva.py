@@ -0,0 +1,188 @@
+# model/validacion_masiva.py
+"""
+Validación de archivos de clientes completos, antes de importarlos.
+
+El archivo se lee de a bloques (nunca completo en memoria) y cada bloque se
+valida en un pool de procesos con las mismas reglas que el formulario y la
+importación (REGLAS_CLIENTE de validaciones.py). A los procesos se envía el
+texto de cada registro sin decodificar: serializar filas ya separadas en
+campos cuesta varias veces más que el texto, así que el proceso principal
+solo corta el archivo en registros y los reparte; cada proceso los separa
+con csv o json y los valida sin armar un dict por fila.
+
+Los resultados vuelven en el orden del archivo, bloque por bloque, así el
+reporte de filas rechazadas se puede escribir a medida que llegan.
+"""
+
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from operator import itemgetter
+
+from model.validaciones import CAMPOS_CLIENTE, compilar_validador, validar_fila
+
+# Filas por bloque enviado al pool
+TAMANO_BLOQUE = 10000
+
+FORMATOS = ('csv', 'jsonl')
+
+# Líneas que csv.reader devuelve como fila vacía (DictReader las saltea)
+_LINEAS_VACIAS = frozenset(('\n', '\r\n', '\r'))
+
+_validar_cliente = compilar_validador(CAMPOS_CLIENTE)
+
+def _unir_registros(lineas, archivo):
+    """Une las líneas de un mismo registro CSV (un campo entre comillas puede
+    tener saltos de línea). Dónde termina cada registro lo dice csv.reader,
+    así una comilla suelta dentro de un campo sin comillas (O"Brien) se
+    toma igual que al importar. Si el último registro queda abierto se
+    siguen leyendo líneas del archivo. Un registro que csv.reader no puede
+    separar queda solo, para que validar_bloque lo informe como fila
+    inválida.
+    """
+    lineas = list(lineas)
+    registros = []
+    inicio = 0
+    while inicio < len(lineas):
+        leidas = []
+        
+        def fuente(desde=inicio):
+            for linea in chain(islice(lineas, desde, None), archivo):
+                leidas.append(linea)
+                yield linea
+        
+        try:
+            for _ in csv.reader(fuente()):
+                registros.append("".join(leidas))
+                inicio += len(leidas)
+                leidas.clear()
+                if inicio >= len(lineas):
+                    break
+            else:
+                break
+        except csv.Error:
+            registros.append("".join(leidas))
+            inicio += max(len(leidas), 1)
+    return registros
+
+def leer_tareas(ruta, formato, tamano_bloque=TAMANO_BLOQUE):
+    """Genera las tareas de validar_bloque: (formato, columnas, primera_fila, registros).
+    
+    Las filas se numeran desde 1 sin contar el encabezado ni las filas o
+    líneas vacías, igual que en ClienteModel.crear_clientes_bulk. columnas
+    es, para el CSV, la posición de cada campo de CAMPOS_CLIENTE; un campo
+    que falta en el encabezado apunta a una columna más allá del final, que
+    se completa vacía.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    
+    primera = 1
+    if formato == 'csv':
+        with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+            encabezado = next(csv.reader(_unir_registros(islice(archivo, 1), archivo)), [])
+            # Como en DictReader, si una columna se repite vale la última
+            posiciones = {nombre: indice for indice, nombre in enumerate(encabezado)}
+            columnas = tuple(posiciones.get(campo, len(encabezado)) for campo in CAMPOS_CLIENTE)
+            while True:
+                bloque = list(islice(archivo, tamano_bloque))
+                if not bloque:
+                    return
+                # Casi nunca hay comillas: entonces cada línea es un registro
+                if '"' in "".join(bloque):
+                    bloque = _unir_registros(bloque, archivo)
+                registros = [registro for registro in bloque if registro not in _LINEAS_VACIAS]
+                yield formato, columnas, primera, registros
+                primera += len(registros)
+    else:
+        with open(ruta, encoding='utf-8') as archivo:
+            while True:
+                bloque = list(islice(archivo, tamano_bloque))
+                if not bloque:
+                    return
+                lineas = [linea for linea in bloque if not linea.isspace()]
+                yield formato, None, primera, lineas
+                primera += len(lineas)
+
+def validar_bloque(tarea):
+    """Valida un bloque de filas (corre en un proceso del pool).
+    
+    Devuelve (validas, rechazos), con rechazos como lista de
+    (numero_de_fila, lista_de_errores).
+    """
+    formato, columnas, primera, filas = tarea
+    rechazos = []
+    
+    if formato == 'csv':
+        validar = _validar_cliente
+        tomar = itemgetter(*columnas)
+        ancho = max(columnas) + 1
+        lector = csv.reader(filas)
+        for numero in range(primera, primera + len(filas)):
+            try:
+                fila = next(lector)
+            except csv.Error:
+                rechazos.append((numero, ["Formato de fila inválido"]))
+                continue
+            except StopIteration:
+                break
+            if len(fila) < ancho:
+                # Fila corta o campo que falta en el encabezado: vale vacío
+                fila = fila + [""] * (ancho - len(fila))
+            errores = validar([valor.strip() for valor in tomar(fila)])
+            if errores:
+                rechazos.append((numero, errores))
+    else:
+        for numero, linea in enumerate(filas, start=primera):
+            try:
+                fila = json.loads(linea)
+            except json.JSONDecodeError:
+                fila = None
+            _, errores = validar_fila(fila)
+            if errores:
+                rechazos.append((numero, errores))
+    
+    return len(filas) - len(rechazos), rechazos
+
+def validar_archivo(ruta, formato, procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """Valida un archivo CSV o JSONL de clientes completo.
+    
+    Genera (validas, rechazos) por bloque, en el orden del archivo (ver
+    validar_bloque). procesos es la cantidad de procesos del pool (por
+    defecto, uno por CPU); con uno solo se valida en este mismo proceso.
+    """
+    tareas = leer_tareas(ruta, formato, tamano_bloque)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        for tarea in tareas:
+            yield validar_bloque(tarea)
+        return
+    
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        # Pocos bloques en vuelo: la lectura no se adelanta más que eso a la
+        # validación y los resultados se entregan en orden
+        en_vuelo = deque()
+        for tarea in tareas:
+            en_vuelo.append(pool.submit(validar_bloque, tarea))
+            if len(en_vuelo) >= 2 * procesos:
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+def escribir_reporte(ruta, rechazos):
+    """Escribe el reporte de filas rechazadas: un CSV con la fila y sus errores.
+    
+    rechazos es un iterable de (numero_de_fila, lista_de_errores) y se
+    escribe a medida que llega. Devuelve la cantidad de filas escritas.
+    """
+    escritas = 0
+    with open(ruta, "w", newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(("fila", "errores"))
+        for numero, errores in rechazos:
+            escritor.writerow((numero, "; ".join(errores)))
+            escritas += 1
+    return escritas
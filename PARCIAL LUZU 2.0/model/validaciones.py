@@ -0,0 +1,151 @@
+# model/validaciones.py
+import re
+from collections import namedtuple
+from operator import itemgetter
+
+# Patrón compilado una sola vez y compartido por el formulario y la importación masiva
+PATRON_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PATRON_NO_DIGITOS = re.compile(r'[^0-9]')
+
+CAMPOS_CLIENTE = ('nombre', 'apellido', 'email', 'telefono', 'direccion')
+
+def normalizar_datos_cliente(datos):
+    """Devuelve un dict con los campos del cliente como texto sin espacios sobrantes"""
+    normalizados = {}
+    for campo in CAMPOS_CLIENTE:
+        valor = datos.get(campo)
+        normalizados[campo] = "" if valor is None else str(valor).strip()
+    return normalizados
+
+def normalizar_email(email):
+    """Forma del email que se compara para detectar clientes duplicados"""
+    return email.strip().lower() or None
+
+def normalizar_telefono(telefono):
+    """Forma del teléfono que se compara para detectar clientes duplicados.
+    
+    Quedan solo los dígitos y, de ellos, los últimos 10 (el número nacional),
+    así "+54 9 11 4567-8901" y "11 4567 8901" se consideran el mismo.
+    """
+    return PATRON_NO_DIGITOS.sub("", telefono)[-10:] or None
+
+class Regla(namedtuple('_Regla', ('minimo', 'patron', 'mensaje'))):
+    """Un valor (ya normalizado) cumple la regla si tiene al menos minimo
+    caracteres y, si hay patrón compilado, coincide con él; si no, el error es
+    mensaje. Al ser datos y no funciones, compilar_validador puede juntar las
+    reglas de un campo en una sola comprobación.
+    """
+    
+    __slots__ = ()
+    
+    def cumple(self, valor):
+        return len(valor) >= self.minimo and (self.patron is None or self.patron.match(valor) is not None)
+
+def regla_obligatorio(mensaje):
+    """Falla si el valor está vacío"""
+    return Regla(1, None, mensaje)
+
+def regla_largo_minimo(minimo, mensaje):
+    """Falla si el valor tiene menos de minimo caracteres"""
+    return Regla(minimo, None, mensaje)
+
+def regla_patron(patron, mensaje):
+    """Falla si el valor no coincide con el patrón compilado"""
+    return Regla(0, patron, mensaje)
+
+# Reglas de cada campo en el orden en que se revisan; de cada campo se
+# informa solo la primera que falla. Son las mismas para el formulario, el
+# servicio HTTP, la importación y la validación masiva de archivos
+REGLAS_CLIENTE = {
+    'nombre': (
+        regla_obligatorio("El nombre es obligatorio"),
+        regla_largo_minimo(2, "El nombre debe tener al menos 2 caracteres"),
+    ),
+    'apellido': (
+        regla_obligatorio("El apellido es obligatorio"),
+        regla_largo_minimo(2, "El apellido debe tener al menos 2 caracteres"),
+    ),
+    'email': (
+        regla_obligatorio("El email es obligatorio"),
+        regla_patron(PATRON_EMAIL, "El formato del email no es válido"),
+    ),
+    'telefono': (
+        regla_obligatorio("El teléfono es obligatorio"),
+        regla_largo_minimo(8, "El teléfono debe tener al menos 8 dígitos"),
+    ),
+    'direccion': (
+        regla_obligatorio("La dirección es obligatoria"),
+        regla_largo_minimo(5, "La dirección debe tener al menos 5 caracteres"),
+    ),
+}
+
+def _primer_error(reglas, valor):
+    """Mensaje de la primera regla que el valor no cumple, o None"""
+    for regla in reglas:
+        if not regla.cumple(valor):
+            return regla.mensaje
+    return None
+
+def _coincide_con_todos(patrones):
+    """Una función match que exige todos los patrones (None si no hay ninguno)"""
+    if not patrones:
+        return None
+    if len(patrones) == 1:
+        return patrones[0].match
+    return lambda valor: all(patron.match(valor) for patron in patrones) or None
+
+def compilar_validador(campos=CAMPOS_CLIENTE):
+    """Devuelve validar(valores) -> errores, para valores en el orden de campos.
+    
+    Las reglas de cada campo se juntan una sola vez, acá, en un largo mínimo
+    y un patrón: una fila válida (la gran mayoría) se acepta con una
+    comparación y a lo sumo un match por campo, y solo las que fallan se
+    recorren regla por regla para armar los mensajes.
+    """
+    reglas_por_posicion = tuple(REGLAS_CLIENTE[campo] for campo in campos)
+    comprobaciones = tuple(
+        (max(regla.minimo for regla in reglas),
+         _coincide_con_todos([regla.patron for regla in reglas if regla.patron is not None]))
+        for reglas in reglas_por_posicion)
+    
+    def validar(valores):
+        for (minimo, coincide), valor in zip(comprobaciones, valores):
+            if len(valor) < minimo or (coincide is not None and coincide(valor) is None):
+                break
+        else:
+            return []
+        
+        errores = []
+        for reglas, valor in zip(reglas_por_posicion, valores):
+            mensaje = _primer_error(reglas, valor)
+            if mensaje is not None:
+                errores.append(mensaje)
+        return errores
+    
+    return validar
+
+_validar_valores_cliente = compilar_validador()
+_valores_cliente = itemgetter(*CAMPOS_CLIENTE)
+
+def validar_campo(campo, valor):
+    """Valida un campo del cliente (ya normalizado) y devuelve sus errores"""
+    reglas = REGLAS_CLIENTE.get(campo)
+    if reglas is None:
+        return [f"El campo '{campo}' no se puede modificar"]
+    mensaje = _primer_error(reglas, valor)
+    return [] if mensaje is None else [mensaje]
+
+def validar_datos_cliente(datos):
+    """Valida los datos de un cliente y devuelve la lista de errores encontrados"""
+    return _validar_valores_cliente(_valores_cliente(datos))
+
+def validar_fila(fila):
+    """Normaliza y valida una fila de un archivo de importación.
+    
+    Devuelve (datos, errores); si la fila no es un dict (por ejemplo, una
+    línea JSON inválida) datos es None.
+    """
+    if not isinstance(fila, dict):
+        return None, ["Formato de fila inválido"]
+    datos = normalizar_datos_cliente(fila)
+    return datos, validar_datos_cliente(datos)
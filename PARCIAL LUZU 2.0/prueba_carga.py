@@ -0,0 +1,173 @@
+# prueba_carga.py
+"""
+SandTech - Prueba de carga del servicio HTTP/JSON
+Levanta servidor_clientes sobre una base temporal con datos de prueba (o usa
+uno ya en marcha con --url) y lo bombardea con varios clientes concurrentes
+con una mezcla de lecturas, listados, búsquedas y altas. Informa pedidos por
+segundo y latencias p50/p99.
+
+Uso: python prueba_carga.py [--conexiones 32] [--segundos 10] [--filas 10000] [--url http://host:puerto]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente_model import ClienteModel
+from servidor_clientes import ServidorClientes
+
+# Proporción de cada tipo de pedido en la mezcla
+MEZCLA = (
+    ('obtener', 70),
+    ('listar', 15),
+    ('buscar', 10),
+    ('crear', 5),
+)
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, int(len(valores_ordenados) * p / 100))
+    return valores_ordenados[indice]
+
+def poblar(db, filas):
+    """Carga filas clientes de prueba y devuelve el rango de códigos"""
+    model = ClienteModel(db)
+    model.crear_clientes_bulk({'nombre': f"Nombre{i}", 'apellido': f"Apellido{i % 997}",
+                               'email': f"cliente{i}@prueba.com", 'telefono': "11223344",
+                               'direccion': f"Calle {i % 1000} numero {i}"} for i in range(filas))
+    primero = model.listar_clientes(limit=1)
+    codigos = (primero[0]['codigo'], primero[0]['codigo'] + filas - 1) if primero else (100, 100)
+    model.cerrar()
+    return codigos
+
+def iniciar_servidor_local(db):
+    """Levanta el servidor en un hilo con su propio loop; devuelve (puerto, detener)"""
+    listo = threading.Event()
+    estado = {}
+    
+    async def servir():
+        servidor = ServidorClientes(db)
+        estado['puerto'] = await servidor.iniciar("127.0.0.1", 0)
+        estado['loop'] = asyncio.get_running_loop()
+        estado['fin'] = asyncio.Event()
+        listo.set()
+        await estado['fin'].wait()
+        await servidor.cerrar()
+    
+    hilo = threading.Thread(target=asyncio.run, args=(servir(),), daemon=True)
+    hilo.start()
+    listo.wait()
+    
+    def detener():
+        estado['loop'].call_soon_threadsafe(estado['fin'].set)
+        hilo.join()
+    
+    return estado['puerto'], detener
+
+async def pedir(reader, writer, host, metodo, ruta, datos=None):
+    """Envía un pedido por una conexión keep-alive y devuelve el estado"""
+    cuerpo = b'' if datos is None else json.dumps(datos).encode('utf-8')
+    writer.write((f"{metodo} {ruta} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n\r\n").encode()
+                 + cuerpo)
+    await writer.drain()
+    estado = int((await reader.readline()).split()[1])
+    largo = 0
+    while True:
+        linea = await reader.readline()
+        if linea in (b'\r\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        if nombre.lower() == 'content-length':
+            largo = int(valor)
+    await reader.readexactly(largo)
+    return estado
+
+async def cliente_de_carga(host, puerto, codigos, hasta, latencias, estados):
+    reader, writer = await asyncio.open_connection(host, puerto)
+    tipos = [tipo for tipo, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    try:
+        while time.perf_counter() < hasta:
+            tipo = random.choices(tipos, pesos)[0]
+            if tipo == 'obtener':
+                args = ('GET', f"/clientes/{random.randint(*codigos)}")
+            elif tipo == 'listar':
+                args = ('GET', f"/clientes?despues={random.randint(*codigos)}&limite=50")
+            elif tipo == 'buscar':
+                args = ('GET', f"/clientes?q=Apellido{random.randint(0, 996)}&limite=20")
+            else:
+                numero = random.randint(0, 10 ** 9)
+                args = ('POST', "/clientes", {'nombre': "Carga", 'apellido': f"Prueba{numero}",
+                                               'email': f"carga{numero}@prueba.com",
+                                               'telefono': "11223344", 'direccion': "Calle Carga 1"})
+            inicio = time.perf_counter()
+            estado = await pedir(reader, writer, host, *args)
+            latencias.append(time.perf_counter() - inicio)
+            estados[estado] += 1
+    finally:
+        writer.close()
+
+async def cargar(host, puerto, codigos, conexiones, segundos):
+    latencias = []
+    estados = Counter()
+    hasta = time.perf_counter() + segundos
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente_de_carga(host, puerto, codigos, hasta, latencias, estados)
+                           for _ in range(conexiones)))
+    return latencias, estados, time.perf_counter() - inicio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio HTTP de clientes SandTech")
+    parser.add_argument("--conexiones", type=int, default=32, help="Clientes concurrentes")
+    parser.add_argument("--segundos", type=float, default=10, help="Duración de la prueba")
+    parser.add_argument("--filas", type=int, default=10000, help="Clientes de prueba en la base temporal")
+    parser.add_argument("--url", help="Servidor ya en marcha (por defecto se levanta uno local)")
+    args = parser.parse_args(argv)
+    
+    carpeta = detener = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, puerto = url.hostname, url.port or 80
+        codigos = (100, 100 + args.filas - 1)
+    else:
+        carpeta = tempfile.TemporaryDirectory()
+        db = os.path.join(carpeta.name, "carga.db")
+        codigos = poblar(db, args.filas)
+        host = "127.0.0.1"
+        puerto, detener = iniciar_servidor_local(db)
+    
+    try:
+        latencias, estados, duracion = asyncio.run(
+            cargar(host, puerto, codigos, args.conexiones, args.segundos))
+    finally:
+        if detener is not None:
+            detener()
+        if carpeta is not None:
+            carpeta.cleanup()
+    
+    latencias.sort()
+    print("=" * 60)
+    print(f"Conexiones: {args.conexiones}, duración: {duracion:.1f} s")
+    print(f"Pedidos: {len(latencias)} ({len(latencias) / duracion:.0f} pedidos/s)")
+    print(f"Latencia p50: {percentil(latencias, 50) * 1000:.2f} ms, "
+          f"p99: {percentil(latencias, 99) * 1000:.2f} ms")
+    print("Respuestas: " + ", ".join(f"{estado}={cantidad}" for estado, cantidad in sorted(estados.items())))
+    print("=" * 60)
+    
+    return 0 if all(estado < 500 for estado in estados) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# prueba_concurrencia.py
+"""
+SandTech - Prueba de escritura concurrente
+Lanza varios procesos que crean clientes a la vez sobre la misma base de
+datos, como varias instancias de la aplicación sobre un archivo compartido,
+y verifica que no haya fallos ni códigos repetidos.
+
+Uso: python prueba_concurrencia.py [--procesos 4] [--clientes 500] [--db archivo.db]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente_model import ClienteModel
+
+def crear_clientes(db, numero_proceso, cantidad, inicio):
+    """Corre en cada proceso: crea clientes de a uno y devuelve (códigos, fallos)"""
+    model = ClienteModel(db, tamano_cache=0)
+    inicio.wait()
+    codigos = []
+    fallos = 0
+    try:
+        for i in range(cantidad):
+            exito, codigo = model.crear_cliente(f"Proceso{numero_proceso}", f"Cliente{i}",
+                                                f"p{numero_proceso}.c{i}@prueba.com",
+                                                "11223344", "Calle Prueba 123")
+            if exito:
+                codigos.append(codigo)
+            else:
+                fallos += 1
+    finally:
+        model.cerrar()
+    return codigos, fallos
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de escritura concurrente SandTech")
+    parser.add_argument("--procesos", type=int, default=4, help="Procesos escribiendo a la vez")
+    parser.add_argument("--clientes", type=int, default=500, help="Clientes que crea cada proceso")
+    parser.add_argument("--db", help="Base de datos a usar (por defecto una temporal nueva)")
+    args = parser.parse_args(argv)
+    
+    carpeta = None
+    db = args.db
+    if db is None:
+        carpeta = tempfile.TemporaryDirectory()
+        db = os.path.join(carpeta.name, "concurrencia.db")
+    
+    # Crear la estructura antes de lanzar los procesos
+    model = ClienteModel(db)
+    existentes = model.contar_clientes()
+    model.cerrar()
+    
+    with multiprocessing.Manager() as manager:
+        inicio = manager.Barrier(args.procesos)
+        with multiprocessing.Pool(args.procesos) as pool:
+            t0 = time.perf_counter()
+            resultados = pool.starmap(crear_clientes, [(db, n, args.clientes, inicio)
+                                                       for n in range(args.procesos)])
+            duracion = time.perf_counter() - t0
+    
+    codigos = [codigo for codigos_proceso, _ in resultados for codigo in codigos_proceso]
+    fallos = sum(fallos_proceso for _, fallos_proceso in resultados)
+    repetidos = len(codigos) - len(set(codigos))
+    
+    model = ClienteModel(db)
+    nuevos = model.contar_clientes() - existentes
+    model.cerrar()
+    if carpeta is not None:
+        carpeta.cleanup()
+    
+    esperados = args.procesos * args.clientes
+    print("=" * 60)
+    print(f"Procesos: {args.procesos} x {args.clientes} clientes")
+    print(f"Clientes creados: {len(codigos)} de {esperados} (en la base: {nuevos})")
+    print(f"Fallos: {fallos}")
+    print(f"Códigos repetidos: {repetidos}")
+    print(f"Tiempo: {duracion:.2f} s ({len(codigos) / duracion if duracion else 0:.0f} altas/s)")
+    print("=" * 60)
+    
+    return 0 if fallos == 0 and repetidos == 0 and nuevos == esperados else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
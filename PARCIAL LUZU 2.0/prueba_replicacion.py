@@ -0,0 +1,89 @@
+# prueba_replicacion.py
+"""
+SandTech - Prueba de la replicación entre sedes
+Arma dos bases temporales que se sincronizan entre sí y verifica que los
+cambios de cada una lleguen a la otra, que los conflictos se resuelvan igual
+en los dos sentidos y que un código repetido de antes de configurar las sedes
+(dos clientes distintos con el mismo código) se informe como colisión y nunca
+se pise ni se borre el cliente de la otra sede.
+
+Uso: python prueba_replicacion.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente import Cliente
+from model.cliente_model import ClienteModel
+from model.replicacion import replicar, sincronizar
+
+def estado(model):
+    """Todos los clientes de la base, ordenados por código"""
+    return model.obtener_todos_clientes()
+
+def main(argv=None):
+    fallas = []
+    
+    def verificar(condicion, mensaje):
+        print(f"  {'OK   ' if condicion else 'FALLA'} {mensaje}")
+        if not condicion:
+            fallas.append(mensaje)
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        base_a = ClienteModel(os.path.join(carpeta, "a.db"), tamano_cache=0)
+        base_b = ClienteModel(os.path.join(carpeta, "b.db"), tamano_cache=0)
+        try:
+            # Antes de configurar las sedes cada base dio el código 100 a un cliente distinto
+            base_a.cargar_clientes([[Cliente(100, "Ana", "Sur", "ana@sur.com", "1111111111", "Calle A 1",
+                                             "2024-01-01 10:00:00")]])
+            base_b.cargar_clientes([[Cliente(100, "Beto", "Norte", "beto@norte.com", "2222222222", "Calle B 2",
+                                             "2024-02-02 11:00:00")]])
+            base_a.configurar_sede(1)
+            base_b.configurar_sede(2)
+            
+            print("Código repetido, sincronizando en un solo sentido:")
+            ida = replicar(base_a, base_b)
+            verificar(ida['colisiones'] == [100], "la ida informa la colisión del código 100")
+            verificar(base_b.obtener_cliente(100).nombre == "Beto", "el cliente 100 de la sede 2 no se pisa")
+            vuelta = replicar(base_b, base_a)
+            verificar(vuelta['colisiones'] == [100], "la vuelta también la informa")
+            verificar(base_a.obtener_cliente(100).nombre == "Ana", "el cliente 100 de la sede 1 no se pisa")
+            
+            print("La sede 2 borra su cliente 100:")
+            base_b.eliminar_cliente(100)
+            ida, vuelta = sincronizar(base_b, base_a)
+            verificar(ida['colisiones'] == [100], "la baja se informa como colisión")
+            verificar(base_a.obtener_cliente(100) is not None, "el cliente 100 de la sede 1 no se borra")
+            
+            print("Cambios de las dos sedes y conflictos:")
+            _, codigo_a = base_a.crear_cliente("Carla", "Oeste", "carla@oeste.com", "3333333333", "Calle C 3")
+            _, codigo_b = base_b.crear_cliente("Dino", "Este", "dino@este.com", "4444444444", "Calle D 4")
+            verificar(codigo_a != codigo_b, f"los códigos nuevos no chocan ({codigo_a} y {codigo_b})")
+            sincronizar(base_a, base_b)
+            base_a.actualizar_cliente(codigo_b, "Dino", "Este", "dino@a.com", "4444444444", "Calle D 4")
+            base_b.actualizar_cliente(codigo_b, "Dino", "Este", "dino@b.com", "4444444444", "Calle D 4")
+            base_b.eliminar_cliente(codigo_a)
+            sincronizar(base_a, base_b)
+            verificar(base_a.obtener_cliente(codigo_a) is None, "la baja de un cliente replicado llega a la otra sede")
+            verificar(base_a.obtener_cliente(codigo_b) == base_b.obtener_cliente(codigo_b),
+                      "el conflicto se resuelve igual en las dos sedes")
+            verificar([cliente for cliente in estado(base_a) if cliente.codigo != 100] ==
+                      [cliente for cliente in estado(base_b) if cliente.codigo != 100],
+                      "fuera del código repetido, las dos bases quedan iguales")
+            ida, vuelta = sincronizar(base_a, base_b)
+            verificar(ida['aplicados'] == vuelta['aplicados'] == 0, "una segunda sincronización no aplica nada")
+        finally:
+            base_a.cerrar()
+            base_b.cerrar()
+    
+    print("=" * 60)
+    print(f"Fallas: {len(fallas)}")
+    print("=" * 60)
+    return 1 if fallas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# prueba_servidor.py
+"""
+SandTech - Prueba de las respuestas de error del servicio HTTP/JSON
+Levanta servidor_clientes sobre una base temporal y verifica que cada error
+tenga su respuesta: 404 para un cliente que no existe, 500 cuando falla la
+base (se fuerza con un trigger que aborta las modificaciones y bajas), y que
+un pedido cuyo cuerpo no se lee (413, Content-Length inválido, encabezado
+demasiado largo) cierre la conexión en vez de leer ese cuerpo como el
+pedido siguiente.
+
+Uso: python prueba_servidor.py
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from prueba_carga import iniciar_servidor_local, pedir
+
+HOST = "127.0.0.1"
+
+CLIENTE = {'nombre': "Ana", 'apellido': "Paz", 'email': "ana@prueba.com",
+           'telefono': "11223344", 'direccion': "Calle Prueba 123"}
+
+# Hacen fallar cualquier modificación o baja de clientes con un error de SQLite
+SQL_FALLAS = (
+    "CREATE TRIGGER falla_au BEFORE UPDATE ON clientes BEGIN SELECT RAISE(ABORT, 'falla forzada'); END",
+    "CREATE TRIGGER falla_ad BEFORE DELETE ON clientes BEGIN SELECT RAISE(ABORT, 'falla forzada'); END",
+)
+
+async def pedir_crudo(puerto, datos):
+    """Envía bytes tal cual y devuelve las líneas de estado de todas las respuestas hasta que se cierra"""
+    reader, writer = await asyncio.open_connection(HOST, puerto)
+    writer.write(datos)
+    await writer.drain()
+    respuesta = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return [int(estado) for estado in re.findall(rb"HTTP/1\.1 (\d{3}) ", respuesta)]
+
+async def probar(puerto, db, verificar):
+    reader, writer = await asyncio.open_connection(HOST, puerto)
+    try:
+        estado = await pedir(reader, writer, HOST, "POST", "/clientes", CLIENTE)
+        verificar(estado == 201, f"alta -> {estado}")
+        codigo = 100  # Primer cliente de una base nueva
+        
+        print("Cliente que no existe:")
+        estado = await pedir(reader, writer, HOST, "PUT", "/clientes/999", CLIENTE)
+        verificar(estado == 404, f"PUT /clientes/999 -> {estado}")
+        estado = await pedir(reader, writer, HOST, "DELETE", "/clientes/999")
+        verificar(estado == 404, f"DELETE /clientes/999 -> {estado}")
+        
+        print("Error de la base:")
+        with sqlite3.connect(db) as conn:
+            for sentencia in SQL_FALLAS:
+                conn.execute(sentencia)
+        estado = await pedir(reader, writer, HOST, "PUT", f"/clientes/{codigo}", CLIENTE)
+        verificar(estado == 500, f"PUT /clientes/{codigo} -> {estado}")
+        estado = await pedir(reader, writer, HOST, "DELETE", f"/clientes/{codigo}")
+        verificar(estado == 500, f"DELETE /clientes/{codigo} -> {estado}")
+        estado = await pedir(reader, writer, HOST, "GET", f"/clientes/{codigo}")
+        verificar(estado == 200, f"el cliente sigue existiendo (GET -> {estado})")
+        with sqlite3.connect(db) as conn:
+            conn.execute("DROP TRIGGER falla_au")
+            conn.execute("DROP TRIGGER falla_ad")
+        estado = await pedir(reader, writer, HOST, "DELETE", f"/clientes/{codigo}")
+        verificar(estado == 204, f"sin la falla, DELETE /clientes/{codigo} -> {estado}")
+    finally:
+        writer.close()
+    
+    print("Pedidos cuyo cuerpo no se lee:")
+    siguiente = b"GET /salud HTTP/1.1\r\n\r\n"
+    estados = await pedir_crudo(puerto, b"POST /clientes HTTP/1.1\r\nContent-Length: 100000\r\n\r\n"
+                                + siguiente + b"x" * 100)
+    verificar(estados == [413], f"cuerpo demasiado grande -> {estados}")
+    estados = await pedir_crudo(puerto, b"POST /clientes HTTP/1.1\r\nContent-Length: abc\r\n\r\n" + siguiente)
+    verificar(estados == [400], f"Content-Length inválido -> {estados}")
+    estados = await pedir_crudo(puerto, b"GET /salud HTTP/1.1\r\nX-Largo: " + b"a" * 100000 + b"\r\n\r\n")
+    verificar(estados == [431], f"encabezado demasiado largo -> {estados}")
+
+def main(argv=None):
+    fallas = []
+    
+    def verificar(condicion, mensaje):
+        print(f"  {'OK   ' if condicion else 'FALLA'} {mensaje}")
+        if not condicion:
+            fallas.append(mensaje)
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        db = os.path.join(carpeta, "servidor.db")
+        puerto, detener = iniciar_servidor_local(db)
+        try:
+            asyncio.run(probar(puerto, db, verificar))
+        finally:
+            detener()
+    
+    print("=" * 60)
+    print(f"Fallas: {len(fallas)}")
+    print("=" * 60)
+    return 1 if fallas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
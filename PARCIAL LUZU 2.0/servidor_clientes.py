@@ -0,0 +1,340 @@
+# servidor_clientes.py
+"""
+SandTech - Servicio HTTP/JSON de clientes
+Expone las operaciones de ClienteModel para otros sistemas (facturación,
+tienda web) sin usar la interfaz Tkinter. Solo usa la biblioteca estándar.
+
+    GET    /clientes?despues=<codigo>&limite=100   Lista paginada por código
+    GET    /clientes?q=<texto>&limite=50           Búsqueda por texto
+    GET    /clientes/<codigo>                      Un cliente
+    POST   /clientes                               Alta (JSON con los campos)
+    PUT    /clientes/<codigo>                      Modificación
+    DELETE /clientes/<codigo>                      Baja
+    GET    /cambios?desde=<version>&limite=100     Cambios posteriores a una versión
+    GET    /salud                                  Estado del servicio
+
+Uso: python servidor_clientes.py [--host 127.0.0.1] [--puerto 8080] [--db archivo.db]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente_model import ClienteModel
+from model.registro import configurar_registro
+from model.validaciones import normalizar_datos_cliente, validar_datos_cliente
+
+log = logging.getLogger("sandtech.servidor")
+
+class ErrorHTTP(Exception):
+    """Corta el pedido y responde con el estado y el cuerpo indicados"""
+    
+    def __init__(self, estado, datos=None, encabezados=None):
+        super().__init__(estado)
+        self.estado = estado
+        self.datos = datos if datos is not None else {'error': estado.phrase}
+        self.encabezados = encabezados or {}
+
+class ServidorClientes:
+    """Servidor HTTP/1.1 (con keep-alive) sobre asyncio.
+    
+    El trabajo con la base corre en hilos: las lecturas en un grupo de
+    lectores, cada uno con su conexión persistente, y las escrituras en un
+    único hilo. Como mucho max_pendientes operaciones esperan o usan esos
+    hilos; si no se libera un lugar en espera_maxima segundos el pedido se
+    rechaza con 503 en vez de acumularse.
+    """
+    
+    MAX_CUERPO = 64 * 1024
+    LIMITE_LISTA = 100
+    MAX_LIMITE = 500
+    
+    def __init__(self, db_name="sandtech_clientes.db", lectores=4, max_pendientes=64, espera_maxima=1.0):
+        self.model = ClienteModel(db_name)
+        self.lectores = ThreadPoolExecutor(max_workers=lectores, thread_name_prefix="http-lector")
+        self.escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="http-escritor")
+        self.max_pendientes = max_pendientes
+        self.espera_maxima = espera_maxima
+        self._cupos = None
+        self._servidor = None
+        self.atendidos = 0
+        self.rechazados = 0
+    
+    async def iniciar(self, host="127.0.0.1", puerto=8080):
+        """Empieza a escuchar; devuelve el puerto (útil con puerto=0)"""
+        self._cupos = asyncio.Semaphore(self.max_pendientes)
+        self._servidor = await asyncio.start_server(self.atender, host, puerto)
+        puerto = self._servidor.sockets[0].getsockname()[1]
+        log.info("Servidor escuchando en http://%s:%s", host, puerto)
+        return puerto
+    
+    async def servir(self):
+        async with self._servidor:
+            await self._servidor.serve_forever()
+    
+    async def cerrar(self):
+        """Deja de aceptar conexiones, espera las escrituras y cierra la base"""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self.lectores.shutdown(wait=True, cancel_futures=True)
+        self.escritor.shutdown(wait=True)
+        self.model.cerrar()
+        log.info("Servidor detenido - %d pedidos atendidos, %d rechazados por saturación",
+                 self.atendidos, self.rechazados)
+    
+    async def atender(self, reader, writer):
+        """Atiende los pedidos de una conexión hasta que el cliente la cierra"""
+        try:
+            while True:
+                try:
+                    linea = await self._leer_linea(reader)
+                    if not linea:
+                        break
+                    try:
+                        metodo, ruta, version = linea.decode('latin-1').split()
+                    except ValueError:
+                        raise ErrorHTTP(HTTPStatus.BAD_REQUEST, {'error': "Pedido mal formado"})
+                    
+                    encabezados = {}
+                    while True:
+                        linea = await self._leer_linea(reader)
+                        if linea in (b'\r\n', b'\n', b''):
+                            break
+                        nombre, _, valor = linea.decode('latin-1').partition(':')
+                        encabezados[nombre.strip().lower()] = valor.strip()
+                    largo = self._largo_cuerpo(encabezados)
+                except ErrorHTTP as e:
+                    # El cuerpo (o el resto del pedido) queda sin leer y no se sabe
+                    # dónde empieza el siguiente: se responde y se cierra
+                    self._responder(writer, e.estado, e.datos, False, e.encabezados)
+                    await writer.drain()
+                    break
+                
+                mantener = (version == 'HTTP/1.1' and
+                            encabezados.get('connection', '').lower() != 'close')
+                cuerpo = await reader.readexactly(largo) if largo else b''
+                try:
+                    estado, datos = await self.despachar(metodo, ruta, cuerpo)
+                    extra = {}
+                except ErrorHTTP as e:
+                    estado, datos, extra = e.estado, e.datos, e.encabezados
+                except Exception:
+                    log.exception("Error atendiendo %s %s", metodo, ruta)
+                    estado, datos, extra = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "Error interno"}, {}
+                
+                self.atendidos += 1
+                log.debug("%s %s -> %d", metodo, ruta, estado)
+                self._responder(writer, estado, datos, mantener, extra)
+                await writer.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _leer_linea(self, reader):
+        """Lee una línea del pedido; una más larga que el límite del lector es un error 431"""
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise ErrorHTTP(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                            {'error': "Línea de pedido o encabezado demasiado larga"})
+    
+    def _largo_cuerpo(self, encabezados):
+        """Largo del cuerpo según Content-Length; lanza ErrorHTTP si no se puede leer"""
+        if 'transfer-encoding' in encabezados:
+            raise ErrorHTTP(HTTPStatus.NOT_IMPLEMENTED, {'error': "Transfer-Encoding no soportado"})
+        valor = encabezados.get('content-length', '0')
+        if not (valor.isascii() and valor.isdigit()):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, {'error': "Content-Length inválido"})
+        if int(valor) > self.MAX_CUERPO:
+            raise ErrorHTTP(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        return int(valor)
+    
+    def _responder(self, writer, estado, datos, mantener, encabezados=None):
+        cuerpo = b'' if datos is None else json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        lineas = [f"HTTP/1.1 {estado.value} {estado.phrase}",
+                  "Content-Type: application/json; charset=utf-8",
+                  f"Content-Length: {len(cuerpo)}",
+                  f"Connection: {'keep-alive' if mantener else 'close'}"]
+        lineas += [f"{nombre}: {valor}" for nombre, valor in (encabezados or {}).items()]
+        writer.write(("\r\n".join(lineas) + "\r\n\r\n").encode('latin-1') + cuerpo)
+    
+    async def despachar(self, metodo, ruta, cuerpo):
+        """Resuelve la ruta y devuelve (estado, datos de la respuesta)"""
+        url = urlsplit(ruta)
+        partes = [parte for parte in url.path.split('/') if parte]
+        parametros = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+        
+        if partes == ['salud']:
+            return HTTPStatus.OK, {'estado': 'ok', 'atendidos': self.atendidos,
+                                   'rechazados': self.rechazados,
+                                   'cache': self.model.cache.estadisticas()}
+        
+        if partes == ['cambios'] and metodo == 'GET':
+            return await self.cambios(parametros)
+        
+        if not partes or partes[0] != 'clientes' or len(partes) > 2:
+            raise ErrorHTTP(HTTPStatus.NOT_FOUND)
+        
+        if len(partes) == 1:
+            if metodo == 'GET':
+                return await self.listar(parametros)
+            if metodo == 'POST':
+                return await self.crear(self._leer_json(cuerpo))
+            raise ErrorHTTP(HTTPStatus.METHOD_NOT_ALLOWED)
+        
+        codigo = self._entero(partes[1], "El código debe ser un número")
+        if metodo == 'GET':
+            cliente = await self._leer(self.model.obtener_cliente, codigo)
+            if cliente is None:
+                raise ErrorHTTP(HTTPStatus.NOT_FOUND, {'error': f"No existe el cliente {codigo}"})
+            return HTTPStatus.OK, cliente._asdict()
+        if metodo == 'PUT':
+            return await self.actualizar(codigo, self._leer_json(cuerpo))
+        if metodo == 'DELETE':
+            exito = await self._escribir(self.model.eliminar_cliente, codigo)
+            if exito is None:
+                raise ErrorHTTP(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "No se pudo eliminar el cliente"})
+            if not exito:
+                raise ErrorHTTP(HTTPStatus.NOT_FOUND, {'error': f"No existe el cliente {codigo}"})
+            return HTTPStatus.NO_CONTENT, None
+        raise ErrorHTTP(HTTPStatus.METHOD_NOT_ALLOWED)
+    
+    async def listar(self, parametros):
+        limite = self._entero(parametros.get('limite', self.LIMITE_LISTA), "limite debe ser un número")
+        limite = max(1, min(limite, self.MAX_LIMITE))
+        
+        if 'q' in parametros:
+            clientes = await self._leer(self.model.buscar_clientes, parametros['q'], limite)
+            return HTTPStatus.OK, {'clientes': [cliente._asdict() for cliente in clientes]}
+        
+        despues = parametros.get('despues')
+        if despues is not None:
+            despues = self._entero(despues, "despues debe ser un código")
+        clientes = await self._leer(self.model.listar_clientes, despues, limite)
+        # Para la página siguiente se pasa este valor como despues
+        siguiente = clientes[-1].codigo if len(clientes) == limite else None
+        return HTTPStatus.OK, {'clientes': [cliente._asdict() for cliente in clientes],
+                               'siguiente': siguiente}
+    
+    async def cambios(self, parametros):
+        """Cambios posteriores a desde; sin desde, la versión actual para empezar a sincronizar"""
+        if 'desde' not in parametros:
+            return HTTPStatus.OK, {'cambios': [], 'version': await self._leer(self.model.version_cambios)}
+        
+        desde = self._entero(parametros['desde'], "desde debe ser una versión")
+        limite = self._entero(parametros.get('limite', self.LIMITE_LISTA), "limite debe ser un número")
+        limite = max(1, min(limite, self.MAX_LIMITE))
+        try:
+            cambios = await self._leer(self.model.cambios_desde, desde, limite)
+        except ValueError as e:
+            # El historial ya no llega hasta esa versión: el cliente debe copiar todo de nuevo
+            raise ErrorHTTP(HTTPStatus.GONE, {'error': str(e)})
+        
+        # Para la página siguiente se pasa version como desde; pendientes indica si hay más
+        return HTTPStatus.OK, {
+            'cambios': [dict(cambio, cliente=cambio['cliente'] and cambio['cliente']._asdict())
+                        for cambio in cambios],
+            'version': cambios[-1]['version'] if cambios else desde,
+            'pendientes': len(cambios) == limite,
+        }
+    
+    async def crear(self, datos):
+        datos = self._validar(datos)
+        exito, codigo = await self._escribir(self.model.crear_cliente, datos['nombre'], datos['apellido'],
+                                             datos['email'], datos['telefono'], datos['direccion'])
+        if not exito:
+            raise ErrorHTTP(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "No se pudo guardar el cliente"})
+        return HTTPStatus.CREATED, dict(datos, codigo=codigo)
+    
+    async def actualizar(self, codigo, datos):
+        datos = self._validar(datos)
+        exito = await self._escribir(self.model.actualizar_cliente, codigo, datos['nombre'], datos['apellido'],
+                                     datos['email'], datos['telefono'], datos['direccion'])
+        if exito is None:
+            raise ErrorHTTP(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "No se pudo guardar el cliente"})
+        if not exito:
+            raise ErrorHTTP(HTTPStatus.NOT_FOUND, {'error': f"No existe el cliente {codigo}"})
+        return HTTPStatus.OK, dict(datos, codigo=codigo)
+    
+    async def _leer(self, funcion, *args):
+        return await self._en_hilo(self.lectores, funcion, *args)
+    
+    async def _escribir(self, funcion, *args):
+        return await self._en_hilo(self.escritor, funcion, *args)
+    
+    async def _en_hilo(self, ejecutor, funcion, *args):
+        """Ejecuta la función en un hilo de trabajo, respetando el límite de pendientes"""
+        try:
+            await asyncio.wait_for(self._cupos.acquire(), self.espera_maxima)
+        except asyncio.TimeoutError:
+            self.rechazados += 1
+            raise ErrorHTTP(HTTPStatus.SERVICE_UNAVAILABLE, {'error': "Servidor saturado, reintente"},
+                            {'Retry-After': '1'})
+        try:
+            return await asyncio.get_running_loop().run_in_executor(ejecutor, funcion, *args)
+        finally:
+            self._cupos.release()
+    
+    def _leer_json(self, cuerpo):
+        try:
+            datos = json.loads(cuerpo or b'null')
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, {'error': "El cuerpo no es JSON válido"})
+        if not isinstance(datos, dict):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, {'error': "Se esperaba un objeto JSON"})
+        return datos
+    
+    def _validar(self, datos):
+        """Aplica las mismas reglas que el formulario"""
+        datos = normalizar_datos_cliente(datos)
+        errores = validar_datos_cliente(datos)
+        if errores:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, {'errores': errores})
+        return datos
+    
+    def _entero(self, valor, mensaje):
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, {'error': mensaje})
+
+async def ejecutar(args):
+    servidor = ServidorClientes(args.db, lectores=args.lectores, max_pendientes=args.max_pendientes)
+    await servidor.iniciar(args.host, args.puerto)
+    try:
+        await servidor.servir()
+    finally:
+        await servidor.cerrar()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de clientes SandTech")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección en la que escuchar")
+    parser.add_argument("--puerto", type=int, default=8080, help="Puerto en el que escuchar")
+    parser.add_argument("--db", default="sandtech_clientes.db", help="Base de datos")
+    parser.add_argument("--lectores", type=int, default=4, help="Hilos para consultas")
+    parser.add_argument("--max-pendientes", type=int, default=64,
+                        help="Operaciones de base de datos en curso antes de responder 503")
+    args = parser.parse_args(argv)
+    
+    configurar_registro()
+    try:
+        asyncio.run(ejecutar(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
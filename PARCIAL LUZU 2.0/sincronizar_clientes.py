@@ -0,0 +1,97 @@
+# sincronizar_clientes.py
+"""
+SandTech - Sincronización de las bases de dos sedes
+Intercambia, en los dos sentidos, los clientes que cambiaron desde la última
+sincronización entre dos archivos de base de datos (por ejemplo la base de
+una sucursal y una copia traída de otra), sin servidor de por medio. Si el
+mismo cliente cambió en las dos, queda el cambio más nuevo según el reloj de
+cada fila (ver model/replicacion.py).
+
+Antes de la primera sincronización cada base necesita un número de sede
+distinto, que define también el rango de códigos de sus clientes nuevos.
+
+Uso: python sincronizar_clientes.py --sede 1 sucursal_centro.db
+     python sincronizar_clientes.py sucursal_centro.db sucursal_norte.db [--lote 1000] [--solo-ida]
+Devuelve 2 si hubo códigos repetidos entre las bases (clientes distintos con
+el mismo código, creados antes de configurar las sedes).
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.cliente_model import ClienteModel
+from model.registro import configurar_registro
+from model.replicacion import TAMANO_LOTE, replicar
+
+def mostrar_progreso(leidos):
+    """Progreso en una sola línea de la consola"""
+    print(f"\rCambios leídos: {leidos:,}", end="", file=sys.stderr, flush=True)
+
+def mostrar_resumen(titulo, resumen):
+    segundos = resumen['segundos']
+    print(f"\n{titulo}{' (copia completa)' if resumen['copia_completa'] else ''}")
+    print(f"  Cambios leídos: {resumen['leidos']}")
+    print(f"  Aplicados: {resumen['aplicados']}")
+    print(f"  Descartados (ya estaban o había uno más nuevo): {resumen['descartados']}")
+    print(f"  Tiempo: {segundos:.2f} s ({resumen['leidos'] / segundos if segundos else 0:.0f} filas/s)")
+    if resumen['colisiones']:
+        codigos = ", ".join(str(codigo) for codigo in resumen['colisiones'][:20])
+        print(f"  Códigos repetidos sin tocar: {len(resumen['colisiones'])} ({codigos})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sincronización de clientes entre sedes SandTech")
+    parser.add_argument("bases", nargs="+", help="Las dos bases a sincronizar (o una sola con --sede)")
+    parser.add_argument("--sede", type=int, help="Asigna este número de sede a la base indicada")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Cambios por transacción")
+    parser.add_argument("--solo-ida", action="store_true", help="Solo llevar los cambios de la primera a la segunda")
+    args = parser.parse_args(argv)
+    
+    esperadas = 1 if args.sede is not None else 2
+    if len(args.bases) != esperadas:
+        parser.error(f"se esperaban {esperadas} bases")
+    for ruta in args.bases:
+        if not os.path.exists(ruta):
+            print(f"No existe la base {ruta}")
+            return 1
+    
+    configurar_registro()
+    modelos = [ClienteModel(ruta, tamano_cache=0) for ruta in args.bases]
+    try:
+        if args.sede is not None:
+            modelos[0].configurar_sede(args.sede)
+            print(f"{args.bases[0]}: sede {args.sede}")
+            return 0
+        
+        base_a, base_b = modelos
+        resumenes = [(f"{args.bases[0]} -> {args.bases[1]}", replicar(base_a, base_b, args.lote, mostrar_progreso))]
+        if not args.solo_ida:
+            resumenes.append((f"{args.bases[1]} -> {args.bases[0]}",
+                              replicar(base_b, base_a, args.lote, mostrar_progreso)))
+        print(file=sys.stderr)
+    except ValueError as e:
+        print(e)
+        return 1
+    except sqlite3.Error as e:
+        print(f"\nError de base de datos, se conservan los lotes ya aplicados: {e}", file=sys.stderr)
+        return 1
+    finally:
+        for model in modelos:
+            model.cerrar()
+    
+    print("=" * 60)
+    for titulo, resumen in resumenes:
+        mostrar_resumen(titulo, resumen)
+    leidos = sum(resumen['leidos'] for _, resumen in resumenes)
+    segundos = sum(resumen['segundos'] for _, resumen in resumenes)
+    print(f"\nTotal: {leidos} cambios en {segundos:.2f} s ({leidos / segundos if segundos else 0:.0f} filas/s)")
+    print("=" * 60)
+    
+    return 2 if any(resumen['colisiones'] for _, resumen in resumenes) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
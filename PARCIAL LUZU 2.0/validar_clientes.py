@@ -0,0 +1,102 @@
+# validar_clientes.py
+"""
+SandTech - Validación de archivos de clientes antes de importarlos
+Revisa un archivo CSV o JSONL completo con las mismas reglas que el
+formulario y la importación, repartiendo el trabajo en varios procesos y sin
+cargarlo entero en memoria. Informa cuántas filas son válidas y cuántas no,
+los errores más frecuentes y, con --reporte, escribe un CSV con los errores
+de cada fila rechazada. No toca la base de datos.
+
+Uso: python validar_clientes.py clientes.csv [--formato csv|jsonl] [--procesos 4] [--bloque 10000] [--reporte errores.csv]
+Devuelve 0 si todas las filas son válidas y 2 si hay filas rechazadas.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+# Agregar el directorio raíz al path para imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model.validacion_masiva import FORMATOS, TAMANO_BLOQUE, escribir_reporte, validar_archivo
+
+def detectar_formato(ruta):
+    """Deduce el formato del archivo a partir de su extensión"""
+    extension = os.path.splitext(ruta)[1].lower().lstrip('.')
+    if extension == 'json':
+        return 'jsonl'
+    return extension if extension in FORMATOS else None
+
+def porcentaje(parte, total):
+    return parte * 100 / total if total else 0.0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validación de archivos de clientes SandTech")
+    parser.add_argument("archivo", help="Archivo CSV o JSONL con los clientes a validar")
+    parser.add_argument("--formato", choices=FORMATOS, help="Formato del archivo (por defecto según la extensión)")
+    parser.add_argument("--procesos", type=int, help="Procesos de validación (por defecto, uno por CPU)")
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Filas por bloque enviado a cada proceso")
+    parser.add_argument("--reporte", help="Archivo CSV donde guardar los errores de cada fila rechazada")
+    parser.add_argument("--mostrar", type=int, default=10, help="Filas rechazadas a mostrar en consola")
+    args = parser.parse_args(argv)
+    
+    formato = args.formato or detectar_formato(args.archivo)
+    if formato is None:
+        print("No se pudo determinar el formato del archivo. Use --formato csv|jsonl")
+        return 1
+    
+    resumen = {'validas': 0, 'rechazadas': 0}
+    por_error = Counter()
+    primeras = []
+    
+    def rechazos():
+        """Recorre los bloques validados, acumula el resumen y entrega cada fila rechazada"""
+        for validas, rechazos_bloque in validar_archivo(args.archivo, formato, args.procesos, args.bloque):
+            resumen['validas'] += validas
+            resumen['rechazadas'] += len(rechazos_bloque)
+            for numero, errores in rechazos_bloque:
+                por_error.update(errores)
+                if len(primeras) < args.mostrar:
+                    primeras.append((numero, errores))
+                yield numero, errores
+            total = resumen['validas'] + resumen['rechazadas']
+            print(f"\rValidadas: {total:,} filas", end="", file=sys.stderr, flush=True)
+    
+    inicio = time.perf_counter()
+    try:
+        if args.reporte:
+            escribir_reporte(args.reporte, rechazos())
+        else:
+            for _ in rechazos():
+                pass
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"\nNo se pudo leer el archivo: {e}", file=sys.stderr)
+        return 1
+    duracion = time.perf_counter() - inicio
+    print(file=sys.stderr)
+    
+    total = resumen['validas'] + resumen['rechazadas']
+    print("=" * 60)
+    print(f"Filas revisadas: {total}")
+    print(f"Filas válidas: {resumen['validas']} ({porcentaje(resumen['validas'], total):.2f}%)")
+    print(f"Filas rechazadas: {resumen['rechazadas']} ({porcentaje(resumen['rechazadas'], total):.2f}%)")
+    print(f"Tiempo: {duracion:.2f} s ({total / duracion if duracion else 0:.0f} filas/s)")
+    
+    if por_error:
+        print("\nErrores más frecuentes:")
+        for mensaje, cantidad in por_error.most_common():
+            print(f"  {cantidad:>9}  {mensaje}")
+    if primeras:
+        print("\nPrimeras filas rechazadas:")
+        for numero, errores in primeras:
+            print(f"  Fila {numero}: {'; '.join(errores)}")
+    if args.reporte:
+        print(f"\nReporte de filas rechazadas guardado en {args.reporte}")
+    print("=" * 60)
+    
+    return 2 if resumen['rechazadas'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import font
+from view.lista_virtual import ListaVirtual
 
 class ClienteView:
+    # Columnas de la lista: (campo del cliente, título, ancho en píxeles)
+    COLUMNAS_LISTA = (
+        ('codigo', "Código", 80),
+        ('nombre', "Nombre", 120),
+        ('apellido', "Apellido", 120),
+        ('email', "Email", 150),
+        ('telefono', "Teléfono", 100),
+        ('direccion', "Dirección", 150),
+        ('fecha_registro', "Fecha Registro", 130),
+    )
+    
+    # Campos que se pueden modificar a la vez en varios clientes
+    CAMPOS_MASIVOS = tuple((campo, titulo) for campo, titulo, _ in COLUMNAS_LISTA
+                           if campo not in ('codigo', 'fecha_registro'))
+    
     def __init__(self, root):
         self.root = root
         self.root.title("SandTech - Gestión de Clientes")
@@ -21,6 +37,10 @@ class ClienteView:
         
         # Referencias para callbacks del controlador
         self.controller = None
+        self._busqueda_pendiente = None
+        self._filtro_pendiente = None
+        self._indicador_pendiente = None
+        self.ventana_estadisticas = None
         
     def setup_styles(self):
         """Configura los estilos de la aplicación"""
@@ -53,6 +73,14 @@ class ClienteView:
                               font=self.title_font, bg="#2c3e50", fg="white")
         title_label.pack(expand=True)
         
+        # Barra de estado: indica cuando hay consultas a la base de datos en curso
+        self.status_frame = tk.Frame(self.root, bg="#ecf0f1")
+        self.status_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+        
+        self.label_ocupado = tk.Label(self.status_frame, text="Consultando la base de datos... (Esc para cancelar)", 
+                                      font=self.label_font, bg="#ecf0f1", fg="#7f8c8d")
+        self.progress_ocupado = ttk.Progressbar(self.status_frame, mode="indeterminate", length=120)
+        
         # Frame principal con dos columnas
         main_frame = tk.Frame(self.root, bg="#ecf0f1")
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -153,6 +181,13 @@ class ClienteView:
                                    bg="#9b59b6", fg="white", width=10)
         self.btn_buscar.pack(side="right", padx=(5, 0))
         
+        tk.Label(search_frame, text="Nombre, apellido, email o dirección:", 
+                 font=self.label_font, bg="#ecf0f1").pack(anchor="w")
+        
+        self.var_buscar_texto = tk.StringVar()
+        self.entry_buscar_texto = tk.Entry(search_frame, textvariable=self.var_buscar_texto)
+        self.entry_buscar_texto.pack(fill="x", pady=5)
+        
         # Botones adicionales
         extra_frame = tk.LabelFrame(parent, text="Otras Operaciones", 
                                    font=self.label_font, bg="#ecf0f1", padx=10, pady=10)
@@ -166,42 +201,71 @@ class ClienteView:
                                              bg="#34495e", fg="white", width=20, height=2)
         self.btn_actualizar_lista.pack(pady=5)
         
+        self.btn_modificar_seleccion = tk.Button(extra_frame, text="Modificar Selección", font=self.button_font, 
+                                                bg="#16a085", fg="white", width=20, height=2)
+        self.btn_modificar_seleccion.pack(pady=5)
+        
+        self.btn_estadisticas = tk.Button(extra_frame, text="Estadísticas (F12)", font=self.button_font, 
+                                         bg="#7f8c8d", fg="white", width=20)
+        self.btn_estadisticas.pack(pady=5)
+        
     def create_list_section(self, parent):
         """Crea la sección de lista de clientes"""
-        list_frame = tk.LabelFrame(parent, text="Lista de Clientes", 
-                                  font=self.label_font, bg="#ecf0f1", padx=10, pady=10)
-        list_frame.pack(fill="both", expand=True)
+        self.list_frame = tk.LabelFrame(parent, text="Lista de Clientes", 
+                                       font=self.label_font, bg="#ecf0f1", padx=10, pady=10)
+        self.list_frame.pack(fill="both", expand=True)
+        
+        # Filtros por columna (prefijo, sin distinguir mayúsculas), alineados
+        # con las columnas del Treeview
+        filtros_frame = tk.Frame(self.list_frame, bg="#ecf0f1")
+        filtros_frame.pack(fill="x", pady=(0, 5))
+        
+        self.vars_filtro = {}
+        self.entries_filtro = []
+        for campo, titulo, ancho in self.COLUMNAS_LISTA:
+            celda = tk.Frame(filtros_frame, width=ancho, height=24, bg="#ecf0f1")
+            celda.pack(side="left")
+            celda.pack_propagate(False)
+            self.vars_filtro[campo] = tk.StringVar()
+            entry = tk.Entry(celda, textvariable=self.vars_filtro[campo])
+            entry.pack(fill="both", expand=True, padx=1)
+            self.entries_filtro.append(entry)
+        
+        self.btn_limpiar_filtros = tk.Button(filtros_frame, text="✕", font=self.button_font,
+                                             bg="#95a5a6", fg="white", width=3)
+        self.btn_limpiar_filtros.pack(side="left", padx=(5, 0))
         
         # Crear Treeview con scrollbars
-        tree_frame = tk.Frame(list_frame, bg="#ecf0f1")
+        tree_frame = tk.Frame(self.list_frame, bg="#ecf0f1")
         tree_frame.pack(fill="both", expand=True)
         
         # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical")
-        v_scrollbar.pack(side="right", fill="y")
+        self.v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical")
+        self.v_scrollbar.pack(side="right", fill="y")
         
         h_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal")
         h_scrollbar.pack(side="bottom", fill="x")
         
-        # Treeview
-        columns = ("Código", "Nombre", "Apellido", "Email", "Teléfono", "Dirección", "Fecha Registro")
+        # Treeview (cada columna se identifica por el campo del cliente)
+        columns = tuple(campo for campo, _, _ in self.COLUMNAS_LISTA)
         self.tree_clientes = ttk.Treeview(tree_frame, columns=columns, show="headings", 
-                                         yscrollcommand=v_scrollbar.set, 
-                                         xscrollcommand=h_scrollbar.set)
+                                         selectmode="extended", xscrollcommand=h_scrollbar.set)
         
-        # Configurar scrollbars
-        v_scrollbar.config(command=self.tree_clientes.yview)
+        # Configurar scrollbars (el vertical lo maneja la lista virtual)
         h_scrollbar.config(command=self.tree_clientes.xview)
         
-        # Configurar columnas
-        column_widths = [80, 120, 120, 150, 100, 150, 130]
-        for i, (col, width) in enumerate(zip(columns, column_widths)):
-            self.tree_clientes.heading(col, text=col, anchor="center")
-            self.tree_clientes.column(col, width=width, anchor="center")
+        # Configurar columnas; el clic en el encabezado ordena por esa columna
+        for campo, titulo, ancho in self.COLUMNAS_LISTA:
+            self.tree_clientes.heading(campo, text=titulo, anchor="center",
+                                       command=lambda campo=campo: self.on_clic_encabezado(campo))
+            self.tree_clientes.column(campo, width=ancho, anchor="center")
         
         self.tree_clientes.pack(fill="both", expand=True)
         
-        # Bind para seleccionar cliente
+        # Scroll virtual: solo se materializan las filas visibles
+        self.lista = ListaVirtual(self.tree_clientes, self.v_scrollbar, self.formatear_fila_cliente)
+        
+        # Bind para seleccionar cliente (Ctrl o Shift + clic seleccionan varios)
         self.tree_clientes.bind("<<TreeviewSelect>>", self.on_cliente_select)
         
     def set_controller(self, controller):
@@ -216,12 +280,83 @@ class ClienteView:
         self.btn_buscar.config(command=self.controller.buscar_cliente)
         self.btn_limpiar.config(command=self.controller.limpiar_formulario)
         self.btn_actualizar_lista.config(command=self.controller.actualizar_lista_clientes)
+        self.btn_modificar_seleccion.config(command=self.controller.modificar_clientes_seleccionados)
+        self.tree_clientes.bind("<Delete>", lambda e: self.controller.eliminar_cliente())
+        self.btn_estadisticas.config(command=self.controller.mostrar_estadisticas)
+        self.root.bind("<F12>", lambda e: self.controller.mostrar_estadisticas())
         
         # Bind para Enter en búsqueda
         self.entry_buscar.bind("<Return>", lambda e: self.controller.buscar_cliente())
         
+        # Búsqueda por texto mientras se escribe (o inmediata con Enter)
+        self.entry_buscar_texto.bind("<KeyRelease>", self.on_texto_busqueda)
+        self.entry_buscar_texto.bind("<Return>", lambda e: self.ejecutar_busqueda_texto())
+        
+        # Filtros de la lista mientras se escribe (o inmediatos con Enter)
+        for entry in self.entries_filtro:
+            entry.bind("<KeyRelease>", self.on_texto_filtro)
+            entry.bind("<Return>", lambda e: self.ejecutar_filtro_lista())
+        self.btn_limpiar_filtros.config(command=self.limpiar_filtros_lista)
+        
+        # Escape cancela las consultas en curso
+        self.root.bind("<Escape>", lambda e: self.controller.cancelar_consultas())
+    
+    def on_texto_busqueda(self, event):
+        """Espera a que se deje de escribir antes de buscar"""
+        if self._busqueda_pendiente:
+            self.root.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.root.after(250, self.ejecutar_busqueda_texto)
+    
+    def ejecutar_busqueda_texto(self):
+        """Lanza la búsqueda por texto en el controlador"""
+        if self._busqueda_pendiente:
+            self.root.after_cancel(self._busqueda_pendiente)
+            self._busqueda_pendiente = None
+        if self.controller:
+            self.controller.buscar_por_texto()
+        
+    def on_texto_filtro(self, event):
+        """Espera a que se deje de escribir antes de filtrar la lista"""
+        if event.keysym == "Return":
+            return
+        if self._filtro_pendiente:
+            self.root.after_cancel(self._filtro_pendiente)
+        self._filtro_pendiente = self.root.after(300, self.ejecutar_filtro_lista)
+    
+    def ejecutar_filtro_lista(self):
+        """Aplica los filtros por columna en el controlador"""
+        if self._filtro_pendiente:
+            self.root.after_cancel(self._filtro_pendiente)
+            self._filtro_pendiente = None
+        if self.controller:
+            self.controller.filtrar_lista()
+    
+    def limpiar_filtros_lista(self):
+        """Borra todos los filtros por columna y vuelve a mostrar la lista completa"""
+        for variable in self.vars_filtro.values():
+            variable.set("")
+        self.ejecutar_filtro_lista()
+    
+    def on_clic_encabezado(self, campo):
+        """Ordena la lista por la columna cuyo encabezado se tocó"""
+        if self.controller:
+            self.controller.ordenar_lista(campo)
+    
     def on_cliente_select(self, event):
         """Maneja la selección de cliente en la lista"""
+        self.lista.actualizar_marcados()
+        codigo = self.obtener_cliente_seleccionado()
+        
+        # Ignorar los cambios de selección causados por el scroll virtual
+        # (la fila sale de pantalla o vuelve a aparecer ya seleccionada)
+        if codigo is None or codigo == self.lista.codigo_seleccionado:
+            return
+        # Con varias filas marcadas, la activa solo cambia con un clic sobre otra
+        if (self.lista.codigo_seleccionado in self.lista.codigos_marcados and
+                self.tree_clientes.focus() not in self.tree_clientes.selection()):
+            return
+        
+        self.lista.codigo_seleccionado = codigo
         if self.controller:
             self.controller.on_cliente_seleccionado()
     
@@ -255,31 +390,135 @@ class ClienteView:
             'direccion': self.var_direccion.get().strip()
         }
         
+    def configurar_fuente_lista(self, contar, obtener_filas):
+        """Establece de dónde obtiene sus filas la lista virtual"""
+        self.lista.configurar_fuente(contar, obtener_filas)
+    
+    def configurar_orden_lista(self, campo, descendente, clave, clave_modificable):
+        """Marca en los encabezados la columna de orden e informa a la lista la clave de orden"""
+        for otro, titulo, _ in self.COLUMNAS_LISTA:
+            if otro == campo:
+                titulo += " ▼" if descendente else " ▲"
+            self.tree_clientes.heading(otro, text=titulo)
+        self.lista.configurar_orden(clave, descendente, clave_modificable)
+    
+    def obtener_filtros_lista(self):
+        """Obtiene los filtros por columna ({campo: texto})"""
+        return {campo: variable.get() for campo, variable in self.vars_filtro.items()}
+    
+    def recargar_lista(self, al_terminar=None):
+        """Vuelve a leer las filas visibles de la lista; al_terminar recibe el total"""
+        self.lista.recargar(al_terminar)
+    
+    def cancelar_carga_lista(self):
+        """Descarta las filas pedidas que todavía no llegaron"""
+        self.lista.descartar_pedidos()
+    
+    def aplicar_cambio_cliente(self, tipo, codigo, valores):
+        """Refleja en la lista un alta, modificación o baja de un solo cliente"""
+        self.lista.aplicar_cambio(tipo, codigo, valores)
+    
+    def aplicar_cambio_masivo_clientes(self, tipo, codigos, valores):
+        """Refleja en la lista, de una sola vez, la modificación o baja de varios clientes"""
+        self.lista.aplicar_cambio_masivo(tipo, codigos, valores)
+    
     def cargar_lista_clientes(self, clientes):
-        """Carga la lista de clientes en el Treeview"""
-        # Limpiar lista actual
-        for item in self.tree_clientes.get_children():
-            self.tree_clientes.delete(item)
-            
-        # Cargar nuevos datos
-        for cliente in clientes:
-            self.tree_clientes.insert("", "end", values=(
-                cliente['codigo'],
-                cliente['nombre'],
-                cliente['apellido'],
-                cliente['email'],
-                cliente['telefono'],
-                cliente['direccion'],
-                cliente['fecha_registro']
-            ))
+        """Carga en el Treeview una lista de clientes ya obtenida"""
+        self.lista.configurar_fuente(
+            lambda al_recibir: al_recibir(len(clientes)),
+            lambda posicion, cantidad, ancla, al_recibir: al_recibir(clientes[posicion:posicion + cantidad]))
+        self.lista.recargar()
+    
+    def formatear_fila_cliente(self, cliente):
+        """Convierte un cliente en la tupla de valores de una fila del Treeview"""
+        if isinstance(cliente, tuple):
+            # Un Cliente ya es la tupla de columnas en el orden del Treeview
+            return cliente
+        return (
+            cliente['codigo'],
+            cliente['nombre'],
+            cliente['apellido'],
+            cliente['email'],
+            cliente['telefono'],
+            cliente['direccion'],
+            cliente['fecha_registro']
+        )
+    
+    def seleccionar_cliente(self, codigo, posicion_estimada=None):
+        """Selecciona un cliente en la lista; si no está en pantalla y se
+        conoce su posición aproximada, primero desplaza la lista hasta él"""
+        if self.lista.seleccionar(codigo):
+            return True
+        if posicion_estimada is None:
+            return False
+        # Las filas pueden llegar más tarde; se selecciona cuando estén en pantalla
+        self.lista.mostrar_codigo(codigo, posicion_estimada,
+                                  al_mostrar=lambda: self.lista.seleccionar(codigo))
+        return True
+    
+    def limpiar_seleccion(self):
+        """Quita la selección de la lista"""
+        self.lista.codigo_seleccionado = None
+        self.lista.codigos_marcados.clear()
+        self.tree_clientes.selection_remove(self.tree_clientes.selection())
     
     def obtener_cliente_seleccionado(self):
-        """Obtiene el código del cliente seleccionado en la lista"""
+        """Obtiene el código del cliente seleccionado en la lista (con varios, el de la fila con el foco)"""
         selection = self.tree_clientes.selection()
         if selection:
-            item = self.tree_clientes.item(selection[0])
-            return int(item['values'][0])  # Código del cliente
+            foco = self.tree_clientes.focus()
+            return self.lista.codigo_de_item(foco if foco in selection else selection[0])  # El iid es el código
         return None
+    
+    def obtener_clientes_seleccionados(self):
+        """Obtiene los códigos de todos los clientes seleccionados, estén o no en pantalla"""
+        return sorted(self.lista.codigos_marcados)
+    
+    def pedir_campo_masivo(self, cantidad):
+        """Pide el campo y el valor a poner en los clientes seleccionados.
+        
+        Devuelve (campo, valor) o None si se cancela.
+        """
+        ventana = tk.Toplevel(self.root)
+        ventana.title("Modificar Selección")
+        ventana.transient(self.root)
+        ventana.resizable(False, False)
+        ventana.configure(bg="#ecf0f1", padx=10, pady=10)
+        
+        tk.Label(ventana, text=f"Nuevo valor para los {cantidad} clientes seleccionados:",
+                 font=self.label_font, bg="#ecf0f1").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 10))
+        
+        titulos = [titulo for _, titulo in self.CAMPOS_MASIVOS]
+        var_campo = tk.StringVar(value=titulos[0])
+        tk.Label(ventana, text="Campo:", font=self.label_font, bg="#ecf0f1").grid(row=1, column=0, sticky="w")
+        ttk.Combobox(ventana, textvariable=var_campo, values=titulos, state="readonly",
+                     width=27).grid(row=1, column=1, sticky="w", pady=5)
+        
+        var_valor = tk.StringVar()
+        tk.Label(ventana, text="Valor:", font=self.label_font, bg="#ecf0f1").grid(row=2, column=0, sticky="w")
+        entry_valor = tk.Entry(ventana, textvariable=var_valor, width=30)
+        entry_valor.grid(row=2, column=1, sticky="w", pady=5)
+        
+        resultado = []
+        
+        def aceptar():
+            campo = next(campo for campo, titulo in self.CAMPOS_MASIVOS if titulo == var_campo.get())
+            resultado.append((campo, var_valor.get().strip()))
+            ventana.destroy()
+        
+        botones = tk.Frame(ventana, bg="#ecf0f1")
+        botones.grid(row=3, column=0, columnspan=2, sticky="e", pady=(10, 0))
+        tk.Button(botones, text="Aceptar", font=self.button_font, bg="#16a085", fg="white",
+                  width=10, command=aceptar).pack(side="left", padx=5)
+        tk.Button(botones, text="Cancelar", font=self.button_font, bg="#95a5a6", fg="white",
+                  width=10, command=ventana.destroy).pack(side="left")
+        ventana.bind("<Return>", lambda e: aceptar())
+        ventana.bind("<Escape>", lambda e: ventana.destroy())
+        
+        entry_valor.focus()
+        ventana.grab_set()
+        self.root.wait_window(ventana)
+        return resultado[0] if resultado else None
         
     def mostrar_mensaje(self, tipo, titulo, mensaje):
         """Muestra un mensaje al usuario"""
@@ -294,4 +533,81 @@ class ClienteView:
     
     def obtener_codigo_busqueda(self):
         """Obtiene el código ingresado para búsqueda"""
-        return self.var_buscar_codigo.get().strip()
\ No newline at end of file
+        return self.var_buscar_codigo.get().strip()
+    
+    def obtener_texto_busqueda(self):
+        """Obtiene el texto ingresado para la búsqueda libre"""
+        return self.var_buscar_texto.get().strip()
+    
+    def set_ocupado(self, ocupado):
+        """Muestra u oculta el indicador de consulta en curso.
+        
+        Se muestra recién si la consulta tarda más de 200 ms, para no parpadear
+        con las consultas rápidas.
+        """
+        if self._indicador_pendiente:
+            self.root.after_cancel(self._indicador_pendiente)
+            self._indicador_pendiente = None
+        
+        if ocupado:
+            self._indicador_pendiente = self.root.after(200, self._mostrar_indicador_ocupado)
+        else:
+            self.progress_ocupado.stop()
+            self.progress_ocupado.pack_forget()
+            self.label_ocupado.pack_forget()
+            self.root.config(cursor="")
+    
+    def _mostrar_indicador_ocupado(self):
+        self._indicador_pendiente = None
+        self.label_ocupado.pack(side="left")
+        self.progress_ocupado.pack(side="left", padx=(10, 0))
+        self.progress_ocupado.start(15)
+        self.root.config(cursor="watch")
+    
+    def set_titulo_lista(self, titulo):
+        """Cambia el título del recuadro de la lista"""
+        self.list_frame.config(text=titulo)
+    
+    def abrir_ventana_estadisticas(self, obtener_resumen, reiniciar):
+        """Abre (o trae al frente) la ventana con los tiempos de cada operación.
+        
+        obtener_resumen devuelve {operación: resumen}; la tabla se refresca
+        cada segundo mientras la ventana esté abierta.
+        """
+        if self.ventana_estadisticas is not None and self.ventana_estadisticas.winfo_exists():
+            self.ventana_estadisticas.lift()
+            return
+        
+        ventana = tk.Toplevel(self.root)
+        ventana.title("SandTech - Estadísticas de rendimiento")
+        ventana.geometry("900x450")
+        self.ventana_estadisticas = ventana
+        
+        columnas = ("Operación", "Llamadas", "Media ms", "p50 ms", "p95 ms", "p99 ms", "Máx ms", "Filas")
+        anchos = [260, 80, 80, 80, 80, 80, 80, 80]
+        tabla = ttk.Treeview(ventana, columns=columnas, show="headings")
+        for columna, ancho in zip(columnas, anchos):
+            tabla.heading(columna, text=columna, anchor="center")
+            tabla.column(columna, width=ancho, anchor="w" if columna == "Operación" else "e")
+        tabla.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        botones = tk.Frame(ventana)
+        botones.pack(fill="x", padx=10, pady=(0, 10))
+        tk.Button(botones, text="Reiniciar", font=self.button_font,
+                  command=lambda: (reiniciar(), refrescar(programar=False))).pack(side="left")
+        tk.Button(botones, text="Cerrar", font=self.button_font,
+                  command=ventana.destroy).pack(side="right")
+        
+        def refrescar(programar=True):
+            if not ventana.winfo_exists():
+                return
+            tabla.delete(*tabla.get_children())
+            for operacion, datos in obtener_resumen().items():
+                tabla.insert("", "end", values=(
+                    operacion, datos['llamadas'], f"{datos['media_ms']:.3f}", f"{datos['p50_ms']:.3f}",
+                    f"{datos['p95_ms']:.3f}", f"{datos['p99_ms']:.3f}", f"{datos['maximo_ms']:.3f}",
+                    datos['filas']))
+            if programar:
+                ventana.after(1000, refrescar)
+        
+        refrescar()
\ No newline at end of file
@@ -0,0 +1,417 @@
+# view/lista_virtual.py
+from tkinter import ttk
+
+# Bits de event.state de las teclas que agregan filas a la selección
+MODIFICADOR_SHIFT = 0x0001
+MODIFICADOR_CONTROL = 0x0004
+
+class ListaVirtual:
+    """Muestra una tabla de cualquier tamaño en un Treeview con scroll virtual.
+    
+    El Treeview solo contiene las filas que entran en pantalla; el resto se pide
+    a la fuente de datos a medida que se mueve el scrollbar. Cada item usa el
+    código del cliente como iid.
+    
+    La fuente responde por callback, así puede consultar la base de datos en
+    otro hilo: mientras llegan las filas se sigue mostrando lo anterior.
+    
+    Las filas vienen ordenadas por la clave que indica configurar_orden (por
+    defecto, el código); aplicar_cambio la usa para ubicar altas y cambios.
+    
+    Se pueden seleccionar varias filas (Ctrl o Shift + clic). Como los items
+    de las filas que salen de pantalla se borran, la selección se guarda en
+    codigos_marcados y se vuelve a marcar al mostrarlas de nuevo.
+    """
+    
+    # Filas extra que se piden antes y después de la zona visible
+    BUFFER = 30
+    
+    def __init__(self, tree, scrollbar, formatear_fila):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.formatear_fila = formatear_fila
+        
+        # Fuente de datos: contar(al_recibir) y obtener_filas(posicion, cantidad,
+        # ancla, al_recibir); ambas llaman a al_recibir con el resultado
+        self.contar = lambda al_recibir: al_recibir(0)
+        self.obtener_filas = lambda posicion, cantidad, ancla, al_recibir: al_recibir([])
+        
+        # Orden de las filas de la fuente: clave(fila), sentido y si una
+        # modificación puede cambiar la clave (y con ella la posición) de una fila
+        self.clave = lambda fila: fila['codigo']
+        self.descendente = False
+        self.clave_modificable = False
+        
+        self.total = 0
+        self.posicion = 0          # Índice de la primera fila visible
+        self.cache = []            # Filas ya pedidas a la fuente
+        self.cache_inicio = 0      # Índice de la primera fila del cache
+        self.cache_hasta_el_final = False  # El cache llega hasta la última fila
+        self.codigo_seleccionado = None  # Fila activa (la del formulario)
+        self.codigos_marcados = set()    # Todas las seleccionadas, estén o no en pantalla
+        self._render_pendiente = False
+        
+        # Pedidos en curso: las respuestas de pedidos viejos se descartan
+        self._pedido_total = 0
+        self._pedido_filas = 0
+        self._rango_pedido = None
+        
+        self.scrollbar.config(command=self.on_scrollbar)
+        self.tree.config(yscrollcommand="")
+        self.tree.bind("<Configure>", lambda e: self.programar_render())
+        self.tree.bind("<MouseWheel>", self.on_rueda)
+        self.tree.bind("<Button-4>", lambda e: self.desplazar(-3) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.desplazar(3) or "break")
+        self.tree.bind("<ButtonPress-1>", self.on_clic)
+        self.tree.bind("<Up>", self.on_tecla_arriba)
+        self.tree.bind("<Down>", self.on_tecla_abajo)
+        self.tree.bind("<Prior>", lambda e: self.desplazar(-self.filas_visibles()) or "break")
+        self.tree.bind("<Next>", lambda e: self.desplazar(self.filas_visibles()) or "break")
+    
+    def configurar_fuente(self, contar, obtener_filas):
+        """Establece de dónde se obtienen las filas (se aplica en el próximo recargar).
+        
+        La selección se descarta: las filas marcadas podrían no estar en la
+        nueva fuente y una operación sobre la selección las tocaría sin verlas.
+        """
+        self.contar = contar
+        self.obtener_filas = obtener_filas
+        self.posicion = 0
+        self.codigos_marcados.clear()
+    
+    def configurar_orden(self, clave, descendente=False, clave_modificable=False):
+        """Indica cómo vienen ordenadas las filas de la fuente (clave(fila) y sentido)"""
+        self.clave = clave
+        self.descendente = descendente
+        self.clave_modificable = clave_modificable
+    
+    def recargar(self, al_terminar=None):
+        """Descarta el cache y vuelve a pedir el total y las filas visibles.
+        
+        al_terminar, si se indica, recibe el total de filas cuando las filas
+        visibles ya están en pantalla.
+        """
+        self._pedido_total += 1
+        pedido = self._pedido_total
+        self.descartar_pedidos()
+        
+        def al_recibir_total(total):
+            if pedido != self._pedido_total:
+                return
+            self.total = total
+            self.cache = []
+            self.cache_inicio = 0
+            self.cache_hasta_el_final = False
+            # Un render de antes del total pudo dejar pedidas filas viejas; se
+            # pide de nuevo para que el aviso llegue con las filas de este total
+            self.descartar_pedidos()
+            self.render(al_mostrar=al_terminar and (lambda: al_terminar(total)))
+        
+        self.contar(al_recibir_total)
+    
+    def descartar_pedidos(self):
+        """Olvida los pedidos de filas en curso (sus respuestas se ignoran)"""
+        self._pedido_filas += 1
+        self._rango_pedido = None
+    
+    def aplicar_cambio(self, tipo, codigo, valores):
+        """Aplica el alta, modificación o baja de una fila sin recargar la lista.
+        
+        Solo se toca el cache y, si la fila está en pantalla, su item del Treeview.
+        Una modificación que cambia la clave de orden mueve la fila a su nuevo
+        lugar. valores son los datos de la fila (en las bajas, los que tenía).
+        """
+        indice = next((i for i, fila in enumerate(self.cache) if fila['codigo'] == codigo), None)
+        
+        if tipo == "update":
+            if indice is not None:
+                fila = self.cache.pop(indice)
+                # Los Cliente son inmutables: se reemplaza la tupla sin pasar por dict
+                fila = (fila._replace(**valores) if hasattr(fila, '_replace')
+                        else dict(fila, **valores))
+                if self._indice_en_cache(fila) == indice:
+                    # Sigue en el mismo lugar (también si era la primera o la última)
+                    self.cache.insert(indice, fila)
+                else:
+                    self._ubicar_fila(fila, llega_al_final=self.cache_hasta_el_final)
+            elif self.clave_modificable:
+                # La fila pudo pasar de un lado al otro de las filas en cache sin
+                # que se sepa desde dónde: se vuelven a pedir las de la posición actual
+                self.recargar()
+                return
+            
+        elif tipo == "insert":
+            llega_al_final = self.cache_hasta_el_final or self.cache_inicio + len(self.cache) >= self.total
+            self.total += 1
+            self._ubicar_fila(valores, llega_al_final)
+            
+        elif tipo == "delete":
+            self.total = max(0, self.total - 1)
+            if indice is not None:
+                del self.cache[indice]
+            elif valores is not None and self.cache_inicio > 0 and self._indice_en_cache(valores) == 0:
+                # Estaba antes del cache: las filas en pantalla suben una posición
+                self.cache_inicio -= 1
+                self.posicion = max(0, self.posicion - 1)
+            if codigo == self.codigo_seleccionado:
+                self.codigo_seleccionado = None
+            self.codigos_marcados.discard(codigo)
+        
+        self.render()
+    
+    def aplicar_cambio_masivo(self, tipo, codigos, valores):
+        """Aplica de una vez la modificación o baja de muchas filas, con un único render.
+        
+        tipo "update_masivo": valores es {campo: valor} para todas las filas y
+        no debe cambiar la clave de orden. tipo "delete_masivo": valores son
+        las filas borradas (con los datos que tenían).
+        """
+        codigos = set(codigos)
+        
+        if tipo == "update_masivo":
+            self.cache = [(fila._replace(**valores) if hasattr(fila, '_replace') else dict(fila, **valores))
+                          if fila['codigo'] in codigos else fila
+                          for fila in self.cache]
+            
+        elif tipo == "delete_masivo":
+            en_cache = {fila['codigo'] for fila in self.cache} & codigos
+            self.cache = [fila for fila in self.cache if fila['codigo'] not in codigos]
+            if self.cache_inicio > 0:
+                # Las borradas que estaban antes del cache suben las filas en pantalla
+                anteriores = sum(1 for fila in valores
+                                 if fila['codigo'] not in en_cache and self._indice_en_cache(fila) == 0)
+                self.cache_inicio = max(0, self.cache_inicio - anteriores)
+                self.posicion = max(0, self.posicion - anteriores)
+            self.total = max(0, self.total - len(codigos))
+            if self.codigo_seleccionado in codigos:
+                self.codigo_seleccionado = None
+            self.codigos_marcados -= codigos
+        
+        self.render()
+    
+    def _indice_en_cache(self, fila):
+        """Lugar del cache que le corresponde a la fila según la clave de orden"""
+        clave = self.clave(fila)
+        inicio, fin = 0, len(self.cache)
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            otra = self.clave(self.cache[medio])
+            if (otra > clave) if self.descendente else (otra < clave):
+                inicio = medio + 1
+            else:
+                fin = medio
+        return inicio
+    
+    def _ubicar_fila(self, fila, llega_al_final):
+        """Agrega al cache una fila nueva o movida, si su lugar cae dentro de él"""
+        indice = self._indice_en_cache(fila)
+        if indice == 0 and self.cache_inicio > 0:
+            # Va antes del cache: mantener en pantalla las mismas filas que se estaban viendo
+            self.cache_inicio += 1
+            self.posicion += 1
+        elif indice < len(self.cache) or llega_al_final:
+            self.cache.insert(indice, fila)
+    
+    def filas_visibles(self):
+        """Cantidad de filas que entran en el alto actual del Treeview"""
+        alto_fila = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        alto = self.tree.winfo_height()
+        if alto <= 1:
+            # Todavía no se dibujó: usar la altura configurada en filas
+            return int(self.tree.cget("height"))
+        # Se descuenta el encabezado y se suma una fila parcialmente visible
+        return max(1, (alto - alto_fila) // alto_fila + 1)
+    
+    def desplazar(self, filas):
+        """Mueve la zona visible la cantidad de filas indicada"""
+        self.posicion += filas
+        self.programar_render()
+    
+    def ir_a_posicion(self, posicion):
+        """Mueve la zona visible para que empiece en la posición indicada"""
+        self.posicion = posicion
+        self.render()
+    
+    def mostrar_codigo(self, codigo, posicion_estimada, al_mostrar=None):
+        """Desplaza la lista hasta la fila del código dado.
+        
+        Las filas se piden por clave desde ese código, así que se muestran las
+        correctas aunque la posición estimada no sea exacta; al llegar se
+        ubican según las filas que realmente hay antes del código (ver
+        _pedir_filas). al_mostrar se llama cuando la fila ya está en pantalla.
+        """
+        visibles = self.filas_visibles()
+        posicion = max(0, min(posicion_estimada, self.total - 1))
+        self._pedir_filas(max(0, posicion - self.BUFFER), visibles + 2 * self.BUFFER,
+                          ancla=(posicion, codigo), posicion=posicion - visibles // 2,
+                          al_mostrar=al_mostrar, centrar=True)
+    
+    def seleccionar(self, codigo):
+        """Selecciona la fila del código dado si está en pantalla (el iid es el código)"""
+        iid = str(codigo)
+        if not self.tree.exists(iid):
+            return False
+        # Se marca antes de seleccionar para que el evento no se trate como
+        # una selección nueva del usuario
+        self.codigo_seleccionado = codigo
+        self.codigos_marcados = {codigo}
+        self.tree.selection_set(iid)
+        self.tree.see(iid)
+        return True
+    
+    def codigo_de_item(self, iid):
+        """Devuelve el código del cliente que muestra un item"""
+        return int(iid)
+    
+    def actualizar_marcados(self):
+        """Pasa a codigos_marcados la selección de las filas en pantalla (las demás no cambian)"""
+        seleccion = set(self.tree.selection())
+        for iid in self.tree.get_children():
+            if iid in seleccion:
+                self.codigos_marcados.add(self.codigo_de_item(iid))
+            else:
+                self.codigos_marcados.discard(self.codigo_de_item(iid))
+    
+    def on_clic(self, event):
+        """Un clic sobre una fila sin Ctrl ni Shift reemplaza toda la selección"""
+        if (not event.state & (MODIFICADOR_SHIFT | MODIFICADOR_CONTROL) and
+                self.tree.identify_region(event.x, event.y) in ("cell", "tree")):
+            self.codigos_marcados.clear()
+    
+    def on_scrollbar(self, accion, cantidad, unidad=None):
+        """Traduce los comandos del scrollbar a una nueva posición"""
+        if accion == "moveto":
+            self.posicion = int(float(cantidad) * self.total)
+        elif accion == "scroll":
+            paso = self.filas_visibles() if unidad == "pages" else 1
+            self.posicion += int(cantidad) * paso
+        self.programar_render()
+    
+    def on_rueda(self, event):
+        """Scroll con la rueda del mouse (Windows y macOS)"""
+        self.desplazar(-3 if event.delta > 0 else 3)
+        return "break"
+    
+    def on_tecla_arriba(self, event):
+        """Al pasar del primer item visible hacia arriba, desplaza una fila"""
+        if not event.state & MODIFICADOR_SHIFT:
+            # Sin Shift las flechas seleccionan solo la fila a la que llegan
+            self.codigos_marcados.clear()
+        hijos = self.tree.get_children()
+        if hijos and self.tree.focus() == hijos[0] and self.posicion > 0:
+            self.posicion -= 1
+            self.render()
+    
+    def on_tecla_abajo(self, event):
+        """Al pasar del último item visible hacia abajo, desplaza una fila"""
+        if not event.state & MODIFICADOR_SHIFT:
+            self.codigos_marcados.clear()
+        hijos = self.tree.get_children()
+        if hijos and self.tree.focus() == hijos[-1]:
+            self.posicion += 1
+            self.render()
+    
+    def programar_render(self):
+        """Agrupa varios eventos de scroll en un único render"""
+        if not self._render_pendiente:
+            self._render_pendiente = True
+            self.tree.after_idle(self.render)
+    
+    def render(self, al_mostrar=None):
+        """Muestra en el Treeview las filas de la posición actual.
+        
+        al_mostrar, si se indica, se llama cuando las filas ya están en pantalla
+        (después de que lleguen, si hubo que pedirlas a la fuente).
+        """
+        self._render_pendiente = False
+        visibles = self.filas_visibles()
+        self.posicion = max(0, min(self.posicion, self.total - visibles))
+        
+        if self.total:
+            self.scrollbar.set(self.posicion / self.total,
+                               min(1.0, (self.posicion + visibles) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        
+        fin_cache = self.cache_inicio + len(self.cache)
+        cubierto = (self.cache_inicio <= self.posicion and
+                    (self.posicion + visibles <= fin_cache or self.cache_hasta_el_final))
+        if not cubierto:
+            # Se sigue mostrando lo anterior hasta que lleguen las filas
+            self._pedir_filas(max(0, self.posicion - self.BUFFER), visibles + 2 * self.BUFFER,
+                              al_mostrar=al_mostrar)
+            return
+        
+        desde = self.posicion - self.cache_inicio
+        self._sincronizar_items(self.cache[desde:desde + visibles])
+        if al_mostrar:
+            al_mostrar()
+    
+    def _pedir_filas(self, inicio, cantidad, ancla=None, posicion=None, al_mostrar=None, centrar=False):
+        """Pide a la fuente un rango de filas para el cache.
+        
+        Con centrar, la posición del ancla puede ser una estimación: el cache y
+        la posición se calculan con las filas que llegaron antes del código
+        del ancla, que queda a la mitad de la pantalla.
+        """
+        # Si ya hay un pedido en curso que cubre este rango, se lo espera
+        if (ancla is None and self._rango_pedido is not None and
+                self._rango_pedido[0] <= inicio and
+                inicio + cantidad <= self._rango_pedido[0] + self._rango_pedido[1]):
+            return
+        
+        if ancla is None and self.cache:
+            ancla = (self.cache_inicio, self.cache[0]['codigo'])
+        
+        self._pedido_filas += 1
+        pedido = self._pedido_filas
+        self._rango_pedido = (inicio, cantidad)
+        
+        def al_recibir(filas):
+            if pedido != self._pedido_filas:
+                return
+            self._rango_pedido = None
+            self.cache = filas
+            self.cache_inicio = inicio
+            self.cache_hasta_el_final = len(filas) < cantidad
+            nueva_posicion = posicion
+            if centrar:
+                antes = next((indice for indice, fila in enumerate(filas) if fila['codigo'] == ancla[1]), None)
+                if antes is not None:
+                    # Menos filas que las pedidas antes del ancla: la lista empieza
+                    # ahí y la posición estimada era demasiado alta
+                    if antes < ancla[0] - inicio:
+                        self.cache_inicio = 0
+                    nueva_posicion = max(0, self.cache_inicio + antes - self.filas_visibles() // 2)
+            if nueva_posicion is not None:
+                self.posicion = nueva_posicion
+            self.render()
+            if al_mostrar:
+                al_mostrar()
+        
+        self.obtener_filas(inicio, cantidad, ancla, al_recibir)
+    
+    def _sincronizar_items(self, filas):
+        """Ajusta los items del Treeview a las filas dadas tocando solo lo que cambió"""
+        deseados = [str(fila['codigo']) for fila in filas]
+        sobrantes = set(self.tree.get_children()) - set(deseados)
+        if sobrantes:
+            self.tree.delete(*sobrantes)
+        
+        for indice, (iid, fila) in enumerate(zip(deseados, filas)):
+            valores = self.formatear_fila(fila)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=valores)
+                self.tree.move(iid, "", indice)
+            else:
+                self.tree.insert("", indice, iid=iid, values=valores)
+        
+        # Restaurar la selección de las filas marcadas que volvieron a la zona visible
+        if self.codigos_marcados:
+            seleccion = set(self.tree.selection())
+            faltan = [iid for iid, fila in zip(deseados, filas)
+                      if fila['codigo'] in self.codigos_marcados and iid not in seleccion]
+            if faltan:
+                self.tree.selection_add(*faltan)
+        
+        self.tree.yview_moveto(0)
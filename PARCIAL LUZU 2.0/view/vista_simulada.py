@@ -0,0 +1,186 @@
+# view/vista_simulada.py
+from collections import Counter, deque
+
+from view.cliente_view import ClienteView
+from view.lista_virtual import ListaVirtual
+
+class VariableSimulada:
+    """Reemplazo de tk.StringVar"""
+    
+    def __init__(self, valor=""):
+        self.valor = valor
+    
+    def get(self):
+        return self.valor
+    
+    def set(self, valor):
+        self.valor = valor
+
+class WidgetSimulado:
+    """Acepta y descarta las llamadas de configuración de un widget"""
+    
+    def focus(self):
+        pass
+    
+    def config(self, **opciones):
+        pass
+    
+    def bind(self, *args):
+        pass
+
+class ArbolSimulado(WidgetSimulado):
+    """Reemplazo de ttk.Treeview con las operaciones que usa ListaVirtual"""
+    
+    def __init__(self, filas=20):
+        self.filas = filas
+        self.orden = []
+        self.valores = {}
+        self.seleccion = ()
+        self.foco = ""
+        self.encabezados = {}
+    
+    def after_idle(self, funcion):
+        funcion()
+    
+    def cget(self, opcion):
+        return self.filas
+    
+    def winfo_height(self):
+        return 1
+    
+    def heading(self, columna, text=None, **opciones):
+        if text is not None:
+            self.encabezados[columna] = text
+    
+    def get_children(self, item=""):
+        return tuple(self.orden)
+    
+    def exists(self, iid):
+        return iid in self.valores
+    
+    def item(self, iid, values=None, **opciones):
+        if values is not None:
+            self.valores[iid] = tuple(values)
+        return {'values': list(self.valores[iid])}
+    
+    def insert(self, padre, indice, iid=None, values=()):
+        self.orden.insert(len(self.orden) if indice == "end" else indice, iid)
+        self.valores[iid] = tuple(values)
+        return iid
+    
+    def move(self, iid, padre, indice):
+        self.orden.remove(iid)
+        self.orden.insert(indice, iid)
+    
+    def delete(self, *iids):
+        for iid in iids:
+            self.orden.remove(iid)
+            del self.valores[iid]
+        self.seleccion = tuple(iid for iid in self.seleccion if iid not in iids)
+    
+    def selection(self):
+        return self.seleccion
+    
+    def selection_set(self, *iids):
+        self.seleccion = iids
+    
+    def selection_add(self, *iids):
+        self.seleccion += tuple(iid for iid in iids if iid not in self.seleccion)
+    
+    def selection_remove(self, *iids):
+        self.seleccion = tuple(iid for iid in self.seleccion if iid not in iids)
+    
+    def focus(self, iid=None):
+        if iid is not None:
+            self.foco = iid
+        return self.foco
+    
+    def see(self, iid):
+        pass
+    
+    def yview_moveto(self, fraccion):
+        pass
+
+class BarraSimulada(WidgetSimulado):
+    """Reemplazo del scrollbar vertical"""
+    
+    def set(self, inicio, fin):
+        self.posicion = (inicio, fin)
+
+class ListaSimulada(ListaVirtual):
+    """ListaVirtual con un alto fijo en filas (no hay ventana que medir)"""
+    
+    def filas_visibles(self):
+        return self.tree.filas
+
+class VistaSimulada(ClienteView):
+    """Vista sin ventana con la misma interfaz que ClienteView.
+    
+    No crea widgets de Tk: las variables del formulario, el Treeview y el
+    scrollbar son reemplazos en memoria, y la lista es una ListaVirtual real
+    sobre ese Treeview. Los mensajes se registran en vez de mostrarse y las
+    preguntas se responden con respuesta_preguntas. Sin root, el controlador
+    ejecuta cada consulta en el momento, así que cada manejador termina todo
+    su trabajo antes de volver (sirve para medirlo).
+    """
+    
+    def __init__(self, filas_visibles=20, respuesta_preguntas=True):
+        self.root = None
+        self.controller = None
+        self.respuesta_preguntas = respuesta_preguntas
+        self.respuesta_campo_masivo = None
+        self.mensajes = deque(maxlen=100)
+        self.mensajes_por_tipo = Counter()
+        self.titulo_lista = ""
+        
+        for nombre in ('codigo', 'nombre', 'apellido', 'email', 'telefono', 'direccion',
+                       'buscar_codigo', 'buscar_texto'):
+            setattr(self, f"var_{nombre}", VariableSimulada())
+        self.vars_filtro = {campo: VariableSimulada() for campo, _, _ in self.COLUMNAS_LISTA}
+        self.entry_nombre = WidgetSimulado()
+        
+        self.tree_clientes = ArbolSimulado(filas_visibles)
+        self.v_scrollbar = BarraSimulada()
+        self.lista = ListaSimulada(self.tree_clientes, self.v_scrollbar, self.formatear_fila_cliente)
+    
+    def set_controller(self, controller):
+        self.controller = controller
+    
+    def mostrar_mensaje(self, tipo, titulo, mensaje):
+        """Registra el mensaje; las preguntas se confirman solas"""
+        self.mensajes.append((tipo, titulo, mensaje))
+        self.mensajes_por_tipo[tipo] += 1
+        if tipo == "question":
+            return self.respuesta_preguntas
+    
+    def pedir_campo_masivo(self, cantidad):
+        """Devuelve respuesta_campo_masivo ((campo, valor) o None)"""
+        return self.respuesta_campo_masivo
+    
+    def set_ocupado(self, ocupado):
+        pass
+    
+    def set_titulo_lista(self, titulo):
+        self.titulo_lista = titulo
+    
+    def completar_formulario(self, datos):
+        """Escribe en los campos del formulario los valores dados"""
+        for campo, valor in datos.items():
+            getattr(self, f"var_{campo}").set(valor)
+    
+    def hacer_clic_en_fila(self, codigo, agregar=False):
+        """Selecciona una fila visible como lo haría el usuario; False si no está en pantalla.
+        
+        Con agregar se suma a la selección, como un Ctrl + clic.
+        """
+        iid = str(codigo)
+        if not self.tree_clientes.exists(iid):
+            return False
+        if agregar:
+            self.tree_clientes.selection_add(iid)
+        else:
+            self.lista.codigos_marcados.clear()
+            self.tree_clientes.selection_set(iid)
+        self.tree_clientes.focus(iid)
+        self.on_cliente_select(None)
+        return True